@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+"""
+benchmarks.bench_get_driver
+---------------------------
+
+Measures get_driver end to end against the local stand-in repository:
+
+ - cold: nothing installed nor cached, new connections. Browsers are
+   refreshed, so the driver version is resolved from the stand-in's
+   metadata and never from the compatibility database.
+ - warm: the driver is installed, a new browser instance gets it.
+ - segmented: cold Chrome, downloading the archive in 4 parallel ranges.
+ - concurrent: Chrome and Firefox drivers at once with get_drivers, cold.
+
+Chrome, Firefox and IE are measured; IE's version can't be detected off
+Windows, so it resolves the latest Win32 driver from the bucket listing.
+
+It also reports the download throughput and the process peak RSS. Timings
+are also stored relative to a reference loop timed on the same machine, so
+results compare with benchmarks/baselines.json across machines:
+
+    python benchmarks/bench_get_driver.py            # compare
+    python benchmarks/bench_get_driver.py --update   # store new baselines
+
+Browsers are stand-in scripts put first on PATH, so it runs on POSIX
+systems only.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+
+# pylint: disable=wrong-import-position, wrong-import-order
+from driloader import driloader
+from driloader.browser.drivers import Driver
+from driloader.browser.internet_explorer import IE
+from driloader.config.snapshot import ConfigSnapshot
+from driloader.http.operations import HttpOperations
+from stand_in import StandIn
+
+BASELINES = os.path.join(BENCHMARKS, 'baselines.json')
+FAKE_BROWSERS = {'google-chrome': '85.0.4183.102',
+                 'firefox': 'Mozilla Firefox 80.0'}
+
+
+def _serve(queue, config_path, payload_size):
+    """
+    Runs the stand-in in a child process, so its memory doesn't count in
+    the measured RSS.
+    """
+    with StandIn(payload_size) as stand_in:
+        stand_in.config(config_path)
+        queue.put(stand_in.url())
+        multiprocessing.Event().wait()
+
+
+def _environment(workdir, config_path):
+    """
+    Points HOME, PATH and DRILOADER_CONFIG at the benchmark's files.
+    """
+    home = os.path.join(workdir, 'home')
+    bin_path = os.path.join(workdir, 'bin')
+    os.makedirs(home)
+    os.makedirs(bin_path)
+    for name, output in FAKE_BROWSERS.items():
+        script = os.path.join(bin_path, name)
+        with open(script, 'w', encoding='utf-8') as file:
+            file.write('#!/bin/sh\necho "{}"\n'.format(output))
+        os.chmod(script, 0o755)
+    os.environ.update({
+        'HOME': home, 'USERPROFILE': home,
+        'PATH': bin_path + os.pathsep + os.environ.get('PATH', ''),
+        'NO_PROXY': '127.0.0.1,localhost',
+        ConfigSnapshot.ENVIRONMENT_VARIABLE: config_path})
+    ConfigSnapshot.reload()
+
+
+def _clear():
+    """
+    Removes every installed driver and cache, and drops open connections.
+    """
+    shutil.rmtree(Driver().create_folder(), ignore_errors=True)
+    HttpOperations.configure()
+
+
+def _cold(factory):
+    """
+    Returns a browser resolving its driver from the metadata, with nothing
+    known from earlier runs.
+    """
+    return factory().refresh()
+
+
+def _reference_seconds(rounds=7):
+    """
+    Times a fixed loop of the work get_driver does on its own, hashing and
+    JSON, as the unit timings are compared in.
+    :return: its median duration, in seconds.
+    """
+    payload = bytes(range(256)) * 4096
+    document = {'versions': [{'version': str(number), 'downloads': {}}
+                             for number in range(200)]}
+
+    def loop():
+        digest = hashlib.sha256()
+        for _ in range(16):
+            digest.update(payload)
+        for _ in range(20):
+            json.loads(json.dumps(document))
+
+    return statistics.median(_timed(loop)[0] for _ in range(rounds))
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+def _summary(seconds, reference):
+    return {'median_ms': round(statistics.median(seconds) * 1000, 3),
+            'min_ms': round(min(seconds) * 1000, 3),
+            'max_ms': round(max(seconds) * 1000, 3),
+            'relative': round(statistics.median(seconds) / reference, 5)}
+
+
+def _peak_rss_mb():
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def run(rounds, warm_rounds, reference):
+    """
+    Runs every scenario.
+    :param reference: the reference loop duration, in seconds.
+    :return: a dict of results.
+    """
+    results = {}
+    throughputs = []
+    factories = {'chrome': driloader.chrome, 'firefox': driloader.firefox,
+                 'ie': driloader.internet_explorer}
+    for name, factory in factories.items():
+        cold = []
+        for _ in range(rounds):
+            _clear()
+            browser = _cold(factory)
+            cold.append(_timed(browser.get_driver)[0])
+            throughputs.append(browser.last_download.throughput)
+        results['cold_' + name] = _summary(cold, reference)
+        warm = [_timed(factory().get_driver)[0] for _ in range(warm_rounds)]
+        results['warm_' + name] = _summary(warm, reference)
+    segmented = []
+    for _ in range(rounds):
+        _clear()
+        HttpOperations.configure_segments(4, min_size=1024 * 1024)
+        try:
+            segmented.append(_timed(_cold(driloader.chrome).get_driver)[0])
+        finally:
+            HttpOperations.configure_segments(1)
+    results['cold_chrome_segmented'] = _summary(segmented, reference)
+    concurrent = []
+    for _ in range(rounds):
+        _clear()
+        concurrent.append(_timed(lambda: driloader.get_drivers(
+            [_cold(driloader.chrome), _cold(driloader.firefox)]))[0])
+    results['concurrent_cold'] = _summary(concurrent, reference)
+    throughput = statistics.median(throughputs) / 1024 / 1024
+    results['download_throughput_mbps'] = round(throughput, 1)
+    results['download_throughput_relative'] = round(throughput * reference,
+                                                    3)
+    results['peak_rss_mb'] = _peak_rss_mb()
+    return results
+
+
+def regressions(results, baselines, tolerance):
+    """
+    Compares results with baselines. Latencies are compared relative to the
+    reference loop, and throughput in MB per reference loop, so a faster or
+    slower machine doesn't move them; the absolute ones are only reported.
+    Latencies and RSS regress when they grow, throughput when it drops, by
+    more than tolerance.
+    :return: a list of messages, one per regression.
+    """
+    found = []
+    for name, baseline in baselines.get('results', {}).items():
+        current = results.get(name)
+        if name == 'download_throughput_mbps' or current is None or \
+                baseline is None:
+            continue
+        if isinstance(baseline, dict):
+            if 'relative' not in baseline:
+                continue
+            current, baseline = current['relative'], baseline['relative']
+        if 'throughput' in name:
+            regressed = current < baseline * (1 - tolerance)
+        else:
+            regressed = current > baseline * (1 + tolerance)
+        if regressed:
+            found.append('{}: {} (baseline {})'.format(name, current,
+                                                       baseline))
+    return found
+
+
+def parse_args():
+    """
+    Parses the command line.
+    """
+    parser = argparse.ArgumentParser(prog='bench_get_driver')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='cold and concurrent runs per scenario.')
+    parser.add_argument('--warm-rounds', type=int, default=50,
+                        help='warm runs per browser.')
+    parser.add_argument('--payload-mb', type=float, default=4,
+                        help='size of the drivers served, in MB.')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative change reported as a regression.')
+    parser.add_argument('--update', action='store_true',
+                        help='store the results as the new baselines.')
+    parser.add_argument('--output', help='also write the results there.')
+    return parser.parse_args()
+
+
+def main():
+    """
+    Starts the stand-in, runs the benchmarks and compares or stores the
+    results.
+    """
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='driloader-bench-')
+    config_path = os.path.join(workdir, 'stand_in.ini')
+    queue = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=_serve, args=(queue, config_path,
+                             int(args.payload_mb * 1024 * 1024)), daemon=True)
+    server.start()
+    try:
+        queue.get(timeout=30)
+        _environment(workdir, config_path)
+        # The stand-in only serves Win32 drivers.
+        IE._is_windows_x64 = staticmethod(  # pylint: disable=protected-access
+            lambda: False)
+        reference = _reference_seconds()
+        results = run(args.rounds, args.warm_rounds, reference)
+    finally:
+        server.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {'python': platform.python_version(),
+              'platform': Driver.platform(),
+              'payload_mb': args.payload_mb,
+              'reference_ms': round(reference * 1000, 3),
+              'results': results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    if args.update:
+        with open(BASELINES, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+        return 0
+    if not os.path.exists(BASELINES):
+        return 0
+    with open(BASELINES, 'r', encoding='utf-8') as file:
+        found = regressions(results, json.load(file), args.tolerance)
+    for message in found:
+        print('Regression: ' + message, file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+"""
+benchmarks.stand_in
+-------------------
+
+A local HTTP server standing in for the repositories drivers come from:
+
+ - /chromedriver/: the chromedriver storage bucket, with LATEST_RELEASE,
+   the XML listing (honouring ?prefix=, ?marker= and ?max-keys=), index.html, notes.txt and the
+   zip archives.
+ - /geckodriver/: the GitHub releases, with the releases/latest redirect
+   and the tarballs.
+ - /selenium/: the selenium-release bucket XML listing, paginated the
+   same way, and the IEDriverServer zips.
+
+Archives are built once, in memory, with a payload of a configurable size,
+so downloads measure the client and not the server. Every response has an
+ETag: a matching If-None-Match is answered with a 304, and Range requests,
+conditional on If-Range, with a 206.
+"""
+
+import hashlib
+import io
+import os
+import tarfile
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlparse
+
+CHROMEDRIVER_VERSIONS = ('84.0.4147.30', '84.0.4147.140', '85.0.4183.38',
+                         '85.0.4183.83', '85.0.4183.87', '86.0.4240.22')
+GECKODRIVER_VERSIONS = ('0.26.0', '0.27.0', '0.30.0')
+IEDRIVER_VERSIONS = ('3.14.0', '3.141.0', '3.141.59', '3.150.1')
+MAX_KEYS = 1000
+
+LISTING = '<?xml version="1.0" encoding="UTF-8"?>' \
+          '<ListBucketResult xmlns="http://doc.s3.amazonaws.com/2006-03-01">' \
+          '<Name>{name}</Name><Prefix>{prefix}</Prefix>' \
+          '<IsTruncated>{truncated}</IsTruncated>{contents}' \
+          '</ListBucketResult>'
+CONTENTS = '<Contents><Key>{}</Key><Generation>1</Generation>' \
+           '<Size>1024</Size></Contents>'
+NOTES = '----------ChromeDriver v2.46 (2019-02-01)----------\n' \
+        'Supports Chrome v71-73\n'
+
+
+def _zip(name, payload):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        info = zipfile.ZipInfo(name)
+        info.external_attr = 0o755 << 16
+        archive.writestr(info, payload)
+    return buffer.getvalue()
+
+
+def _tar_gz(name, payload):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        info = tarfile.TarInfo(name)
+        info.size = len(payload)
+        info.mode = 0o755
+        archive.addfile(info, io.BytesIO(payload))
+    return buffer.getvalue()
+
+
+def _etag(body):
+    return '"{}"'.format(hashlib.sha1(body).hexdigest())
+
+
+def _listing(name, keys, query):
+    """
+    Renders one page of the listing of keys, S3 style: keys starting with
+    ?prefix=, after ?marker=, at most ?max-keys= of them.
+    """
+    prefix = query.get('prefix', [''])[0]
+    marker = query.get('marker', [''])[0]
+    max_keys = int(query.get('max-keys', [MAX_KEYS])[0])
+    matched = [key for key in keys if key.startswith(prefix) and key > marker]
+    contents = ''.join(CONTENTS.format(key) for key in matched[:max_keys])
+    truncated = 'true' if len(matched) > max_keys else 'false'
+    return LISTING.format(name=name, prefix=prefix, truncated=truncated,
+                          contents=contents).encode('utf-8')
+
+
+class StandIn(ThreadingMixIn, HTTPServer):
+    """
+    The stand-in server. Use it as a context manager: it serves from a
+    daemon thread until the block exits.
+
+    >>> with StandIn() as server:
+    ...     server.url('/chromedriver/LATEST_RELEASE')
+    'http://127.0.0.1:41234/chromedriver/LATEST_RELEASE'
+    """
+
+    daemon_threads = True
+
+    def __init__(self, payload_size=4 * 1024 * 1024):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        # Random bytes, so the archives don't compress to nothing. The
+        # same archive is served for every version.
+        payload = os.urandom(payload_size)
+        zips = {name: _zip(name, payload) for name in (
+            'chromedriver', 'chromedriver.exe', 'geckodriver.exe',
+            'IEDriverServer.exe')}
+        gecko_tar_gz = _tar_gz('geckodriver', payload)
+        self.requests = []
+        self.files = {}
+        chrome_keys = []
+        for version in CHROMEDRIVER_VERSIONS:
+            for name in ('chromedriver_linux64.zip', 'chromedriver_win32.zip'):
+                key = '{}/{}'.format(version, name)
+                chrome_keys.append(key)
+                driver = 'chromedriver.exe' if 'win' in name else 'chromedriver'
+                self.files['/chromedriver/' + key] = zips[driver]
+            chrome_keys.append('{}/notes.txt'.format(version))
+            self.files['/chromedriver/{}/notes.txt'.format(version)] = \
+                NOTES.encode('utf-8')
+        self.chrome_keys = sorted(chrome_keys)
+        self.files['/chromedriver/LATEST_RELEASE'] = \
+            CHROMEDRIVER_VERSIONS[-1].encode('utf-8')
+        self.files['/chromedriver/index.html'] = b'<html></html>'
+        for version in GECKODRIVER_VERSIONS:
+            base = '/geckodriver/releases/download/v{0}/geckodriver-v{0}-'\
+                .format(version)
+            self.files[base + 'linux64.tar.gz'] = gecko_tar_gz
+            self.files[base + 'win32.zip'] = zips['geckodriver.exe']
+            self.files['/geckodriver/releases/tag/v' + version] = \
+                b'<html>release</html>'
+        self.selenium_keys = []
+        for version in IEDRIVER_VERSIONS:
+            short = '.'.join(version.split('.')[:2])
+            key = '{}/IEDriverServer_Win32_{}.zip'.format(short, version)
+            self.selenium_keys.append(key)
+            self.selenium_keys.append('{}/selenium-server-{}.jar'.format(
+                short, version))
+            self.files['/selenium/' + key] = zips['IEDriverServer.exe']
+        self.selenium_keys.sort()
+        self.etags = {path: _etag(body) for path, body in self.files.items()}
+        self._thread = None
+
+    def url(self, path=''):
+        """
+        Return the url of path on this server.
+        """
+        return 'http://127.0.0.1:{}{}'.format(self.server_address[1], path)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        self.server_close()
+
+    def config(self, path):
+        """
+        Writes a browsers.ini override pointing every url at this server.
+        :return: path.
+        """
+        lines = [
+            '[CHROME]',
+            'versions_url = {}/{{version}}/notes.txt'.format(
+                self.url('/chromedriver')),
+            'latest_release_url = {}'.format(
+                self.url('/chromedriver/LATEST_RELEASE')),
+            'base_url = {}/{{version}}/'.format(self.url('/chromedriver')),
+            'index_url = {}'.format(self.url('/chromedriver/index.html')),
+            'bucket_url = {}'.format(self.url('/chromedriver/')),
+            '[FIREFOX]',
+            'latest_release_url = {}'.format(
+                self.url('/geckodriver/releases/latest')),
+            'base_url = {}/v{{version}}/'.format(
+                self.url('/geckodriver/releases/download')),
+            '[IE]',
+            'bucket_url = {}'.format(self.url('/selenium/')),
+            'base_url = {}/{{version_short}}/'.format(self.url('/selenium')),
+        ]
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        return path
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Serves the listings, the redirect and the stored files.
+        """
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.requests.append(url.path)
+        if url.path == '/chromedriver/':
+            body = _listing('chromedriver', self.server.chrome_keys, query)
+            self._send(200, body, 'application/xml', _etag(body))
+        elif url.path == '/selenium/':
+            body = _listing('selenium-release', self.server.selenium_keys,
+                            query)
+            self._send(200, body, 'application/xml', _etag(body))
+        elif url.path == '/geckodriver/releases/latest':
+            self.send_response(302)
+            self.send_header('Location', '/geckodriver/releases/tag/v' +
+                             GECKODRIVER_VERSIONS[-1])
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif url.path in self.server.files:
+            self._send(200, self.server.files[url.path],
+                       'application/octet-stream', self.server.etags[url.path])
+        else:
+            self._send(404, b'Not Found', 'text/plain')
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """
+        Answers like do_GET, without the body.
+        """
+        self.do_GET()
+
+    def _send(self, status, body, content_type, etag=None):
+        content_range = None
+        if etag and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        elif etag and self.headers.get('Range', '').startswith('bytes=') \
+                and self.headers.get('If-Range', etag) == etag:
+            first, _, last = self.headers['Range'][6:].partition('-')
+            start = int(first)
+            end = min(int(last), len(body) - 1) if last else len(body) - 1
+            content_range = 'bytes {}-{}/{}'.format(start, end, len(body))
+            status, body = 206, body[start:end + 1]
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Accept-Ranges', 'bytes')
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+if __name__ == '__main__':
+    with StandIn() as stand_in:
+        print('Serving on {}'.format(stand_in.url()))
+        print('Config override written to {}'.format(
+            stand_in.config(os.path.abspath('stand_in.ini'))))
+        threading.Event().wait()
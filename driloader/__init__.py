@@ -46,7 +46,21 @@ usage:
     >>> browser = Ie(executable_path=driver_path)
     >>> browser.get("http://www.google.com")
     >>> browser.quit()
+
+ - Getting several drivers at once
+
+    >>> from driloader import driloader
+    >>> paths = driloader.get_drivers(['chrome', 'firefox'])
+    >>> paths['firefox']
+
+ - Timing each phase
+
+    >>> from driloader import driloader
+    >>> with driloader.listen() as events:
+    ...     driloader.chrome().get_driver()
+    >>> [(event.phase, event.duration) for event in events]
 """
 
 
-from .driloader import chrome, firefox, internet_explorer
+from .driloader import chrome, firefox, internet_explorer, get_drivers, \
+    get_drivers_async, listen, subscribe, unsubscribe
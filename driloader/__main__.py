@@ -10,10 +10,20 @@
    http://google.github.io/styleguide/pyguide.html
 """
 import argparse
+import signal
 import sys
+import threading
+import time
 
+from driloader.browser.drivers import Driver
 from driloader.browser.exceptions import BrowserDetectionError
+from driloader.cache.collector import CacheCollector
+from driloader.config.browser_config import BrowserConfig
+from driloader.daemon import DriverDaemon
+from driloader.driloader import BROWSERS
+from driloader.events import Phase, listen
 from driloader.factories.browser_factory import BrowserFactory
+from driloader.utils.commands import Commands
 
 
 class OutputType:
@@ -45,6 +55,8 @@ class CliError(Exception):
 class DriloaderCommands:
     """A facade to BrowserDetection"""
 
+    DEFAULT_TIMEOUT = 10
+
     @staticmethod
     def get_google_chrome_version():
         """ Returns Google Chrome version.
@@ -92,10 +104,13 @@ class DriloaderCommands:
             raise CliError('Unable to get the Internet Explorer version',
                            str(err)) from err
 
-    def get_all_browsers_versions(self):
+    def get_all_browsers_versions(self, timeout=DEFAULT_TIMEOUT):
         """ Returns all browser version.
+        The browsers are detected concurrently, so this takes as long as the
+        slowest detection instead of the sum of all of them.
         Args:
             self
+            timeout: seconds to wait for each browser's detection.
         Returns:
             Returns an string with the browser version. Like:
             Internet Explorer: 11
@@ -106,23 +121,81 @@ class DriloaderCommands:
         """
         result_message = 'Firefox: {}\nGoogle Chrome: ' \
                          '{}\nInternet Explorer: {}\n'
+        probes = (('Firefox', self.get_firefox_version),
+                  ('Google Chrome', self.get_google_chrome_version),
+                  ('Internet Explorer', self.get_internet_explorer_version))
+        versions = {}
+
+        def probe(name, get_version):
+            try:
+                versions[name] = str(get_version())
+            except CliError as error:
+                versions[name] = str(error)
+
+        # Daemon threads, so a hung detection doesn't keep the CLI alive.
+        threads = [threading.Thread(target=probe, args=probe_args, daemon=True)
+                   for probe_args in probes]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0, deadline - time.monotonic()))
+
+        results = []
+        for name, _ in probes:
+            if name in versions:
+                results.append(versions[name])
+            else:
+                results.append('Unable to get the {} version: timed out '
+                               'after {} seconds'.format(name, timeout))
+        return result_message.format(*results)
 
+    @staticmethod
+    def collect_garbage():
+        """ Removes old drivers from the drivers folder.
+        Drivers unused for longer than cache_max_age_days are removed, then
+        the least recently used ones until the folder fits in
+        cache_max_size_mb.
+        Returns:
+            Returns a string listing the removed drivers.
+        Raises:
+            CliError: Case the drivers folder can't be cleaned.
+        """
+        collector = CacheCollector.from_config(Driver().create_folder(),
+                                               BrowserConfig('GENERAL'))
         try:
-            ff_version = str(self.get_firefox_version())
-        except CliError as error:
-            ff_version = str(error)
+            with Phase('gc') as phase:
+                removed = collector.collect()
+                phase.bytes = sum(folder.size for folder in removed)
+        except OSError as err:
+            raise CliError('Unable to clean the drivers folder', str(err)) from err
+        lines = ['Removed: {}'.format(folder.path) for folder in removed]
+        lines.append('Freed {:.1f} MB.'.format(
+            sum(folder.size for folder in removed) / 1024 ** 2))
+        return '\n'.join(lines)
 
+    @staticmethod
+    def run_daemon():
+        """ Runs the driver daemon until interrupted.
+        Every get_driver() on the host asks it for drivers while it runs,
+        through a Unix socket in the drivers folder.
+        Returns:
+            Returns a string saying the daemon stopped.
+        Raises:
+            CliError: Case the daemon can't listen on its socket.
+        """
+        daemon = DriverDaemon(Driver().create_folder(), BROWSERS)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
         try:
-            chrome_version = str(self.get_google_chrome_version())
-        except CliError as error:
-            chrome_version = str(error)
-
+            daemon.listen()
+        except OSError as err:
+            raise CliError('Unable to start the daemon', str(err)) from err
+        print('Listening on {}'.format(daemon.path), flush=True)
         try:
-            ie_version = str(self.get_internet_explorer_version())
-        except CliError as error:
-            ie_version = str(error)
-
-        return result_message.format(ff_version, chrome_version, ie_version)
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 'Daemon stopped.'
 
 
 def parse_args():
@@ -130,7 +203,7 @@ def parse_args():
     Parse arguments from stdin.
     Args:
     Returns:
-        A string argument from stdin.
+        A tuple with the selected option name and the parsed arguments.
     Raises:
         None
     """
@@ -153,12 +226,54 @@ def parse_args():
                         help='look for browser an get their versions.',
                         action='store_true')
 
+    action.add_argument('--gc',
+                        help='remove old drivers from the drivers folder.',
+                        action='store_true')
+
+    action.add_argument('--daemon',
+                        help='serve drivers to every process on this host.',
+                        action='store_true')
+
+    parser.add_argument('--timeout', type=float,
+                        default=DriloaderCommands.DEFAULT_TIMEOUT,
+                        help='seconds to wait for each browser with --all.')
+
+    parser.add_argument('--timings',
+                        help='print how long each phase took.',
+                        action='store_true')
+
     args = parser.parse_args()
 
-    for key, value in args.__dict__.items():
-        if value is True:
-            return key
-    return None
+    for option in action._group_actions:  # pylint: disable=protected-access
+        if getattr(args, option.dest) is True:
+            return option.dest, args
+    return None, args
+
+
+def format_timings(events):
+    """ Format Timings
+    Formats the events emitted while running a command, one line per
+    phase, with its duration, bytes and cache hit or miss.
+    Args:
+        events: a list of driloader.events.Event.
+    Returns:
+        A string with the breakdown.
+    Raises:
+        None
+    """
+    lines = ['Timings:']
+    for event in events:
+        line = '  {:<10}{:<12}{:>9.1f} ms'.format(event.browser or '-',
+                                                  event.phase,
+                                                  event.duration * 1000)
+        if event.cache_hit is not None:
+            line += '  cache {}'.format('hit' if event.cache_hit else 'miss')
+        if event.bytes:
+            line += '  {} bytes'.format(event.bytes)
+        if event.url:
+            line += '  {}'.format(event.url)
+        lines.append(line)
+    return '\n'.join(lines)
 
 
 def display_output(message, output_type=OutputType.INFO):
@@ -204,23 +319,39 @@ def main():
         None
     """
 
-    option = parse_args()
+    option, args = parse_args()
+    # Detection commands are killed once the --timeout deadline is reached,
+    # instead of outliving the CLI.
+    Commands.timeout = args.timeout
     commands = DriloaderCommands()
     options = {
         'chrome': commands.get_google_chrome_version,
         'firefox': commands.get_firefox_version,
         'internet_explorer': commands.get_internet_explorer_version,
-        'all': commands.get_all_browsers_versions
+        'all': lambda: commands.get_all_browsers_versions(args.timeout),
+        'gc': commands.collect_garbage,
+        'daemon': commands.run_daemon
     }
     message = ''
+    events = []
 
     try:
-        result = options[option]()
-        message = result
+        # A daemon serves requests until it's stopped, so its events are
+        # never collected: the list would only grow.
+        if args.timings and option != 'daemon':
+            with listen() as events:
+                message = options[option]()
+        else:
+            message = options[option]()
 
     except CliError as cli_error:
-        display_output(str(cli_error), OutputType.ERROR)
+        message = str(cli_error)
+        if args.timings:
+            message = '{}\n{}'.format(message, format_timings(events))
+        display_output(message, OutputType.ERROR)
 
+    if args.timings:
+        message = '{}\n{}'.format(message, format_timings(events))
     display_output(message, OutputType.INFO)
 
 
@@ -1,25 +1,58 @@
+# pylint: disable=import-outside-toplevel
 """
 Module that abstract all common operations to find right browser versions.
 """
 
+import os
+import re
+import shutil
+import tempfile
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 
 from driloader.browser.drivers import Driver
+from driloader.browser.exceptions import BrowserDetectionError
+from driloader.cache.collector import CacheCollector
+from driloader.cache.detection import DetectionCache
+from driloader.cache.manifest import Manifest
+from driloader.cache.resolution import ResolutionCache
+from driloader.config.compatibility import CompatibilityDatabase
 from driloader.config.paths import Paths
+from driloader.daemon import DaemonClient
+from driloader.events import Phase
+from driloader.http.async_operations import AsyncHttpOperations
 from driloader.http.operations import HttpOperations
-from driloader.http.proxy import Proxy
 from driloader.config.browser_config import BrowserConfig
+from driloader.utils.commands import Commands, CommandError
 from driloader.utils.file import FileHandler
+from driloader.utils.lock import FileLock
 
 
-class BaseBrowser(ABC):
+class BaseBrowser(ABC):  # pylint: disable=too-many-instance-attributes
 
     """
     Provides all common methods to detect best matches.
+
+    Getting a driver runs a staged pipeline: detect the installed browser,
+    fetch the version metadata, match a driver version and fetch the
+    artifact. Each stage runs lazily, at most once per instance, and nothing
+    is fetched at construction time.
+
+    Every stage has a blocking and an async version, sharing the same
+    parsing code and memoized results.
     """
 
-    def __init__(self, browser_name):
+    _display_name = ''
+
+    def __init__(self, browser_name, driver: Driver):
         self._config = BrowserConfig(browser_name)
+        self._driver = driver
+        self._cache_ttl = self._config.resolution_ttl()
+        self._refresh = False
+        self._stages = {}
+        self._download = None
+        self._listeners = []
+        self._use_daemon = True
 
     @abstractmethod
     def _latest_driver(self):
@@ -36,43 +69,618 @@ class BaseBrowser(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def installed_browser_version(self):
+    async def _driver_matching_installed_version_async(self, http):
+        """
+        Async version of _driver_matching_installed_version.
+        :param http: an AsyncHttpOperations.
         """
-        Detects the browser version.
+        raise NotImplementedError
+
+    @abstractmethod
+    def _detection_commands(self):
+        """
+        Returns the commands that print the browser version, in the order
+        they're tried.
         """
         raise NotImplementedError
 
+    def _parse_browser_version(self, output):
+        """
+        Extracts the major version from a detection command's output.
+        """
+        reg = self._config.search_regex().search(str(output))
+        return int(re.split(r'[,.]', reg.group(0))[0])
+
+    def _metadata_version(self):
+        """
+        Reads the browser major version from its install metadata, without
+        running anything.
+        :return: the major version, or None if there's none to read.
+        """
+        return None
+
+    def _version_from_metadata(self):
+        try:
+            return self._metadata_version()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _probe_binary(self, command):
+        """
+        Returns the browser binary a detection command reports the version
+        of, used to key the detection cache. None disables the cache.
+        """
+        return command[0]
+
+    def _detection_cache(self):
+        return DetectionCache(self._driver.create_folder())
+
+    def _detect_browser_version(self):
+        """
+        Detects the browser version from the install metadata or, if there's
+        none, by running the detection commands until one of them succeeds.
+        A version detected before from the same, unchanged, binary is reused
+        without running anything.
+        """
+        with self._phase('detect') as phase, self._detection_errors():
+            version = self._known_browser_version(phase)
+            if version is not None:
+                return version
+            error = CommandError('No command to detect the version.')
+            for command in self._detection_commands():
+                version = self._cached_browser_version(command, phase)
+                if version is not None:
+                    return version
+                try:
+                    return self._detected_browser_version(
+                        command, Commands.run(command))
+                except CommandError as command_error:
+                    error = command_error
+            raise error
+
+    async def _detect_browser_version_async(self):
+        """
+        Async version of _detect_browser_version.
+        """
+        with self._phase('detect') as phase, self._detection_errors():
+            version = self._known_browser_version(phase)
+            if version is not None:
+                return version
+            error = CommandError('No command to detect the version.')
+            for command in self._detection_commands():
+                version = self._cached_browser_version(command, phase)
+                if version is not None:
+                    return version
+                try:
+                    output = await Commands.run_async(command)
+                    return self._detected_browser_version(command, output)
+                except CommandError as command_error:
+                    error = command_error
+            raise error
+
+    def _known_browser_version(self, phase):
+        """
+        Returns the version read from the install metadata, or None.
+        """
+        version = self._version_from_metadata()
+        phase.cache_hit = version is not None
+        return version
+
+    def _cached_browser_version(self, command, phase):
+        """
+        Returns the version a command detected before from the same,
+        unchanged, binary, or None.
+        """
+        version = self._detection_cache().get(self._driver.browser,
+                                              self._probe_binary(command))
+        if version is not None:
+            phase.cache_hit = True
+        return version
+
+    def _detected_browser_version(self, command, output):
+        """
+        Parses a detection command's output and caches the version.
+        """
+        version = self._parse_browser_version(output)
+        self._detection_cache().set(self._driver.browser,
+                                    self._probe_binary(command), version)
+        return version
+
+    @contextmanager
+    def _detection_errors(self):
+        """
+        Turns any detection failure into a BrowserDetectionError.
+        """
+        try:
+            yield
+        except BrowserDetectionError:
+            raise
+        except Exception as error:
+            raise BrowserDetectionError(
+                'Unable to retrieve {} version from system'.format(
+                    self._display_name), error) from error
+
+    def installed_browser_version(self):
+        """
+        Returns the installed browser major version, detecting it once.
+        """
+        return self._stage('detect', self._detect_browser_version)
+
+    async def installed_browser_version_async(self):
+        """
+        Async version of installed_browser_version.
+        """
+        return await self._stage_async('detect',
+                                       self._detect_browser_version_async)
+
     def get_driver(self):
         """
         API to download and unzip the driver.
+
+        A driver already installed for the detected browser major version
+        is found in the installed drivers manifest and returned without any
+        network request. When a driver daemon is running, it's asked first.
+        The driver is marked in use, so the cache collector of no process
+        removes it while this one runs.
+        :return: the path of the driver binary.
         """
-        raise NotImplementedError
+        return self._in_use(self._stage('artifact', self._fetch_artifact))
+
+    async def get_driver_async(self, http=None):
+        """
+        Async version of get_driver. Detection runs as an async subprocess
+        and HTTP goes through a non-blocking client, so many drivers can be
+        provisioned concurrently on one event loop.
+        :param http: an AsyncHttpOperations to share between calls. A new
+        one is created and closed if not given.
+        """
+        if http is None:
+            async with AsyncHttpOperations() as session:
+                return await self.get_driver_async(session)
+        return self._in_use(await self._stage_async(
+            'artifact', lambda: self._fetch_artifact_async(http)))
+
+    @staticmethod
+    def _in_use(binary_path):
+        CacheCollector.mark_in_use(os.path.dirname(binary_path))
+        return binary_path
+
+    def _fetch_artifact(self):
+        """
+        Returns the driver the daemon got, the installed driver from the
+        manifest, or resolves the driver version, downloads it and records
+        it.
+        """
+        binary_path = self._driver_from_daemon()
+        if binary_path:
+            return binary_path
+        with self._phase('get_driver') as phase:
+            major_version = self._installed_major_version()
+            phase.cache_hit = True
+            installed = self._installed_driver(major_version)
+            if installed:
+                return installed
+            phase.cache_hit = False
+            self._driver.version = self._resolve_driver_version()
+            binary_path = self._download_and_unzip(
+                HttpOperations(), self._driver, FileHandler(),
+                replace_version=True)
+            self._record_install(major_version, binary_path)
+            self._collect_garbage(binary_path)
+            return binary_path
+
+    async def _fetch_artifact_async(self, http):
+        """
+        Async version of _fetch_artifact.
+        """
+        import asyncio
+        binary_path = await self._driver_from_daemon_async()
+        if binary_path:
+            return binary_path
+        with self._phase('get_driver') as phase:
+            major_version = await self._installed_major_version_async()
+            phase.cache_hit = True
+            installed = self._installed_driver(major_version)
+            if installed:
+                return installed
+            phase.cache_hit = False
+            self._driver.version = await self._stage_async(
+                'match', lambda: self._match_driver_version_async(http))
+            binary_path = await self._download_and_unzip_async(
+                http, self._driver, FileHandler())
+            self._record_install(major_version, binary_path)
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._collect_garbage, binary_path)
+            return binary_path
+
+    def use_daemon(self, value=True):
+        """
+        Sets whether get_driver asks the driver daemon, when one is running.
+        """
+        self._use_daemon = value
+        return self
+
+    def _daemon(self):
+        return DaemonClient(self._driver.create_folder())
+
+    def _daemon_request(self):
+        """
+        Returns the request asking the daemon for this browser's driver, or
+        None if this instance is set up in a way the daemon doesn't know.
+        """
+        if not self._use_daemon or self._refresh or \
+                self._cache_ttl != self._config.resolution_ttl():
+            return None
+        return {'browser': self._driver.browser}
+
+    def _driver_from_daemon(self):
+        """
+        Asks the daemon for the driver.
+        :return: the binary path, or None if no daemon got it.
+        """
+        request = self._daemon_request()
+        if request is None:
+            return None
+        with self._phase('daemon') as phase:
+            answer = self._daemon().get_driver(request)
+            phase.cache_hit = answer is not None
+        return self._daemon_answer(answer)
+
+    async def _driver_from_daemon_async(self):
+        """
+        Async version of _driver_from_daemon.
+        """
+        request = self._daemon_request()
+        if request is None:
+            return None
+        with self._phase('daemon') as phase:
+            answer = await self._daemon().get_driver_async(request)
+            phase.cache_hit = answer is not None
+        return self._daemon_answer(answer)
+
+    def _daemon_answer(self, answer):
+        if answer is None:
+            return None
+        self._driver.version = answer['version']
+        return answer['path']
+
+    def _installed_major_version(self):
+        """
+        Returns the installed browser major version, or None if it can't be
+        detected.
+        """
+        try:
+            return self.installed_browser_version()
+        except BrowserDetectionError:
+            return None
+
+    async def _installed_major_version_async(self):
+        """
+        Async version of _installed_major_version.
+        """
+        try:
+            return await self.installed_browser_version_async()
+        except BrowserDetectionError:
+            return None
+
+    def _manifest(self):
+        return Manifest(self._driver.create_folder())
+
+    def _installed_driver(self, major_version):
+        """
+        Looks up a driver installed for major_version in the manifest.
+        :return: the binary path, or None if there's none or a refresh was
+        asked for.
+        """
+        if self._refresh:
+            return None
+        with self._phase('manifest') as phase:
+            manifest = self._manifest()
+            entry = manifest.find(self._driver.browser, major_version,
+                                  self._driver.platform())
+            phase.cache_hit = entry is not None
+            if not entry:
+                return None
+            manifest.touch(entry)
+        self._driver.version = entry['driver_version']
+        return entry['binary_path']
+
+    def _record_install(self, major_version, binary_path):
+        """
+        Records an installed driver in the manifest.
+        """
+        self._manifest().record(self._driver, major_version, binary_path,
+                                FileHandler.sha256(binary_path))
+
+    def on_event(self, callback):
+        """
+        Registers a callback receiving an Event, with its duration, bytes,
+        cache hit and url, for each phase of this browser's get_driver.
+        """
+        self._listeners.append(callback)
+        return self
+
+    def _phase(self, name, url=None):
+        return Phase(name, self._driver.browser, url, self._listeners)
+
+    def _stage(self, name, compute):
+        """
+        Returns the result of a pipeline stage, computing it only on the
+        first call.
+        :param name: the stage name.
+        :param compute: a callable that computes the stage result.
+        """
+        if name not in self._stages:
+            self._stages[name] = compute()
+        return self._stages[name]
+
+    async def _stage_async(self, name, compute):
+        """
+        Async version of _stage.
+        :param compute: a callable that returns an awaitable.
+        """
+        if name not in self._stages:
+            self._stages[name] = await compute()
+        return self._stages[name]
+
+    def cache_ttl(self, seconds):
+        """
+        Sets how long, in seconds, a resolved driver version is reused.
+        Zero disables the resolution cache.
+        """
+        self._cache_ttl = seconds
+        return self
+
+    def refresh(self, value=True):
+        """
+        Forces the driver version to be resolved again, ignoring any
+        cached resolution and fetching the metadata again. The detected
+        browser version is kept.
+        """
+        self._refresh = value
+        for name in ('metadata', 'match', 'artifact'):
+            self._stages.pop(name, None)
+        if value:
+            self._forget_metadata()
+        return self
+
+    def _forget_metadata(self):
+        """
+        Drops the metadata memoized beyond this instance, so a refresh
+        fetches it again.
+        """
+
+    def _resolve_driver_version(self):
+        """
+        Returns the driver version matching the installed browser, using the
+        resolution cache when possible.
+        """
+        return self._stage('match', self._match_driver_version)
+
+    def _match_driver_version(self):
+        major_version = self._installed_major_version()
+        with self._phase('metadata') as phase:
+            cache, key = self._resolution_cache(major_version)
+            version = self._known_driver_version(cache, key, major_version)
+            phase.cache_hit = bool(version)
+            if version:
+                return version
+            phase.url = self._metadata_url(major_version)
+            try:
+                version = self._driver_matching_installed_version()
+            except OSError as error:
+                return self._offline_driver_version(major_version, error)
+            self._remember_driver_version(cache, key, major_version, version)
+            return version
+
+    async def _match_driver_version_async(self, http):
+        major_version = await self._installed_major_version_async()
+        with self._phase('metadata') as phase:
+            cache, key = self._resolution_cache(major_version)
+            version = self._known_driver_version(cache, key, major_version)
+            phase.cache_hit = bool(version)
+            if version:
+                return version
+            phase.url = self._metadata_url(major_version)
+            try:
+                version = await self._driver_matching_installed_version_async(
+                    http)
+            except OSError as error:
+                return self._offline_driver_version(major_version, error)
+            self._remember_driver_version(cache, key, major_version, version)
+            return version
+
+    def _metadata_url(self, major_version):  # pylint: disable=unused-argument
+        """
+        Returns the url the driver version for major_version is resolved
+        from, for the metadata phase event.
+        """
+        return self._config.latest_release_url()
+
+    def _resolution_cache(self, major_version):
+        """
+        Returns the resolution cache and the key of this browser's entry.
+        """
+        cache = ResolutionCache(self._driver.create_folder(), self._cache_ttl)
+        key = cache.key(self._driver.browser, major_version,
+                        self._driver.platform())
+        return cache, key
+
+    def _compatibility(self):
+        return CompatibilityDatabase(self._driver.create_folder())
+
+    def _known_driver_version(self, cache, key, major_version):
+        """
+        Returns the driver version resolved less than cache_ttl seconds ago
+        or, failing that, the one the compatibility database maps
+        major_version to. Nothing is known when a refresh was asked for.
+        """
+        if self._refresh:
+            return None
+        return cache.get(key) or self._compatibility().find(
+            self._driver.browser, major_version, self._cache_ttl)
+
+    def _offline_driver_version(self, major_version, error):
+        """
+        Returns the driver version to use when the metadata can't be
+        fetched.
+        :param error: the OSError fetching it failed with.
+        :raise OSError: error, if the compatibility database has none.
+        """
+        version = self._compatibility().fallback(self._driver.browser,
+                                                 major_version)
+        if not version:
+            raise error
+        return version
+
+    def _remember_driver_version(self, cache, key, major_version, version):
+        """
+        Stores a driver version resolved over the network in the resolution
+        cache and in the compatibility database overlay.
+        """
+        if version:
+            cache.set(key, version)
+            self._compatibility().record(self._driver.browser, major_version,
+                                         version)
+
+    def _collect_garbage(self, binary_path):
+        """
+        Evicts old drivers after an install, keeping the one just installed.
+        A failed collection never fails the install.
+        """
+        collector = CacheCollector.from_config(self._driver.create_folder(),
+                                               self._config)
+        with self._phase('gc') as phase:
+            try:
+                phase.bytes = sum(folder.size for folder in collector.collect(
+                    keep=[os.path.dirname(binary_path)]))
+            except OSError:
+                pass
 
     def _download_and_unzip(self, http: HttpOperations, driver: Driver,
                             file: FileHandler, replace_version=False):
         """
         Downloads and unzip the driver.
+
+        Concurrent installs of the same driver, from any process, are
+        serialised by a file lock: the first one downloads and extracts into
+        a temp folder and renames the binary into place, the others wait and
+        reuse it.
+        :return: the path of the driver binary.
+        """
+        paths, zipped_file_path, download_url = self._artifact_locations(
+            driver, replace_version)
+        driver_file_path = paths.driver_file_path()
+        if not driver.exists(driver_file_path):
+            with FileLock(paths.unzipped_file_path() + '.lock'):
+                if not driver.exists(driver_file_path):
+                    tmp_path = tempfile.mkdtemp(
+                        prefix='.install-', dir=paths.unzipped_file_path())
+                    try:
+                        archive = os.path.join(
+                            tmp_path, os.path.basename(zipped_file_path))
+                        with self._phase('download', download_url) as phase:
+                            self._download = http.download(download_url,
+                                                           archive)
+                            phase.bytes = getattr(self._download, 'size', 0)
+                        self._publish(archive, driver_file_path, driver, file)
+                    finally:
+                        shutil.rmtree(tmp_path, ignore_errors=True)
+        return driver_file_path
+
+    async def _download_and_unzip_async(self, http, driver: Driver,
+                                        file: FileHandler):
+        """
+        Async version of _download_and_unzip. The archive is downloaded
+        and the lock waited for without blocking; extracting runs in the
+        default executor.
+        """
+        import asyncio
+
+        paths, zipped_file_path, download_url = \
+            await self._artifact_locations_async(http, driver,
+                                                 replace_version=True)
+        driver_file_path = paths.driver_file_path()
+        loop = asyncio.get_running_loop()
+        if not driver.exists(driver_file_path):
+            lock = FileLock(paths.unzipped_file_path() + '.lock')
+            await lock.acquire_async()
+            try:
+                if not driver.exists(driver_file_path):
+                    tmp_path = tempfile.mkdtemp(
+                        prefix='.install-', dir=paths.unzipped_file_path())
+                    try:
+                        archive = os.path.join(
+                            tmp_path, os.path.basename(zipped_file_path))
+                        with self._phase('download', download_url) as phase:
+                            self._download = await http.download(
+                                download_url, archive)
+                            phase.bytes = getattr(self._download, 'size', 0)
+                        await loop.run_in_executor(
+                            None, self._publish, archive, driver_file_path,
+                            driver, file)
+                    finally:
+                        shutil.rmtree(tmp_path, ignore_errors=True)
+            finally:
+                lock.release()
+        return driver_file_path
+
+    def _publish(self, archive, driver_file_path, driver: Driver,
+                 file: FileHandler):
+        """
+        Extracts the driver next to its archive, makes it executable and
+        atomically renames it to driver_file_path, so no process ever sees a
+        partially written binary.
+        """
+        with self._phase('extract') as phase:
+            extracted = file.extract_member(archive,
+                                            self._config.unzipped_file_name(),
+                                            os.path.dirname(archive),
+                                            delete_after_extract=True)
+            phase.bytes = os.path.getsize(extracted)
+        with self._phase('chmod'):
+            if not extracted.endswith('.exe'):
+                driver.make_executable(extracted)
+            os.replace(extracted, driver_file_path)
+
+    def _artifact_locations(self, driver: Driver, replace_version):
+        """
+        Returns the Paths of the driver, where its archive is saved and the
+        url it's downloaded from.
         """
         paths = Paths(driver.create_folder(), self, driver)
-        unzipped_file_path = paths.unzipped_file_path()
+        zipped_file_path = paths.zipped_file_path(
+            replace_version=driver.version)
         if replace_version:
-            zipped_file_path = paths.zipped_file_path(
-                replace_version=driver.version)
             download_url = paths.download_url(
                 replace_version=driver.version)
         else:
-            zipped_file_path = paths.zipped_file_path(
-                replace_version=driver.version)
             download_url = paths.download_url()
-        if not driver.exists(unzipped_file_path):
-            response = http.get(download_url, verify=False,
-                                proxies=Proxy().urls)
-            file.write_content(zipped_file_path, response.content)
-            FileHandler.unzip(zipped_file_path, unzipped_file_path,
-                              delete_after_extract=True)
-        if not paths.unzipped_file_path().endswith('.exe'):
-            driver.make_executable(unzipped_file_path)
-        return unzipped_file_path
+        return paths, zipped_file_path, download_url
+
+    async def _artifact_locations_async(  # pylint: disable=unused-argument
+            self, http, driver: Driver, replace_version):
+        """
+        Async version of _artifact_locations.
+        :param http: an AsyncHttpOperations, for subclasses that fetch
+        metadata to locate the artifact.
+        """
+        return self._artifact_locations(driver, replace_version)
+
+    @property
+    def last_download(self):
+        """
+        Return the Download made by the last get_driver call, with its size,
+        hash and throughput, or None if the driver was already on disk.
+        """
+        return self._download
+
+    @property
+    def driver(self):
+        """
+        Return the driver being resolved.
+        """
+        return self._driver
 
     @property
     def config(self):
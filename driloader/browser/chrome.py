@@ -1,3 +1,4 @@
+# pylint: disable=import-outside-toplevel
 """
 
 Module that abstract operations to handle Chrome versions.
@@ -6,17 +7,15 @@ Module that abstract operations to handle Chrome versions.
 
 import os
 import re
+import sys
 
-import requests
-
-from driloader.browser.exceptions import \
-    BrowserDetectionError, BrowserNotSupportedError
-from driloader.http.proxy import Proxy
-from driloader.utils.commands import Commands, CommandError
+from driloader.browser.exceptions import BrowserNotSupportedError
+from driloader.http.bucket import BucketListing
+from driloader.http.chrome_for_testing import ChromeForTesting
+from driloader.http.operations import HttpOperations
+from driloader.utils.versions import version_tuple
 from .basebrowser import BaseBrowser
 from .drivers import Driver
-from ..http.operations import HttpOperations
-from ..utils.file import FileHandler
 
 
 class Chrome(BaseBrowser):
@@ -25,19 +24,21 @@ class Chrome(BaseBrowser):
     Implements all BaseBrowser methods to find the proper Chrome version.
     """
 
-    _installed_version = None
     __default_path_win = r'C:\\Program Files (x86)\\Google\\Chrome' \
                          r'\\Application\\chrome.exe'
+    __default_path_mac = '/Applications/Google Chrome.app/Contents/MacOS/' \
+                         'Google Chrome'
     __chrome_launch_unix = 'google-chrome'
     __chrome_launch_fallback_unix = 'google-chrome-stable'
     __browser_name = 'chrome'
-    __chrome_version_regex = r'----------ChromeDriver v((?:\d+\.?)+)'\
-                             r' \((?:\d+-?)+\)----------\n' \
-                             r'Supports Chrome v((?:\d+-?)+)'
+    _display_name = 'Chrome'
+    __chrome_version_regex = re.compile(
+        r'----------ChromeDriver v((?:\d+\.?)+)'
+        r' \((?:\d+-?)+\)----------\n'
+        r'Supports Chrome v((?:\d+-?)+)')
 
     def __init__(self, driver: Driver):
-        super().__init__('CHROME')
-        self._driver = driver
+        super().__init__('CHROME', driver)
         self._install_path = None
 
     def binary(self, value):
@@ -45,30 +46,73 @@ class Chrome(BaseBrowser):
         Sets the path. If not set, it will try the default.
         """
         self._install_path = value
+        self._stages.clear()
         return self
 
+    def _daemon_request(self):
+        """
+        The daemon only knows the default Chrome install.
+        """
+        if self._install_path:
+            return None
+        return super()._daemon_request()
+
     def _mount_chrome_dict(self):
         """
         Creates the file that matches the version with installed chrome.
         """
-        installed_version = self.installed_browser_version()
+        versions_url = self._notes_url(self.installed_browser_version())
+        if versions_url is None:
+            return None
+        resp = HttpOperations.get_cached(versions_url)
+        return self._parse_notes(resp.text)
+
+    async def _mount_chrome_dict_async(self, http):
+        """
+        Async version of _mount_chrome_dict.
+        """
+        versions_url = self._notes_url(
+            await self.installed_browser_version_async())
+        if versions_url is None:
+            return None
+        _, text = await http.get_text(versions_url)
+        return self._parse_notes(text)
+
+    def _notes_url(self, installed_version):
+        """
+        Returns the notes.txt url listing the drivers for installed_version,
+        or None for versions whose drivers are listed in the bucket.
+        """
         if installed_version >= 70:
             return None
         if installed_version >= 43:
-            versions_url = self._config.versions_url().replace('{version}',
-                                                               '2.46')
-        elif installed_version >= 29:
-            versions_url = self._config.versions_url().replace('{version}',
-                                                               '2.9')
-        else:
-            raise BrowserNotSupportedError('Sorry, but we don\'t support'
-                                           'Chrome versions below 29.',
-                                           'Browser not supported')
+            return self._config.template('versions_url').render(
+                version='2.46')
+        if installed_version >= 29:
+            return self._config.template('versions_url').render(
+                version='2.9')
+        raise BrowserNotSupportedError('Sorry, but we don\'t support'
+                                       'Chrome versions below 29.',
+                                       'Browser not supported')
 
-        chrome_json = {}
+    def _metadata_url(self, major_version):
+        """
+        Returns the first Chrome for Testing index for Chrome 115 and later,
+        the notes listing the drivers for older versions, or the bucket.
+        """
+        if major_version is None:
+            return None
+        if major_version >= ChromeForTesting.FIRST_MAJOR:
+            return self._config.last_known_good_url()
+        return self._notes_url(major_version) or self._config.bucket_url()
 
-        resp = requests.get(versions_url, proxies=Proxy().urls)
-        result = re.findall(Chrome.__chrome_version_regex, resp.text)
+    @staticmethod
+    def _parse_notes(text):
+        """
+        Parses notes.txt into a dict of driver version to supported range.
+        """
+        chrome_json = {}
+        result = Chrome.__chrome_version_regex.findall(text)
 
         for obj in result:
             _from = obj[1].rpartition('-')[0]
@@ -81,10 +125,8 @@ class Chrome(BaseBrowser):
         Gets the latest chrome driver version.
         :return: the latest chrome driver version.
         """
-        resp = requests.get(self._config.latest_release_url(),
-                            proxies=Proxy().urls)
-        reg = re.search(re.compile(self._config.search_regex_pattern()),
-                        resp.text)
+        resp = HttpOperations.get_cached(self._config.latest_release_url())
+        reg = self._config.search_regex().search(resp.text)
         return str(reg.group(0))
 
     def _driver_matching_installed_version(self):
@@ -93,14 +135,73 @@ class Chrome(BaseBrowser):
         :return: the right version to work with installed browser.
         """
 
-        if not self._mount_chrome_dict():
+        installed_version = self.installed_browser_version()
+        if installed_version >= ChromeForTesting.FIRST_MAJOR:
+            return self._chrome_for_testing().find(installed_version)
+        chrome_dict = self._stage('metadata', self._mount_chrome_dict)
+        if not chrome_dict:
             return self._get_latest_driver_version_from_chrome_version(
-                self.installed_browser_version())
+                installed_version)
+        return self._match_notes(installed_version, chrome_dict)
+
+    async def _driver_matching_installed_version_async(self, http):
+        installed_version = await self.installed_browser_version_async()
+        if installed_version >= ChromeForTesting.FIRST_MAJOR:
+            return await self._chrome_for_testing().find_async(
+                http, installed_version)
+        chrome_dict = await self._stage_async(
+            'metadata', lambda: self._mount_chrome_dict_async(http))
+        if not chrome_dict:
+            listing = BucketListing(self._config.bucket_url())
+            keys = await listing.keys_async(
+                http, prefix='{}.'.format(installed_version))
+            return self._latest_build(installed_version, keys)
+        return self._match_notes(installed_version, chrome_dict)
+
+    def _chrome_for_testing(self):
+        """
+        Returns the Chrome for Testing index, revalidated after this
+        browser's cache_ttl, or right away when refreshing.
+        """
+        return ChromeForTesting.from_config(
+            self._driver.create_folder(), self._config,
+            0 if self._refresh else self._cache_ttl)
+
+    def _artifact_locations(self, driver: Driver, replace_version):
+        """
+        Drivers for Chrome 115 and later are downloaded from the url listed
+        in the Chrome for Testing index.
+        """
+        paths, zipped_file_path, download_url = super()._artifact_locations(
+            driver, replace_version)
+        if Chrome._from_chrome_for_testing(driver):
+            download_url = self._chrome_for_testing().url(driver.version) \
+                or download_url
+        return paths, zipped_file_path, download_url
+
+    async def _artifact_locations_async(self, http, driver: Driver,
+                                        replace_version):
+        paths, zipped_file_path, download_url = super()._artifact_locations(
+            driver, replace_version)
+        if Chrome._from_chrome_for_testing(driver):
+            download_url = await self._chrome_for_testing().url_async(
+                http, driver.version) or download_url
+        return paths, zipped_file_path, download_url
 
-        for attr, value in self._mount_chrome_dict().items():
+    @staticmethod
+    def _from_chrome_for_testing(driver: Driver):
+        return version_tuple(driver.version)[:1] >= \
+            (ChromeForTesting.FIRST_MAJOR,)
+
+    @staticmethod
+    def _match_notes(installed_version, chrome_dict):
+        """
+        Returns the first driver in chrome_dict supporting installed_version.
+        """
+        for attr, value in chrome_dict.items():
             version_range = range(int(value.get('from')),
                                   int(value.get('to')) + 1)
-            if self.installed_browser_version() in version_range:
+            if installed_version in version_range:
                 return attr
         return None
 
@@ -109,74 +210,80 @@ class Chrome(BaseBrowser):
         Some browser versions may have more than one available. This method
         assures it will get always the last driver version.
         """
-        http = HttpOperations()
-        index_page = http.get_html(self._config.index_url())
-        index_page.html.render(sleep=3)
-        tr_elements = index_page.html.find('body > table tr')
+        listing = BucketListing(self._config.bucket_url())
+        return self._latest_build(
+            installed_version,
+            listing.keys(prefix='{}.'.format(installed_version)))
+
+    def _latest_build(self, installed_version, keys):
+        """
+        Picks the newest build for installed_version out of the bucket keys
+        that hold this platform's driver.
+        """
+        file_name = self._config.zipped_file_name()
         version_matched_list = []
-        for line in tr_elements:
-            try:
-                current_version = line.find('td a')[0].text
-                if current_version.split('.')[0] == str(installed_version):
-                    version_matched_list.append(current_version)
-            except IndexError:
-                pass
+        for key in keys:
+            current_version, _, name = key.partition('/')
+            if current_version.split('.')[0] == str(installed_version) \
+                    and name == file_name:
+                version_matched_list.append(current_version)
         if version_matched_list:
-            return version_matched_list[-1]
+            return max(version_matched_list, key=version_tuple)
         return None
 
-    def installed_browser_version(self):
-        """ Returns Google Chrome version.
-        Args:
-        Returns:
-            Returns an int with the browser version.
-        Raises:
-            BrowserDetectionError: Case something goes wrong when getting
-            browser version.
-        """
-        if self._installed_version is None:
-            try:
-                if os.name == "nt":
-                    # Here we assume the user installed Chrome
-                    # in default directory
-                    if not self._install_path:
-                        app = self.__default_path_win
-                    else:
-                        app = self._install_path
-                    cmd = ['wmic', 'datafile', 'where',
-                           'name="{}"'.format(app), 'get', 'Version', '/value']
-
-                    result = Commands.run(cmd)
-                    res_reg = re.search(self._config.search_regex_pattern(),
-                                        str(result))
-                    str_version = res_reg.group(0)
-                else:
-                    if self._install_path:
-                        str_version = Commands.run('{} --product-version'.
-                                                   format(self._install_path))
-                    else:
-                        try:
-                            str_version = Commands.run(
-                                '{} --product-version'.format(
-                                    self.__chrome_launch_unix))
-                        except CommandError:
-                            str_version = Commands.run(
-                                '{} --product-version'.format(
-                                    self.__chrome_launch_fallback_unix))
-
-            except Exception as error:
-                raise BrowserDetectionError('Unable to retrieve Chrome '
-                                            'version from system', error) from error
-
-            int_version = int(str_version.partition('.')[0])
-            self._installed_version = int_version
-            return int_version
-        return self._installed_version
-
-    def get_driver(self):
-        """
-        API to expose to client to download the driver and unzip it.
-        """
-        self._driver.version = self._driver_matching_installed_version()
-        return self._download_and_unzip(HttpOperations(),
-                                        self._driver, FileHandler())
+    def _metadata_version(self):
+        """
+        Reads the version from the install instead of running Chrome: the
+        versioned folders next to chrome.exe on Windows, or the app bundle's
+        Info.plist on macOS.
+        """
+        if os.name == "nt":
+            folder = os.path.dirname(self._install_path
+                                     or self.__default_path_win)
+            versions = [name for name in os.listdir(folder)
+                        if re.fullmatch(r'\d+(\.\d+){3}', name)]
+            if not versions:
+                return None
+            return int(max(versions, key=version_tuple).partition('.')[0])
+        if sys.platform == 'darwin':
+            binary = os.path.realpath(self._install_path
+                                      or self.__default_path_mac)
+            info_plist = os.path.join(os.path.dirname(binary), os.pardir,
+                                      'Info.plist')
+            import plistlib
+            with open(info_plist, 'rb') as file:
+                info = plistlib.load(file)
+            return int(info['CFBundleShortVersionString'].partition('.')[0])
+        return None
+
+    def _detection_commands(self):
+        """
+        Returns the commands that print Google Chrome's version.
+        """
+        if os.name == "nt":
+            # Here we assume the user installed Chrome
+            # in default directory
+            app = self._install_path or self.__default_path_win
+            return [['wmic', 'datafile', 'where', 'name="{}"'.format(app),
+                     'get', 'Version', '/value']]
+        if self._install_path:
+            return [[self._install_path, '--product-version']]
+        return [[self.__chrome_launch_unix, '--product-version'],
+                [self.__chrome_launch_fallback_unix, '--product-version']]
+
+    def _probe_binary(self, command):
+        """
+        On Windows the version is read by wmic, from chrome.exe.
+        """
+        if os.name == "nt":
+            return self._install_path or self.__default_path_win
+        return command[0]
+
+    def _parse_browser_version(self, output):
+        """
+        Extracts the major version. On Linux and Mac, --product-version
+        prints only the version, like '85.0.4183.102'.
+        """
+        if os.name == "nt":
+            return super()._parse_browser_version(output)
+        return int(output.partition('.')[0])
@@ -2,8 +2,8 @@
 Responsible to implement the class to control driver's info.
 """
 import os
+import platform
 
-from driloader.utils.commands import Commands
 from driloader.utils.file import FileHandler
 
 
@@ -39,6 +39,14 @@ class Driver:
         self.drivers_path = os.path.expanduser('~{0}Driloader{0}Drivers{0}'.format(os.sep))
         return FileHandler.create_folders(self.drivers_path, hidden=True)
 
+    @staticmethod
+    def platform():
+        """
+        Identifies the platform drivers are downloaded for.
+        :return: a string like 'linux-x86_64'.
+        """
+        return '{}-{}'.format(platform.system(), platform.machine()).lower()
+
     @staticmethod
     def exists(path_to_file):
         """
@@ -60,5 +68,5 @@ class Driver:
         """
         Makes the driver executable.
         """
-        make_executable = 'chmod +x {}'.format(file)
-        Commands.run(make_executable)
+        mode = os.stat(file).st_mode
+        os.chmod(file, mode | 0o111)
@@ -23,3 +23,18 @@ class BrowserNotSupportedError(Exception):
         """
         super().__init__(message)
         self.cause = cause
+
+
+class ProvisioningError(Exception):
+    """ ProvisioningError """
+    def __init__(self, message, cause, results=None):
+        """Init method
+        Sets superclass arguments up.
+        Sets the cause of exception up: a dict mapping each browser that
+        failed to its error.
+        Sets the results up: a dict mapping each browser that succeeded to
+        its driver path.
+        """
+        super().__init__(message)
+        self.cause = cause
+        self.results = results or {}
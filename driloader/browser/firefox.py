@@ -5,18 +5,14 @@ Module that abstract operations to handle Chrome versions.
 
 """
 
+import configparser
 import os
 import re
+import shutil
 
-import requests
-
-from driloader.http.proxy import Proxy
-from driloader.utils.commands import Commands
+from driloader.http.operations import HttpOperations
 from .basebrowser import BaseBrowser
 from .drivers import Driver
-from .exceptions import BrowserDetectionError
-from ..http.operations import HttpOperations
-from ..utils.file import FileHandler
 
 
 class Firefox(BaseBrowser):
@@ -24,53 +20,74 @@ class Firefox(BaseBrowser):
     Implements all BaseBrowser methods to find the proper Firefox version.
     """
 
+    _display_name = 'Firefox'
+
     def __init__(self, driver: Driver):
-        super().__init__('FIREFOX')
-        self.driver = driver
-        self.driver.version = self._latest_driver()
+        super().__init__('FIREFOX', driver)
 
     def _latest_driver(self):
         """
        Gets the latest gecko driver version.
        :return: the latest gecko driver version.
        """
-        resp = requests.get(self._config.latest_release_url(),
-                            proxies=Proxy().urls)
-        reg = re.search(r'\d{1,2}[\d.]+', resp.url.rpartition('/')[2])
+        resp = HttpOperations.get_cached(self._config.latest_release_url())
+        return self._parse_latest_driver(resp.url)
+
+    async def _latest_driver_async(self, http):
+        """
+        Async version of _latest_driver.
+        """
+        url, _ = await http.get_text(self._config.latest_release_url())
+        return self._parse_latest_driver(url)
+
+    @staticmethod
+    def _parse_latest_driver(url):
+        """
+        Extracts the version from the release page 'latest' redirects to.
+        """
+        reg = re.search(r'\d{1,2}[\d.]+', url.rpartition('/')[2])
         return reg.group(0)
 
     def _driver_matching_installed_version(self):
-        # TODO: get the right Firefox version
-        return self._latest_driver()
-
-    def installed_browser_version(self):
-        """ Returns Firefox version.
-        Args:
-            self
-        Returns:
-            Returns an int with the browser version.
-        Raises:
-            BrowserDetectionError: Case something goes wrong when getting
-            browser version.
         """
+        Installed versions are matched by the compatibility database. This
+        is the fallback for the ones it doesn't cover: the latest driver.
+        """
+        return self._stage('metadata', self._latest_driver)
 
-        try:
-            if os.name == 'nt':
-                ff_path = self._find_firefox_exe_in_registry()
-                output = Commands.run([ff_path, '-v', '|', 'more'])
-            else:
-                output = Commands.get_command_output('firefox -v')
-
-            if output is not None:
-                out_reg = re.search(self._config.search_regex_pattern(),
-                                    str(output))
-                str_version = out_reg.group(0)
-                int_version = int(str_version.partition(".")[0])
-                return int_version
+    async def _driver_matching_installed_version_async(self, http):
+        return await self._stage_async(
+            'metadata', lambda: self._latest_driver_async(http))
+
+    def _metadata_version(self):
+        """
+        Reads Version from the application.ini shipped next to the Firefox
+        binary, or in Contents/Resources on macOS.
+        """
+        if os.name == 'nt':
+            binary = self._find_firefox_exe_in_registry()
+        else:
+            binary = shutil.which('firefox')
+        if not binary:
             return None
-        except Exception as error:
-            raise BrowserDetectionError('Unable to retrieve Firefox version '
-                                        'from system', error) from error
+        folder = os.path.dirname(os.path.realpath(binary))
+        for path in (os.path.join(folder, 'application.ini'),
+                     os.path.join(folder, os.pardir, 'Resources',
+                                  'application.ini')):
+            if os.path.isfile(path):
+                parser = configparser.ConfigParser(interpolation=None)
+                parser.read(path, encoding='utf-8')
+                return int(parser['App']['Version'].partition('.')[0])
+        return None
+
+    def _detection_commands(self):
+        """
+        Returns the commands that print Firefox's version.
+        """
+        if os.name == 'nt':
+            ff_path = self._find_firefox_exe_in_registry()
+            return [[ff_path, '-v', '|', 'more']]
+        return [['firefox', '-v']]
 
     @staticmethod
     def _find_firefox_exe_in_registry():
@@ -111,7 +128,3 @@ class Firefox(BaseBrowser):
             return ""
 
         return shlex.split(command)[0]
-
-    def get_driver(self):
-        return self._download_and_unzip(HttpOperations(), self.driver,
-                                        FileHandler(), replace_version=True)
@@ -10,17 +10,12 @@ Module that abstract operations to handle Internet Explorer versions.
 import os
 import platform
 import re
-import xml.etree.ElementTree as ET
-
-import requests
 
 from driloader.browser.exceptions import BrowserDetectionError
-from driloader.http.proxy import Proxy
-from driloader.utils.commands import Commands
+from driloader.http.bucket import BucketListing
+from driloader.utils.versions import version_tuple
 from .basebrowser import BaseBrowser
 from .drivers import Driver
-from ..http.operations import HttpOperations
-from ..utils.file import FileHandler
 
 
 class IE(BaseBrowser):
@@ -29,94 +24,104 @@ class IE(BaseBrowser):
     Internet Explorer version.
     """
 
-    _find_version_32_regex = r'IEDriverServer_Win32_([\d]+\.[\d]+\.[\d])'
-    _find_version_64_regex = r'IEDriverServer_x64_([\d]+\.[\d]+\.[\d])'
+    _driver_key_regex = r'(?:^|/)IEDriverServer_{}_(\d+(?:\.\d+)+)\.zip$'
+
+    # The latest driver per (bucket url, os type), shared by every instance
+    # so the listing is walked once per process.
+    _index = {}
+
+    _display_name = 'IE'
 
     def __init__(self, driver: Driver):
-        super().__init__('IE')
+        super().__init__('IE', driver)
         self.x64 = IE._is_windows_x64()
-        self._driver = driver
+
+    def _index_key(self):
+        """
+        Returns the key of this browser's entry in _index.
+        """
+        return self._config.bucket_url(), 'x64' if self.x64 else 'Win32'
+
+    def _metadata_url(self, major_version):
+        return self._config.bucket_url()
 
     def _latest_driver(self):
         """
         Gets the latest ie driver version.
         :return: the latest ie driver version.
         """
-        resp = requests.get(self._config.latest_release_url(),
-                            proxies=Proxy().urls)
-        xml_dl = ET.fromstring(resp.text)
-        root = ET.ElementTree(xml_dl)
-        tag = root.getroot().tag
-        tag = tag.rpartition('}')[0] + tag.rpartition('}')[1]
-        contents = root.findall(tag + 'Contents')
-        last_version = 0
-        version_str = '0.0.0'
-        last_version_str = '0.0.0'
-        if self.x64:
-            pattern = IE._find_version_64_regex
-        else:
-            pattern = IE._find_version_32_regex
-        os_type = 'x64' if self.x64 else 'Win32'
-        for content in contents:
-            key = content.find(tag + 'Key').text
-            driver_section = 'IEDriverServer_{}_'.format(os_type) in key
-            if driver_section:
-                version_nbr = re.search(pattern, key)
-                if version_nbr is not None:
-                    version_str = version_nbr.group(1)
-                try:
-                    if version_str is not None:
-                        version = float(version_str.rpartition('.')[0])
-                    else:
-                        version = 0
-                except ValueError:
-                    version = 0
-                if version >= last_version:
-                    last_version = version
-                    last_version_str = version_str
-        return last_version_str
+        index_key = self._index_key()
+        if index_key not in IE._index:
+            listing = BucketListing(index_key[0])
+            IE._index[index_key] = self._parse_latest_driver(listing.keys())
+        return IE._index[index_key]
+
+    async def _latest_driver_async(self, http):
+        """
+        Async version of _latest_driver.
+        """
+        index_key = self._index_key()
+        if index_key not in IE._index:
+            listing = BucketListing(index_key[0])
+            IE._index[index_key] = self._parse_latest_driver(
+                await listing.keys_async(http))
+        return IE._index[index_key]
+
+    def _forget_metadata(self):
+        IE._index.pop(self._index_key(), None)
+
+    def _parse_latest_driver(self, keys):
+        """
+        Finds the latest driver version in the releases bucket keys. Keys
+        are checked as they stream in, and versions compare as tuples, so
+        3.150.1 is newer than 3.141.59.
+        :param keys: an iterable of object keys.
+        :return: the latest version, or '0.0.0' if there's none.
+        """
+        os_type = self._index_key()[1]
+        name = 'IEDriverServer_{}_'.format(os_type)
+        pattern = re.compile(IE._driver_key_regex.format(os_type))
+        latest = '0.0.0'
+        for key in keys:
+            if name not in key:
+                continue
+            match = pattern.search(key)
+            if match and version_tuple(match.group(1)) > version_tuple(latest):
+                latest = match.group(1)
+        return latest
 
     def _driver_matching_installed_version(self):
-        # TODO: Version matcher for IE.
-        return self._latest_driver()
-
-    def installed_browser_version(self):
-        """ Returns Internet Explorer version.
-        Args:
-        Returns:
-            Returns an int with the browser version.
+        """
+        Installed versions are matched by the compatibility database. This
+        is the fallback for the ones it doesn't cover: the latest driver.
+        """
+        return self._stage('metadata', self._latest_driver)
+
+    async def _driver_matching_installed_version_async(self, http):
+        return await self._stage_async(
+            'metadata', lambda: self._latest_driver_async(http))
+
+    def _detection_commands(self):
+        """
+        Returns the commands that print Internet Explorer's version.
         Raises:
-            BrowserDetectionError: Case something goes wrong when
-            getting browser version.
+            BrowserDetectionError: Case the system is not Windows.
         """
 
         if os.name != "nt":
             raise BrowserDetectionError('Unable to retrieve IE version.',
                                         'System is not Windows.')
 
-        cmd = ['reg', 'query',
-               'HKEY_LOCAL_MACHINE\Software\Microsoft\Internet Explorer',
-               '/v', 'svcVersion']
-
-        try:
-            output = Commands.run(cmd)
-            reg = re.search(self._config.search_regex_pattern(), str(output))
-            str_version = reg.group(0)
-            int_version = int(str_version.partition(".")[0])
-        except Exception as error:
-            raise BrowserDetectionError('Unable to retrieve IE version '
-                                        'from system.', error) from error
+        return [['reg', 'query',
+                 r'HKEY_LOCAL_MACHINE\Software\Microsoft\Internet Explorer',
+                 '/v', 'svcVersion']]
 
-        return int_version
+    def _probe_binary(self, command):
+        """
+        The version is read from the registry, so it's not cached.
+        """
+        return None
 
     @staticmethod
     def _is_windows_x64():
         return platform.machine().endswith('64')
-
-    def get_driver(self):
-        """
-                API to expose to client to download the driver and unzip it.
-                """
-        self._driver.version = self._driver_matching_installed_version()
-        return self._download_and_unzip(HttpOperations(),
-                                        self._driver, FileHandler())
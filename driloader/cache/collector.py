@@ -0,0 +1,250 @@
+"""
+driloader.cache.collector
+-------------------------
+
+Garbage collection for the drivers folder.
+
+Every driver version is installed in its own <browser>/<version> folder and
+nothing removes them, so on long-lived machines old drivers pile up. The
+collector removes the ones unused for longer than a maximum age, then the
+least recently used ones until the folder fits in a size budget.
+
+A driver is never removed while a process that got it from get_driver is
+running: the process holds a shared lock on <browser>/<version>.inuse until
+it exits, and a folder is only removed under the exclusive lock. Drivers
+whose path was got another way, like from the CLI output, can't be tracked
+like that, so as a heuristic a folder used less than GRACE_PERIOD seconds
+ago is left alone too: every get_driver bumps its modification time. A
+folder whose install lock is held is left alone as well. A folder is first
+renamed out of the way, which fails on Windows while its driver runs, and
+only then deleted. Lock files of removed folders and temp folders left by
+interrupted installs are removed too.
+"""
+
+import os
+import shutil
+import time
+from collections import namedtuple
+
+from driloader.cache.manifest import Manifest
+from driloader.utils.lock import FileLock
+
+
+Installed = namedtuple('Installed', 'path size last_used')
+
+
+class CacheCollector:
+    """
+    Evicts driver folders by age and by least recent use.
+
+    A folder in use by a running process, whose install lock is held by
+    another process, or used less than GRACE_PERIOD seconds ago, is never
+    removed, and the folders in keep are never removed either. Only the
+    folders of the known browsers are looked at.
+    """
+
+    BROWSERS = ('chrome', 'firefox', 'ie')
+    GRACE_PERIOD = 3600
+    IN_USE_SUFFIX = '.inuse'
+
+    # The shared locks this process holds on the folders it uses, by folder.
+    _in_use = {}
+
+    def __init__(self, root_path, max_size, max_age):
+        """
+        :param root_path: the drivers root folder.
+        :param max_size: size budget in bytes. Zero disables it.
+        :param max_age: seconds a driver is kept after its last use. Zero
+        disables it.
+        """
+        self.root_path = root_path
+        self.max_size = max_size
+        self.max_age = max_age
+
+    @classmethod
+    def mark_in_use(cls, folder):
+        """
+        Takes a shared lock on a driver folder, held until this process
+        exits, so no collector removes it meanwhile.
+        """
+        folder = os.path.normpath(folder)
+        if folder in cls._in_use:
+            return
+        lock = FileLock(folder + CacheCollector.IN_USE_SUFFIX, shared=True)
+        try:
+            if lock.acquire(blocking=False):
+                cls._in_use[folder] = lock
+        except OSError:
+            pass
+
+    @classmethod
+    def from_config(cls, root_path, config):
+        """
+        Builds a collector with the limits set in browsers.ini.
+        :param config: a BrowserConfig.
+        """
+        return cls(root_path, config.cache_max_size(), config.cache_max_age())
+
+    def installed(self):
+        """
+        Lists the installed driver folders, least recently used first.
+        A folder was last used when the manifest says so or, if it's more
+        recent, at its modification time, which every lookup bumps.
+        :return: a list of Installed.
+        """
+        last_used = {}
+        for entry in Manifest(self.root_path).entries().values():
+            path = os.path.normpath(os.path.dirname(entry['binary_path']))
+            last_used[path] = max(last_used.get(path, 0),
+                                  entry.get('last_used', 0))
+        folders = []
+        for browser in CacheCollector.BROWSERS:
+            for path in _subfolders(os.path.join(self.root_path, browser)):
+                folders.append(Installed(
+                    path, _folder_size(path),
+                    max(last_used.get(path, 0), os.path.getmtime(path))))
+        return sorted(folders, key=lambda folder: folder.last_used)
+
+    def collect(self, keep=()):
+        """
+        Removes the expired driver folders, then the least recently used
+        ones while the total size is over budget, then the leftovers of
+        removed folders and interrupted installs.
+        :param keep: driver folders that must not be removed.
+        :return: the list of removed Installed.
+        """
+        keep = {os.path.normpath(path) for path in keep}
+        folders = self.installed()
+        total = sum(folder.size for folder in folders)
+        now = time.time()
+        removed = []
+        for folder in folders:
+            expired = self.max_age and now - folder.last_used > self.max_age
+            over_budget = self.max_size and total > self.max_size
+            in_use = now - folder.last_used < CacheCollector.GRACE_PERIOD
+            if not (expired or over_budget) or in_use or folder.path in keep:
+                continue
+            if self._remove(folder.path):
+                total -= folder.size
+                removed.append(folder)
+        self._remove_leftovers(now)
+        return removed
+
+    def _remove(self, path):
+        """
+        Removes a driver folder unless another process holds its lock or
+        uses or runs its driver.
+        :return: True if it was removed.
+        """
+        locks = [FileLock(path + '.lock'),
+                 FileLock(path + CacheCollector.IN_USE_SUFFIX)]
+        acquired = []
+        try:
+            for lock in locks:
+                if not lock.acquire(blocking=False):
+                    return False
+                acquired.append(lock)
+            trash = os.path.join(os.path.dirname(path),
+                                 '.trash-' + os.path.basename(path))
+            try:
+                os.replace(path, trash)
+            except OSError:
+                return False
+            Manifest(self.root_path).forget(path)
+            shutil.rmtree(trash, ignore_errors=True)
+            for lock in locks:
+                _remove_lock_file(lock.path, held=True)
+        finally:
+            for lock in acquired:
+                lock.release()
+        for lock in locks:
+            _remove_lock_file(lock.path, held=False)
+        return True
+
+    def _remove_leftovers(self, now):
+        """
+        Removes the lock and in use files of folders that are gone, the
+        temp folders of installs interrupted more than GRACE_PERIOD seconds
+        ago and the trash of removals that didn't finish. Lock files and
+        temp folders are only removed while their lock is free.
+        """
+        for browser in CacheCollector.BROWSERS:
+            browser_path = os.path.join(self.root_path, browser)
+            for name in _names(browser_path):
+                path = os.path.join(browser_path, name)
+                if name.startswith('.trash-'):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif name.endswith(('.lock', CacheCollector.IN_USE_SUFFIX)) \
+                        and not os.path.isdir(os.path.splitext(path)[0]):
+                    _remove_unlocked(path)
+            for version_path in _subfolders(browser_path):
+                for name in _names(version_path):
+                    path = os.path.join(version_path, name)
+                    if name.startswith('.install-') and \
+                            _age(path, now) > CacheCollector.GRACE_PERIOD:
+                        _remove_unlocked(version_path + '.lock', path)
+
+
+def _remove_unlocked(lock_path, path=None):
+    """
+    Removes the folder at path or, if there's none, the lock file itself,
+    while holding the lock at lock_path, unless another process holds it.
+    """
+    lock = FileLock(lock_path)
+    if not lock.acquire(blocking=False):
+        return
+    try:
+        if path:
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            _remove_lock_file(lock_path, held=True)
+    finally:
+        lock.release()
+    if not path:
+        _remove_lock_file(lock_path, held=False)
+
+
+def _remove_lock_file(lock_path, held):
+    """
+    Removes a lock file. POSIX removes it while it's held, so no other
+    process can lock it in between, and a process that opened it before
+    locks the new one instead, as FileLock checks; Windows can't remove an
+    open file, so it's removed once released instead.
+    """
+    if held == (os.name == 'nt'):
+        return
+    try:
+        os.remove(lock_path)
+    except OSError:
+        pass
+
+
+def _names(path):
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def _age(path, now):
+    try:
+        return now - os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def _subfolders(path):
+    return [os.path.normpath(os.path.join(path, name)) for name in _names(path)
+            if not name.startswith('.')
+            and os.path.isdir(os.path.join(path, name))]
+
+
+def _folder_size(path):
+    size = 0
+    for folder, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                pass
+    return size
@@ -0,0 +1,72 @@
+"""
+driloader.cache.detection
+-------------------------
+
+Persistent cache for detected browser versions.
+
+Detecting a browser version spawns the browser, or a wrapper script, which
+takes tens to hundreds of milliseconds. The version only changes when the
+browser binary does, so it is stored on disk, keyed by browser and the
+resolved binary path, along with the binary's inode, size and mtime. An
+entry is only reused while the binary is unchanged.
+"""
+
+import os
+import shutil
+
+from driloader.utils.file import FileHandler
+
+
+class DetectionCache:
+    """
+    Maps (browser, browser binary) to the detected major version.
+    """
+
+    FILE_NAME = 'detections.json'
+
+    def __init__(self, root_path):
+        """
+        :param root_path: the drivers root folder.
+        """
+        self.path = os.path.join(root_path, DetectionCache.FILE_NAME)
+
+    @staticmethod
+    def identity(binary):
+        """
+        Resolves a binary name or path, following symlinks.
+        :return: a tuple with the resolved path, inode, size and mtime, or
+        None if the binary can't be found.
+        """
+        if not binary:
+            return None
+        path = shutil.which(binary) or binary
+        try:
+            path = os.path.realpath(path)
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return path, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def get(self, browser, binary):
+        """
+        Returns the cached version of browser, if binary is unchanged.
+        :return: the major version, or None.
+        """
+        identity = DetectionCache.identity(binary)
+        if identity is None:
+            return None
+        entry = FileHandler.read_json(self.path).get('{}|{}'.format(browser, identity[0]))
+        if not entry or entry['identity'] != list(identity):
+            return None
+        return entry['version']
+
+    def set(self, browser, binary, version):
+        """
+        Stores the version detected for browser from binary.
+        """
+        identity = DetectionCache.identity(binary)
+        if identity is None:
+            return
+        FileHandler.update_json(self.path, lambda entries: entries.update({
+            '{}|{}'.format(browser, identity[0]): {
+                'identity': list(identity), 'version': version}}))
@@ -0,0 +1,146 @@
+"""
+driloader.cache.manifest
+------------------------
+
+Index of the drivers installed in the drivers folder.
+
+Each entry records the browser, driver version, the browser major versions
+it was installed for, the platform, the binary path, its sha256 and when it
+was last used. With it, get_driver returns an installed driver without any
+network request or extraction, and the cache collector knows which drivers
+went unused the longest.
+"""
+
+import os
+import threading
+import time
+
+from driloader.utils.file import FileHandler
+from driloader.utils.lock import FileLock
+
+
+class Manifest:
+    """
+    Reads and updates the installed drivers manifest.
+
+    The parsed manifest is kept in memory and only read again when the file
+    changes, so lookups on a warm cache don't touch the disk beyond a stat.
+    """
+
+    FILE_NAME = 'manifest.json'
+    TOUCH_INTERVAL = 3600
+    _lock = threading.Lock()
+    _loaded = {}
+
+    def __init__(self, root_path):
+        """
+        :param root_path: the drivers root folder.
+        """
+        self.path = os.path.join(root_path, Manifest.FILE_NAME)
+
+    @staticmethod
+    def key(browser, driver_version, platform):
+        """
+        Builds the key an entry is stored under.
+        :return: a string key.
+        """
+        return '{}|{}|{}'.format(browser, driver_version, platform)
+
+    def find(self, browser, major_version, platform):
+        """
+        Looks up an installed driver for a browser major version.
+        Entries whose binary is gone are ignored.
+        :return: the newest matching entry, or None.
+        """
+        matches = [entry for entry in self.entries().values()
+                   if entry['browser'] == browser
+                   and entry['platform'] == platform
+                   and major_version in entry['browser_majors']
+                   and os.path.isfile(entry['binary_path'])]
+        if not matches:
+            return None
+        return max(matches, key=lambda entry: entry['installed_at'])
+
+    def record(self, driver, major_version, binary_path, sha256):
+        """
+        Adds an installed driver, or adds major_version to its entry.
+        :param driver: the installed Driver.
+        :param major_version: the browser major version it was installed for.
+        """
+        browser, driver_version = driver.browser, driver.version
+        platform = driver.platform()
+        key = Manifest.key(browser, driver_version, platform)
+        with Manifest._lock, FileLock(self.path + '.lock'):
+            entries = dict(self._read())
+            entry = dict(entries.get(key) or {
+                'browser': browser,
+                'driver_version': driver_version,
+                'browser_majors': [],
+                'platform': platform,
+                'installed_at': time.time()})
+            entry['binary_path'] = binary_path
+            entry['sha256'] = sha256
+            entry['last_used'] = time.time()
+            if major_version not in entry['browser_majors']:
+                entry['browser_majors'] = entry['browser_majors'] + [
+                    major_version]
+            entries[key] = entry
+            self._write(entries)
+
+    def touch(self, entry):
+        """
+        Updates when an entry was last used. To keep warm lookups free of
+        manifest writes, it's only stored once every TOUCH_INTERVAL seconds;
+        in between, the driver folder's modification time is bumped, which
+        the cache collector reads as a use.
+        """
+        now = time.time()
+        try:
+            os.utime(os.path.dirname(entry['binary_path']))
+        except OSError:
+            pass
+        if now - entry.get('last_used', 0) < Manifest.TOUCH_INTERVAL:
+            return
+        key = Manifest.key(entry['browser'], entry['driver_version'],
+                           entry['platform'])
+        with Manifest._lock, FileLock(self.path + '.lock'):
+            entries = dict(self._read())
+            if key in entries:
+                entries[key] = dict(entries[key], last_used=now)
+                self._write(entries)
+
+    def forget(self, directory):
+        """
+        Removes the entries whose binary is inside directory.
+        """
+        directory = os.path.join(os.path.normpath(directory), '')
+        with Manifest._lock, FileLock(self.path + '.lock'):
+            entries = self._read()
+            kept = {key: entry for key, entry in entries.items()
+                    if not os.path.normpath(
+                        entry['binary_path']).startswith(directory)}
+            if len(kept) != len(entries):
+                self._write(kept)
+
+    def entries(self):
+        """
+        Returns every entry, keyed by Manifest.key.
+        """
+        with Manifest._lock:
+            return self._read()
+
+    def _read(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return {}
+        cached = Manifest._loaded.get(self.path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        entries = FileHandler.read_json(self.path)
+        Manifest._loaded[self.path] = (mtime, entries)
+        return entries
+
+    def _write(self, entries):
+        FileHandler.write_json(self.path, entries, indent=1)
+        Manifest._loaded.pop(self.path, None)
@@ -0,0 +1,144 @@
+# pylint: disable=import-outside-toplevel
+"""
+driloader.cache.partials
+------------------------
+
+Partially downloaded driver archives, kept so an interrupted download is
+resumed instead of restarted.
+
+A partial is only kept when the server advertises byte ranges and gives a
+strong validator, a strong ETag or a Last-Modified date. It's resumed with
+a Range request made conditional on that validator with If-Range: if the
+archive changed in the meantime, the server sends the whole new one and
+the partial is dropped, so bytes of two different archives are never
+mixed.
+"""
+
+import os
+import re
+
+from driloader.utils.file import FileHandler, StreamWriter
+
+
+class PartialDownloads:
+    """
+    Keeps the partial archives and their validators, one pair of files per
+    url.
+    """
+
+    FOLDER_NAME = 'partials'
+
+    def __init__(self, root_path):
+        """
+        :param root_path: the drivers root folder.
+        """
+        self.path = os.path.join(root_path, PartialDownloads.FOLDER_NAME)
+
+    def _paths(self, url):
+        import hashlib
+
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return (os.path.join(self.path, name + '.part'),
+                os.path.join(self.path, name + '.json'))
+
+    def resume_headers(self, url):
+        """
+        Returns the headers resuming the partial download of url.
+        :return: a dict, empty if there's nothing to resume.
+        """
+        part, meta = self._paths(url)
+        validator = FileHandler.read_json(meta).get('validator')
+        try:
+            size = os.path.getsize(part)
+        except OSError:
+            return {}
+        if not size or not validator:
+            return {}
+        return {'Range': 'bytes={}-'.format(size), 'If-Range': validator}
+
+    def writer(self, url, path, status_code, headers):
+        """
+        Returns a PartialWriter for a response to url: appending to the
+        partial on a 206 resuming it, starting over otherwise.
+        :param path: where the archive goes once complete.
+        :raise ValueError: if a 206 doesn't resume from the partial's end.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        headers = {name.lower(): value for name, value in headers.items()}
+        part, meta = self._paths(url)
+        offset = 0
+        if status_code == 206:
+            offset = PartialDownloads._range_start(headers)
+            if offset != os.path.getsize(part):
+                self.discard(url)
+                raise ValueError('The server resumed {} from byte {}, not '
+                                 'from the partial download end.'
+                                 .format(url, offset))
+        else:
+            validator = PartialDownloads._validator(headers)
+            if validator:
+                FileHandler.write_json(meta, {'url': url,
+                                              'validator': validator})
+            elif os.path.exists(meta):
+                os.remove(meta)
+        return PartialWriter(part, path, offset,
+                             keep=os.path.exists(meta))
+
+    def discard(self, url):
+        """
+        Removes the partial download of url, if any.
+        """
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _validator(headers):
+        """
+        Returns the validator If-Range can use, or None if the response
+        can't be resumed.
+        """
+        if headers.get('accept-ranges', '').lower() != 'bytes':
+            return None
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return headers.get('last-modified')
+
+    @staticmethod
+    def _range_start(headers):
+        match = re.match(r'bytes (\d+)-', headers.get('content-range', ''))
+        return int(match.group(1)) if match else -1
+
+
+class PartialWriter(StreamWriter):
+    """
+    A StreamWriter appending to a partial download: the part already on
+    disk is hashed first, so sha256 covers the whole archive. On error the
+    partial is kept, if it can be resumed, instead of removed.
+    """
+
+    def __init__(self, part, path, offset, keep):
+        super().__init__(path)
+        self.size = offset
+        self._tmp_path = part
+        self._keep = keep
+
+    def __enter__(self):
+        if self.size:
+            with open(self._tmp_path, 'rb') as file:
+                for block in iter(lambda: file.read(1024 * 1024), b''):
+                    self._digest.update(block)
+        self._file = open(self._tmp_path, 'ab' if self.size else 'wb')
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and self._keep:
+            self._file.close()
+            return
+        super().__exit__(exc_type, exc_value, traceback)
+        meta = os.path.splitext(self._tmp_path)[0] + '.json'
+        if exc_type is None and os.path.exists(meta):
+            os.remove(meta)
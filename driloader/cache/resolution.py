@@ -0,0 +1,59 @@
+"""
+driloader.cache.resolution
+--------------------------
+
+Persistent cache for resolved driver versions.
+
+Resolving which driver matches the installed browser costs one or more
+metadata round-trips. The answer rarely changes, so it is stored on disk,
+keyed by browser, installed major version and platform, and reused until
+it expires.
+"""
+
+import os
+import time
+
+from driloader.utils.file import FileHandler
+
+
+class ResolutionCache:
+    """
+    Maps (browser, installed major version, platform) to a driver version.
+    """
+
+    FILE_NAME = 'resolutions.json'
+
+    def __init__(self, root_path, ttl):
+        """
+        :param root_path: the drivers root folder.
+        :param ttl: seconds an entry stays valid. Zero disables the cache.
+        """
+        self.path = os.path.join(root_path, ResolutionCache.FILE_NAME)
+        self.ttl = ttl
+
+    @staticmethod
+    def key(browser, major_version, platform):
+        """
+        Builds the key an entry is stored under.
+        :return: a string key.
+        """
+        return '{}|{}|{}'.format(browser, major_version, platform)
+
+    def get(self, key):
+        """
+        Returns the cached driver version for key.
+        :return: the driver version, or None if missing or expired.
+        """
+        if self.ttl <= 0:
+            return None
+        entry = FileHandler.read_json(self.path).get(key)
+        if not entry or time.time() - entry['resolved_at'] > self.ttl:
+            return None
+        return entry['version']
+
+    def set(self, key, version):
+        """
+        Stores a resolved driver version for key.
+        """
+        FileHandler.update_json(self.path, lambda entries: entries.update({
+            key: {'version': version, 'resolved_at': time.time()}}))
@@ -0,0 +1,133 @@
+# pylint: disable=import-outside-toplevel
+"""
+driloader.cache.responses
+-------------------------
+
+Persistent cache for metadata responses: LATEST_RELEASE, notes.txt, the
+bucket listings and release pages.
+
+Each response body is stored with its ETag, Last-Modified and the url it
+was finally served from, after redirects. The next request for the same
+url is made conditional on them, so when nothing changed the server
+answers 304 with no body and the stored one is reused.
+"""
+
+import json
+import os
+from collections import namedtuple
+
+from driloader.utils.file import FileHandler, StreamWriter
+
+
+class CachedResponse(namedtuple('CachedResponse',
+                                'url status_code path from_cache')):
+    """
+    A response whose body is stored in the cache. It reads like the
+    requests Response it replaces: url is the final url, after redirects,
+    and from_cache tells if the server answered 304.
+    """
+
+    @property
+    def content(self):
+        """
+        Return the body.
+        """
+        with open(self.path, 'rb') as file:
+            return file.read()
+
+    @property
+    def text(self):
+        """
+        Return the body, decoded.
+        """
+        return self.content.decode('utf-8', errors='replace')
+
+    def iter_content(self, chunk_size=64 * 1024):
+        """
+        Yields the body in chunks, read from disk as they're consumed.
+        """
+        with open(self.path, 'rb') as file:
+            yield from iter(lambda: file.read(chunk_size), b'')
+
+    def raise_for_status(self):
+        """
+        Only successful responses are cached, so this never raises.
+        """
+
+
+class ResponseCache:
+    """
+    Stores metadata response bodies and their validators, one pair of
+    files per url.
+    """
+
+    FOLDER_NAME = 'responses'
+
+    def __init__(self, root_path):
+        """
+        :param root_path: the drivers root folder.
+        """
+        self.path = os.path.join(root_path, ResponseCache.FOLDER_NAME)
+
+    @staticmethod
+    def key(url, params=None):
+        """
+        Builds the key a response is stored under, from its url and query.
+        :return: a string key.
+        """
+        import hashlib
+
+        query = sorted((params or {}).items())
+        return hashlib.sha256(json.dumps([url, query]).encode('utf-8'))\
+            .hexdigest()
+
+    def conditions(self, key):
+        """
+        Returns the headers that make a request conditional on the stored
+        response.
+        :return: a dict, empty if nothing is stored for key.
+        """
+        entry = self._entry(key)
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, key):
+        """
+        Returns the stored response, after the server answered 304.
+        :return: a CachedResponse, or None if the body is gone.
+        """
+        entry = self._entry(key)
+        body = self._body_path(key)
+        if not entry or not os.path.isfile(body):
+            return None
+        return CachedResponse(entry['url'], entry['status_code'], body, True)
+
+    def store(self, key, url, status_code, headers, chunks):
+        """
+        Stores a response body, streamed from chunks, and its validators.
+        :param url: the url the body was served from, after redirects.
+        :param headers: the response headers.
+        :param chunks: an iterable of bytes.
+        :return: a CachedResponse reading the stored body.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        headers = {name.lower(): value for name, value in headers.items()}
+        body = self._body_path(key)
+        with StreamWriter(body) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+        entry = {'url': url, 'status_code': status_code,
+                 'etag': headers.get('etag'),
+                 'last_modified': headers.get('last-modified')}
+        FileHandler.write_json(os.path.join(self.path, key + '.json'), entry)
+        return CachedResponse(url, status_code, body, False)
+
+    def _entry(self, key):
+        return FileHandler.read_json(os.path.join(self.path, key + '.json'))
+
+    def _body_path(self, key):
+        return os.path.join(self.path, key + '.body')
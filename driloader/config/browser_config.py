@@ -1,25 +1,30 @@
 """
 Responsible to return the browser configs.
 """
-import configparser
 import os
 
 from driloader.config.config_base import BrowserConfigBase
+from driloader.config.snapshot import ConfigSnapshot
 
 
 class BrowserConfig(BrowserConfigBase):
     """
-    Parses the 'browsers.ini' file and return it's values.
+    Returns the values of a 'browsers.ini' section, from the process-wide
+    ConfigSnapshot.
     """
 
     def __init__(self, browser: str):
         self._browser_name = browser
-        self._parser = configparser.ConfigParser()
-        self._parser.read(os.path.join(os.path.dirname(__file__),
-                                       'browsers.ini'))
-        self._section = self._parser[browser.upper()]
-        self._search_pattern_regex = self._parser.get('GENERAL',
-                                                      'search_pattern')
+        self._snapshot = ConfigSnapshot.get()
+        self._section = self._snapshot.sections[browser.upper()]
+        self._templates = self._snapshot.templates[browser.upper()]
+        self._general = self._snapshot.sections['GENERAL']
+
+    def template(self, key):
+        """
+        Return the UrlTemplate of a value with placeholders, like base_url.
+        """
+        return self._templates[key]
 
     def base_url(self):
         """
@@ -33,13 +38,10 @@ class BrowserConfig(BrowserConfigBase):
         @param replace_version: if in browsers.ini there's a '{version}'
         due to dynamic versions with geckodriver.
         """
-        if os.name == 'nt':
-            file = self._section['zip_file_win']
-        else:
-            file = self._section['zip_file_linux']
-        if replace_version:
-            file = file.replace('{version}', replace_version)
-        return file
+        key = 'zip_file_win' if os.name == 'nt' else 'zip_file_linux'
+        if replace_version and key in self._templates:
+            return self._templates[key].render(version=replace_version)
+        return self._section[key]
 
     def unzipped_file_name(self):
         """
@@ -61,6 +63,26 @@ class BrowserConfig(BrowserConfigBase):
         """
         return self._section['index_url']
 
+    def bucket_url(self):
+        """
+        Return bucket_url, the XML listing behind index_url.
+        """
+        return self._section['bucket_url']
+
+    def known_good_url(self):
+        """
+        Return known_good_url, every Chrome for Testing build and its
+        downloads.
+        """
+        return self._section['known_good_url']
+
+    def last_known_good_url(self):
+        """
+        Return last_known_good_url, the latest Chrome for Testing build of
+        each release channel and its downloads.
+        """
+        return self._section['last_known_good_url']
+
     def versions_url(self):
         """
         Return versions_url.
@@ -71,4 +93,28 @@ class BrowserConfig(BrowserConfigBase):
         """
         Return search_pattern from GENERAL section.
         """
-        return self._parser['GENERAL']['search_pattern']
+        return self._general['search_pattern']
+
+    def search_regex(self):
+        """
+        Return search_pattern from GENERAL section, compiled.
+        """
+        return self._snapshot.search_regex
+
+    def resolution_ttl(self):
+        """
+        Return resolution_ttl from GENERAL section, in seconds.
+        """
+        return int(self._general['resolution_ttl'])
+
+    def cache_max_size(self):
+        """
+        Return cache_max_size_mb from GENERAL section, in bytes.
+        """
+        return int(self._general['cache_max_size_mb']) * 1024 ** 2
+
+    def cache_max_age(self):
+        """
+        Return cache_max_age_days from GENERAL section, in seconds.
+        """
+        return int(self._general['cache_max_age_days']) * 86400
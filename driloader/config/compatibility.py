@@ -0,0 +1,188 @@
+"""
+driloader.config.compatibility
+------------------------------
+
+The browser to driver compatibility database.
+
+The rules ship in the [*_COMPATIBILITY] sections of drivers_info.ini, one
+per line, mapping a range of browser major versions to a driver version:
+
+    70-72 = 2.45
+    115- = 0.35.0
+
+A range with no upper bound covers every later major, for which newer
+drivers keep being released, so it's only a fallback for when they can't
+be resolved over the network. Versions resolved over the network are
+recorded in compatibility.ini, in the drivers root folder, with the time
+they were resolved:
+
+    120-120 = 120.0.6099.109, 1697040000
+
+They take precedence over the packaged rules until they're older than the
+resolution ttl, so the database is refreshed one browser major at a time.
+"""
+
+import bisect
+import configparser
+import os
+import threading
+import time
+
+from driloader.utils.file import FileHandler
+from driloader.utils.lock import FileLock
+
+
+class CompatibilityDatabase:
+    """
+    Looks up the driver version compatible with a browser major version.
+
+    Rules are indexed by the start of their range and found with a binary
+    search. The packaged rules are read once per process, the overlay only
+    again when its file changes.
+    """
+
+    FILE_NAME = 'compatibility.ini'
+    PACKAGED_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                 'drivers_info.ini')
+    SECTIONS = {'chrome': 'CHROMEDRIVER_COMPATIBILITY',
+                'firefox': 'GECKODRIVER_COMPATIBILITY',
+                'ie': 'IEDRIVER_COMPATIBILITY'}
+    _lock = threading.Lock()
+    _loaded = {}
+
+    def __init__(self, root_path):
+        """
+        :param root_path: the drivers root folder, holding the overlay.
+        """
+        self.path = os.path.join(root_path, CompatibilityDatabase.FILE_NAME)
+
+    def find(self, browser, major_version, ttl):
+        """
+        Finds the driver version for a browser major version: in the
+        overlay, if it was recorded less than ttl seconds ago, or in a
+        packaged rule with an upper bound.
+        :param browser: 'chrome', 'firefox' or 'ie'.
+        :param major_version: the installed browser major version, an int.
+        :param ttl: seconds a recorded version stays valid. Zero skips the
+        overlay.
+        :return: a driver version, or None if no rule covers it.
+        """
+        rule = self._rule(self.path, browser, major_version)
+        if rule and ttl > 0 and rule[2] is not None and \
+                time.time() - rule[2] <= ttl:
+            return rule[1]
+        rule = self._rule(CompatibilityDatabase.PACKAGED_PATH, browser,
+                          major_version)
+        if rule and rule[0] is not None:
+            return rule[1]
+        return None
+
+    def fallback(self, browser, major_version):
+        """
+        Finds the driver version to use when it can't be resolved over the
+        network: the one recorded in the overlay, however old, or the one
+        of any packaged rule, open ended ones included.
+        :return: a driver version, or None if no rule covers it.
+        """
+        for path in (self.path, CompatibilityDatabase.PACKAGED_PATH):
+            rule = self._rule(path, browser, major_version)
+            if rule:
+                return rule[1]
+        return None
+
+    def _rule(self, path, browser, major_version):
+        """
+        Returns the (end, driver_version, recorded_at) rule of the file at
+        path covering major_version, or None.
+        """
+        if major_version is None:
+            return None
+        return CompatibilityDatabase._lookup(
+            self._index(path).get(browser), major_version)
+
+    def record(self, browser, major_version, driver_version):
+        """
+        Records in the overlay the driver version resolved for a browser
+        major version.
+        """
+        section = CompatibilityDatabase.SECTIONS.get(browser)
+        if major_version is None or section is None:
+            return
+        with CompatibilityDatabase._lock, FileLock(self.path + '.lock'):
+            parser = CompatibilityDatabase._parser()
+            parser.read(self.path, encoding='utf-8')
+            if not parser.has_section(section):
+                parser.add_section(section)
+            parser.set(section, '{0}-{0}'.format(major_version),
+                       '{}, {}'.format(driver_version, int(time.time())))
+            FileHandler.write_atomic(self.path, parser.write)
+            CompatibilityDatabase._loaded.pop(self.path, None)
+
+    @staticmethod
+    def _lookup(rules, major_version):
+        """
+        Binary searches the rule whose range holds major_version.
+        :param rules: a (starts, rules) pair, as built by _build.
+        :return: the (end, driver_version, recorded_at) rule, or None.
+        """
+        if not rules:
+            return None
+        starts, ranges = rules
+        position = bisect.bisect_right(starts, major_version) - 1
+        if position < 0:
+            return None
+        end = ranges[position][0]
+        if end is None or major_version <= end:
+            return ranges[position]
+        return None
+
+    @staticmethod
+    def _index(path):
+        """
+        Returns the rules in path, by browser. They are parsed again only
+        when the file changes.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return {}
+        cached = CompatibilityDatabase._loaded.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        parser = CompatibilityDatabase._parser()
+        try:
+            parser.read(path, encoding='utf-8')
+        except configparser.Error:
+            parser = CompatibilityDatabase._parser()
+        index = {browser: CompatibilityDatabase._build(parser, section)
+                 for browser, section in
+                 CompatibilityDatabase.SECTIONS.items()
+                 if parser.has_section(section)}
+        CompatibilityDatabase._loaded[path] = (mtime, index)
+        return index
+
+    @staticmethod
+    def _build(parser, section):
+        """
+        Sorts the rules of a section by the start of their range.
+        :return: a (starts, [(end, driver_version, recorded_at)]) pair,
+        recorded_at being None for packaged rules.
+        """
+        rules = []
+        for key, value in parser.items(section):
+            start, dash, end = key.partition('-')
+            driver_version, _, recorded_at = value.partition(',')
+            try:
+                start = int(start)
+                end = (int(end) if end else None) if dash else start
+                recorded_at = float(recorded_at) if recorded_at else None
+            except ValueError:
+                continue
+            rules.append((start, (end, driver_version.strip(), recorded_at)))
+        rules.sort(key=lambda rule: rule[0])
+        return ([start for start, _ in rules], [rule for _, rule in rules])
+
+    @staticmethod
+    def _parser():
+        return configparser.ConfigParser(interpolation=None,
+                                          default_section='NO_DEFAULTS')
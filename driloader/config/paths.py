@@ -14,8 +14,7 @@ class Paths:
     def __init__(self, root_path: str, base_browser, driver: Driver):
         self.path = os.path.join(root_path, driver.browser,
                                  driver.version)
-        if not os.path.exists(self.path):
-            os.makedirs(self.path)
+        os.makedirs(self.path, exist_ok=True)
         self.base_browser = base_browser
         self.driver = driver
 
@@ -25,6 +24,13 @@ class Paths:
         """
         return self.path
 
+    def driver_file_path(self):
+        """
+        Return the path of the driver binary, inside unzipped_file_path.
+        """
+        return os.path.join(self.path,
+                            self.base_browser.config.unzipped_file_name())
+
     def zipped_file_path(self, replace_version=''):
         """
         Return the path the driver must be saved in.
@@ -40,11 +46,20 @@ class Paths:
 
     def download_url(self, replace_version=''):
         """
-        Return a resolved url to download the driver.
+        Return a resolved url to download the driver. base_url may use
+        {version} and {version_short}, the major.minor part of it.
         @param replace_version: if in browsers.ini there's a '{version}'
         due to dynamic versions with geckodriver.
         """
-        return '{}{}'.format(self.base_browser.config.base_url().
-                             replace('{version}', self.driver.version),
+        return '{}{}'.format(self.base_browser.config.template('base_url').
+                             render(version=self.driver.version,
+                                    version_short=self._version_short()),
                              self.base_browser.config.zipped_file_name(
                                  replace_version=replace_version))
+
+    def _version_short(self):
+        """
+        Return the major.minor part of the driver version: '3.150' for
+        '3.150.1'.
+        """
+        return '.'.join(self.driver.version.split('.')[:2])
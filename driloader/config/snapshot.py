@@ -0,0 +1,115 @@
+"""
+driloader.config.snapshot
+-------------------------
+
+Process-wide, read-only view of the browsers configuration.
+
+The packaged browsers.ini is read once per process, overlaid with the
+user's ~/Driloader/browsers.ini and then with the file the DRILOADER_CONFIG
+environment variable points to, if they exist. Regexes are compiled and URL
+templates split on their placeholders at that point, so building a
+BrowserConfig costs nothing.
+"""
+
+import configparser
+import os
+import re
+import threading
+from types import MappingProxyType
+
+
+class UrlTemplate:
+    """
+    A string with '{name}' placeholders, split once so it renders without
+    searching the string again.
+
+    >>> UrlTemplate('https://host/{version}/').render(version='2.46')
+    'https://host/2.46/'
+    """
+
+    _PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+    def __init__(self, text):
+        self.text = text
+        # Literal text at even indexes, placeholder names at odd ones.
+        self._parts = tuple(UrlTemplate._PLACEHOLDER.split(text))
+
+    @property
+    def placeholders(self):
+        """
+        Return the placeholder names, in order.
+        """
+        return self._parts[1::2]
+
+    def render(self, **values):
+        """
+        Replaces the placeholders given in values. The others are kept.
+        """
+        parts = list(self._parts)
+        for index in range(1, len(parts), 2):
+            name = parts[index]
+            parts[index] = str(values[name]) if name in values \
+                else '{' + name + '}'
+        return ''.join(parts)
+
+    def __str__(self):
+        return self.text
+
+
+class ConfigSnapshot:
+    """
+    The parsed configuration: each section as a read-only mapping, plus
+    its URL templates and the compiled search_pattern.
+    """
+
+    ENVIRONMENT_VARIABLE = 'DRILOADER_CONFIG'
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, parser):
+        self.sections = MappingProxyType({
+            name: MappingProxyType(dict(parser[name]))
+            for name in parser.sections()})
+        self.templates = MappingProxyType({
+            name: MappingProxyType({key: UrlTemplate(value)
+                                    for key, value in section.items()
+                                    if '{' in value})
+            for name, section in self.sections.items()})
+        self.search_regex = re.compile(
+            self.sections['GENERAL']['search_pattern'])
+
+    @staticmethod
+    def files():
+        """
+        Returns the config files read, in order: later ones override the
+        values of earlier ones.
+        """
+        files = [os.path.join(os.path.dirname(__file__), 'browsers.ini'),
+                 os.path.expanduser('~{0}Driloader{0}browsers.ini'.format(
+                     os.sep))]
+        if os.environ.get(ConfigSnapshot.ENVIRONMENT_VARIABLE):
+            files.append(os.environ[ConfigSnapshot.ENVIRONMENT_VARIABLE])
+        return files
+
+    @classmethod
+    def get(cls):
+        """
+        Returns the process-wide snapshot, reading the files on first use.
+        """
+        snapshot = cls._instance
+        if snapshot is None:
+            with cls._lock:
+                if cls._instance is None:
+                    parser = configparser.ConfigParser(interpolation=None)
+                    parser.read(cls.files(), encoding='utf-8')
+                    cls._instance = cls(parser)
+                snapshot = cls._instance
+        return snapshot
+
+    @classmethod
+    def reload(cls):
+        """
+        Drops the snapshot, so the files are read again on next use.
+        """
+        with cls._lock:
+            cls._instance = None
@@ -0,0 +1,266 @@
+# pylint: disable=import-outside-toplevel
+"""
+driloader.daemon
+----------------
+
+A long lived process getting drivers for every process on the host:
+
+    $ driloader --daemon
+
+It listens on driloader.sock, in the drivers root folder, for JSON lines
+like {"browser": "chrome"} and answers each with a line like
+{"path": "/.../chromedriver", "version": "85.0.4183.87"}, or {"error": ...}.
+Answers are kept in memory, and concurrent requests for a browser wait for
+the one already resolving it, so detection, resolution and downloads happen
+once for the whole host instead of once per process.
+
+get_driver() asks the daemon whenever its socket is there, and resolves the
+driver in process if there's none or it fails. Unix sockets aren't used on
+Windows.
+"""
+
+import errno
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+
+
+SOCKET_NAME = 'driloader.sock'
+
+
+def socket_path(root_path):
+    """
+    Returns the path of the daemon socket in a drivers root folder.
+    """
+    return os.path.join(root_path, SOCKET_NAME)
+
+
+def supported():
+    """
+    Tells if this platform has Unix sockets to reach a daemon.
+    """
+    return os.name != 'nt' and hasattr(socket, 'AF_UNIX')
+
+
+def _encode(message):
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+def _answer(line):
+    """
+    Decodes a daemon answer.
+    :return: the answer dict, or None if it's an error.
+    """
+    answer = json.loads(line.decode('utf-8'))
+    return answer if answer.get('path') else None
+
+
+class DaemonClient:
+    """
+    Asks the daemon listening in a drivers root folder for drivers.
+    """
+
+    TIMEOUT = 300
+
+    def __init__(self, root_path):
+        """
+        :param root_path: the drivers root folder, holding the socket.
+        """
+        self.path = socket_path(root_path)
+
+    def available(self):
+        """
+        Tells if a daemon socket is there. The daemon may still be gone,
+        if it was killed without removing it.
+        """
+        try:
+            return supported() and stat.S_ISSOCK(os.stat(self.path).st_mode)
+        except OSError:
+            return False
+
+    def get_driver(self, request):
+        """
+        Asks the daemon for a driver.
+        :param request: a dict like {'browser': 'chrome'}.
+        :return: a dict with the driver 'path' and 'version', or None if no
+        daemon answered or it failed to get the driver.
+        """
+        if not self.available():
+            return None
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(DaemonClient.TIMEOUT)
+                client.connect(self.path)
+                client.sendall(_encode(request))
+                with client.makefile('rb') as reader:
+                    return _answer(reader.readline())
+        except (OSError, ValueError):
+            return None
+
+    async def get_driver_async(self, request):
+        """
+        Async version of get_driver.
+        """
+        import asyncio
+
+        if not self.available():
+            return None
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+            try:
+                writer.write(_encode(request))
+                await writer.drain()
+                line = await asyncio.wait_for(reader.readline(),
+                                              DaemonClient.TIMEOUT)
+            finally:
+                writer.close()
+            return _answer(line)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers the JSON lines of one connection, in order.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line.decode('utf-8'))
+                answer = self.server.driver_daemon.resolve(request)
+            except (ValueError, AttributeError):
+                answer = {'error': 'Malformed request.'}
+            except RuntimeError as error:
+                answer = {'error': str(error)}
+            self.wfile.write(_encode(answer))
+
+
+class DriverDaemon:
+    """
+    Serves drivers over the Unix socket of a drivers root folder.
+    """
+
+    STATE_TTL = 60
+
+    def __init__(self, root_path, browsers):
+        """
+        :param root_path: the drivers root folder, holding the socket.
+        :param browsers: a dict mapping browser names to the callables
+        building them, like driloader.driloader.BROWSERS.
+        """
+        self.path = socket_path(root_path)
+        self._browsers = browsers
+        self._answers = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def resolve(self, request):
+        """
+        Gets the driver of request['browser'], answering from memory when it
+        was got less than STATE_TTL seconds ago and is still on disk. A
+        request arriving while the browser is resolved waits for that
+        resolution's answer.
+        :return: the answer dict.
+        """
+        from concurrent.futures import Future
+
+        name = str(request.get('browser', '')).lower()
+        with self._lock:
+            answer, resolved_at = self._answers.get(name, ({}, 0))
+            if time.monotonic() - resolved_at < DriverDaemon.STATE_TTL and \
+                    os.path.isfile(answer.get('path', '')):
+                return answer
+            pending = self._pending.get(name)
+            owner = pending is None
+            if owner:
+                pending = self._pending[name] = Future()
+        if not owner:
+            return pending.result()
+        try:
+            answer = self._get_driver(name)
+            with self._lock:
+                if 'path' in answer:
+                    self._answers[name] = (answer, time.monotonic())
+            pending.set_result(answer)
+            return answer
+        finally:
+            with self._lock:
+                del self._pending[name]
+            if not pending.done():
+                pending.set_exception(RuntimeError(
+                    'The resolution of {} was interrupted.'.format(name)))
+
+    def _get_driver(self, name):
+        browsers = self._browsers
+        if name not in browsers:
+            return {'error': 'Browser not supported: {}.'.format(name)}
+        try:
+            browser = browsers[name]().use_daemon(False)
+            path = browser.get_driver()
+        except Exception as error:  # pylint: disable=broad-except
+            return {'error': str(error)}
+        return {'path': path, 'version': browser.driver.version}
+
+    def listen(self):
+        """
+        Binds the socket, only readable and writable by this user. It's
+        created with those permissions, so other users can't connect to it
+        in between.
+        :raise OSError: if Unix sockets aren't supported or another daemon
+        is listening.
+        """
+        if not supported():
+            raise OSError(errno.EAFNOSUPPORT,
+                          'Unix sockets are not supported', self.path)
+        self._claim_socket()
+        umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(
+                self.path, _RequestHandler)
+        finally:
+            os.umask(umask)
+        self._server.daemon_threads = True
+        self._server.driver_daemon = self
+
+    def serve_forever(self):
+        """
+        Answers requests until shutdown() is called, removing the socket
+        when done. Binds it first if listen() wasn't called.
+        """
+        if self._server is None:
+            self.listen()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def shutdown(self):
+        """
+        Stops serve_forever, from another thread.
+        """
+        if self._server:
+            self._server.shutdown()
+
+    def _claim_socket(self):
+        """
+        Removes a socket left by a daemon that didn't stop cleanly.
+        :raise OSError: if a daemon is listening on it.
+        """
+        if not os.path.exists(self.path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.remove(self.path)
+                return
+        raise OSError(errno.EADDRINUSE, 'A daemon is already listening',
+                      self.path)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 # vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
 
+# pylint: disable=import-outside-toplevel
+
 """
 driloader.driloader
 -------------------
@@ -8,34 +10,125 @@ driloader.driloader
 Module which abstracts the main Driloader functions.
 """
 
-from .browser.chrome import Chrome
-from .browser.drivers import Driver
-from .browser.firefox import Firefox
-from .browser.internet_explorer import IE
+from .browser.exceptions import BrowserNotSupportedError, ProvisioningError
+from .events import listen, subscribe, unsubscribe  # pylint: disable=unused-import
+from .factories.browser_factory import BrowserFactory
 
 
 def chrome():
     """
     Returns an instance of Chrome's class.
     """
-    driver = Driver()
-    driver.browser = 'chrome'
-    return Chrome(driver)
+    return BrowserFactory('CHROME').browser
 
 
 def firefox():
     """
     Returns an instance of Firefox's class.
     """
-    driver = Driver()
-    driver.browser = 'firefox'
-    return Firefox(driver)
+    return BrowserFactory('FIREFOX').browser
 
 
 def internet_explorer():
     """
-    Returns an instance of Firefox's class.
+    Returns an instance of IE's class.
+    """
+    return BrowserFactory('IE').browser
+
+
+BROWSERS = {
+    'chrome': chrome,
+    'firefox': firefox,
+    'ie': internet_explorer,
+    'internet_explorer': internet_explorer
+}
+
+
+def get_drivers(browsers, max_workers=None):
+    """
+    Downloads the drivers of several browsers concurrently, so their
+    detection, metadata and downloads overlap.
+
+    >>> from driloader import driloader
+    >>> paths = driloader.get_drivers(['chrome', 'firefox'])
+    >>> paths['chrome']
+    '/home/user/Driloader/.Drivers/chrome/85.0.4183.87/chromedriver'
+
+    :param browsers: browser names ('chrome', 'firefox', 'ie') or browser
+    instances, like driloader.chrome().binary('/path/to/chrome').
+    :param max_workers: the thread pool size. Defaults to one per browser.
+    :return: a dict mapping each canonical browser name ('chrome', 'firefox'
+    or 'ie') to its driver path.
+    :raises ProvisioningError: if any browser failed. Its cause maps each
+    failed browser to its error and its results hold the other paths.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    instances = _browser_instances(browsers)
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(instances) or 1) \
+            as executor:
+        futures = {name: executor.submit(instance.get_driver)
+                   for name, instance in instances.items()}
+        for name, future in futures.items():
+            try:
+                outcomes[name] = future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                outcomes[name] = error
+    return _provisioning_results(outcomes)
+
+
+async def get_drivers_async(browsers):
+    """
+    Async version of get_drivers. All browsers are provisioned concurrently
+    on the running event loop, sharing one HTTP session.
+
+    >>> paths = await driloader.get_drivers_async(['chrome', 'firefox'])
+
+    Requires aiohttp: pip install driloader[async]
+    """
+    import asyncio
+    from .http.async_operations import AsyncHttpOperations
+
+    instances = _browser_instances(browsers)
+    async with AsyncHttpOperations() as http:
+        results = await asyncio.gather(
+            *(instance.get_driver_async(http)
+              for instance in instances.values()),
+            return_exceptions=True)
+    return _provisioning_results(dict(zip(instances, results)))
+
+
+def _browser_instances(browsers):
+    """
+    Maps each browser to a browser instance, keyed by its canonical name,
+    like 'chrome' or 'ie', so a browser asked for twice, under any name, is
+    only provisioned once. The first instance of a browser is kept.
+    """
+    from .browser.basebrowser import BaseBrowser
+
+    instances = {}
+    for browser in browsers:
+        if not isinstance(browser, BaseBrowser):
+            if browser.lower() not in BROWSERS:
+                raise BrowserNotSupportedError('Sorry, but we currently not'
+                                               ' support {}.'.format(browser),
+                                               'Browser is not supported.')
+            browser = BROWSERS[browser.lower()]()
+        instances.setdefault(browser.driver.browser, browser)
+    return instances
+
+
+def _provisioning_results(outcomes):
+    """
+    Splits the outcomes into paths and errors.
+    :raises ProvisioningError: if any outcome is an error.
     """
-    driver = Driver()
-    driver.browser = 'ie'
-    return IE(driver)
+    results = {name: outcome for name, outcome in outcomes.items()
+               if not isinstance(outcome, BaseException)}
+    errors = {name: outcome for name, outcome in outcomes.items()
+              if isinstance(outcome, BaseException)}
+    if errors:
+        raise ProvisioningError('Unable to get the drivers for: {}'.format(
+            ', '.join(sorted(errors))), errors, results)
+    return results
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+"""
+driloader.events
+----------------
+
+Timing events for each phase of getting a driver.
+
+Every phase (daemon, detect, manifest, metadata, download, extract, chmod,
+gc and the whole get_driver) emits an Event when it ends, to the callbacks
+registered on the browser with BaseBrowser.on_event and to the ones
+registered here, for every browser:
+
+    >>> from driloader import driloader
+    >>> with driloader.listen() as events:
+    ...     driloader.chrome().get_driver()
+    >>> [(event.phase, event.duration) for event in events]
+    [('detect', 0.012), ('manifest', 0.0004), ...]
+"""
+
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+
+class Event(namedtuple('Event', 'phase browser duration bytes cache_hit url')):
+    """
+    Describes a finished phase: its name, the browser, how long it took in
+    seconds, the bytes transferred, whether a cache answered it (None when
+    no cache is involved) and the url it fetched, if any.
+    """
+
+
+_listeners = []
+_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """
+    Registers a callback receiving the Event of every phase of every
+    browser.
+    """
+    with _lock:
+        _listeners.append(callback)
+
+
+def unsubscribe(callback):
+    """
+    Removes a callback registered with subscribe.
+    """
+    with _lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+@contextmanager
+def listen(callback=None):
+    """
+    Collects the events emitted while the block runs.
+    :param callback: also called with each event, if given.
+    :return: a list the events are appended to.
+    """
+    events = []
+
+    def collect(event):
+        events.append(event)
+        if callback is not None:
+            callback(event)
+
+    subscribe(collect)
+    try:
+        yield events
+    finally:
+        unsubscribe(collect)
+
+
+def emit(event, listeners=()):
+    """
+    Sends event to listeners and to the subscribed callbacks.
+    """
+    with _lock:
+        subscribed = list(_listeners)
+    for callback in list(listeners) + subscribed:
+        callback(event)
+
+
+class Phase:
+    """
+    Times a block and emits its Event when the block exits, even on
+    error. bytes, cache_hit and url can be set inside the block.
+
+    >>> with Phase('download', 'chrome', url) as phase:
+    ...     phase.bytes = download(url)
+    """
+
+    def __init__(self, name, browser='', url=None, listeners=()):
+        self.name = name
+        self.browser = browser
+        self.url = url
+        self.bytes = 0
+        self.cache_hit = None
+        self._listeners = listeners
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        emit(Event(self.name, self.browser,
+                   time.monotonic() - self._started, self.bytes,
+                   self.cache_hit, self.url), self._listeners)
@@ -6,13 +6,39 @@ driloader.factories.browser_factory
 
 Module which abstracts the browser instantiations.
 
+Browser classes are registered by their import path and only imported when
+a browser is first asked for, so picking one browser doesn't import the
+others, nor their HTTP and parsing dependencies.
+
 """
 
-from driloader.browser.chrome import Chrome
+import importlib
+
 from driloader.browser.drivers import Driver
 from driloader.browser.exceptions import BrowserNotSupportedError
-from driloader.browser.firefox import Firefox
-from driloader.browser.internet_explorer import IE
+
+
+BROWSERS = {
+    'CHROME': ('driloader.browser.chrome:Chrome', 'chrome'),
+    'FIREFOX': ('driloader.browser.firefox:Firefox', 'firefox'),
+    'IE': ('driloader.browser.internet_explorer:IE', 'ie')
+}
+
+
+def browser_class(browser_name):
+    """
+    Imports and returns the class of a registered browser.
+    :param browser_name: a key of BROWSERS, like 'CHROME'.
+    :raises BrowserNotSupportedError: if the browser isn't registered.
+    """
+    try:
+        class_path, _ = BROWSERS[browser_name.upper()]
+    except KeyError:
+        raise BrowserNotSupportedError('Sorry, but we currently not'
+                                       ' support your Browser.',
+                                       'Browser is not supported.') from None
+    module_name, _, class_name = class_path.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
 
 
 class BrowserFactory:
@@ -30,18 +56,7 @@ class BrowserFactory:
         Get browser's instance according to browser's name.
         :return:
         """
-        if self._browser_name.upper() == 'CHROME':
-            driver = Driver()
-            driver.browser = 'chrome'
-            return Chrome(driver)
-        if self._browser_name.upper() == 'FIREFOX':
-            driver = Driver()
-            driver.browser = 'firefox'
-            return Firefox(driver)
-        if self._browser_name.upper() == 'IE':
-            driver = Driver()
-            driver.browser = 'ie'
-            return IE(driver)
-        raise BrowserNotSupportedError('Sorry, but we currently not'
-                                       ' support your Browser.',
-                                       'Browser is not supported.')
+        browser = browser_class(self._browser_name)
+        driver = Driver()
+        driver.browser = BROWSERS[self._browser_name.upper()][1]
+        return browser(driver)
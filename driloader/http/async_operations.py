@@ -0,0 +1,220 @@
+# pylint: disable=import-outside-toplevel, no-member
+"""
+Holds the non-blocking counterpart of HttpOperations.
+
+It is built on aiohttp, which is an optional dependency:
+
+    pip install driloader[async]
+"""
+import time
+
+from driloader.http.operations import Download, HttpOperations
+from driloader.http.proxy import Proxy
+from driloader.http.segmented import SegmentedDownload
+
+
+class AsyncHttpOperations:
+    """
+    Exposes methods to interact with URLs without blocking the event loop.
+
+    One instance holds one pooled aiohttp session, sized like the
+    HttpOperations pools. Use it as an async context manager, or call
+    close() when done.
+    """
+
+    def __init__(self):
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the session and its connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def session(self):
+        """
+        Returns the aiohttp session, creating it on first use.
+        """
+        if self._session is None:
+            try:
+                import aiohttp
+            except ImportError as error:
+                raise ImportError('The async API requires aiohttp. Install it '
+                                  'with: pip install driloader[async]') from error
+            connector = aiohttp.TCPConnector(
+                limit_per_host=HttpOperations.pool_maxsize)
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=HttpOperations.timeout,
+                sock_read=HttpOperations.timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=timeout)
+        return self._session
+
+    @staticmethod
+    def _proxy(url):
+        """
+        Returns the proxy set in the Proxy singleton for url's scheme.
+        """
+        urls = Proxy().urls or {}
+        return urls.get(url.partition(':')[0])
+
+    def _get(self, url, params=None, verify=True, headers=None):
+        return self.session().get(url, params=params, headers=headers,
+                                  ssl=None if verify else False,
+                                  proxy=self._proxy(url))
+
+    async def get_text(self, url, params=None, verify=True):
+        """
+        Performs a GET request for metadata, through the response cache.
+        :return: a tuple with the final url, after redirects, and the body.
+        """
+        response = await self.get_cached(url, params, verify)
+        return response.url, response.text
+
+    async def get_cached(self, url, params=None, verify=True):
+        """
+        Async version of HttpOperations.get_cached.
+        :return: a CachedResponse.
+        """
+        cache = HttpOperations.response_cache()
+        key = cache.key(url, params)
+        headers = cache.conditions(key)
+        async with self._get(url, params, verify, headers) as response:
+            cached = cache.revalidated(key) if response.status == 304 \
+                else None
+            if cached:
+                return cached
+            if response.status != 304:
+                response.raise_for_status()
+                return cache.store(key, str(response.url), response.status,
+                                   response.headers, [await response.read()])
+        async with self._get(url, params, verify) as response:
+            response.raise_for_status()
+            return cache.store(key, str(response.url), response.status,
+                               response.headers, [await response.read()])
+
+    async def get_conditional(self, url, headers=None, verify=True):
+        """
+        Performs a GET request with extra headers, like If-None-Match.
+        :return: a tuple with the status, the response headers and the body,
+        which is empty for a 304.
+        """
+        async with self._get(url, verify=verify, headers=headers) as response:
+            if response.status == 304:
+                return response.status, dict(response.headers), ''
+            response.raise_for_status()
+            return response.status, dict(response.headers), \
+                await response.text()
+
+    async def iter_chunks(self, url, params=None, verify=True):
+        """
+        Performs a GET request and yields the body in chunks as they arrive.
+        """
+        async with self._get(url, params, verify) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(
+                    HttpOperations.chunk_size):
+                yield chunk
+
+    async def download(self, url, path, verify=False):
+        """
+        Streams url to path in fixed-size chunks, resuming the partial
+        download like HttpOperations.download.
+        :return: a Download describing the transfer.
+        """
+        if HttpOperations.segments > 1:
+            download = await self._download_segmented(url, path, verify)
+            if download:
+                return download
+        return await self._download_resuming(
+            url, path, verify, HttpOperations.partial_downloads())
+
+    async def _download_resuming(self, url, path, verify, partials):
+        """
+        Async version of HttpOperations._download_resuming.
+        """
+        import aiohttp
+
+        started = time.monotonic()
+        for attempt in range(HttpOperations.retries + 1):
+            try:
+                writer = await self._download_once(url, path, verify,
+                                                   partials)
+                return Download.since(started, url, path, writer.size,
+                                      writer.sha256)
+            except (aiohttp.ClientPayloadError,
+                    aiohttp.ClientConnectionError):
+                if not HttpOperations.can_resume(attempt, partials, url):
+                    raise
+        return None
+
+    async def _download_segmented(self, url, path, verify):
+        """
+        Async version of HttpOperations._download_segmented: the segments
+        are fetched concurrently on the event loop.
+        """
+        import asyncio
+        import aiohttp
+
+        started = time.monotonic()
+        try:
+            async with self.session().head(
+                    url, ssl=None if verify else False,
+                    proxy=self._proxy(url),
+                    allow_redirects=True) as response:
+                plan = HttpOperations.segment_plan(response)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+        if plan is None:
+            return None
+
+        async def fetch(tmp_path, start, end):
+            async with self._get(plan.url, verify=verify,
+                                 headers=plan.headers(start, end)) as part:
+                SegmentedDownload.check_range(start, end, part.status,
+                                              part.headers)
+                with SegmentedDownload.segment(tmp_path, start, end) as file:
+                    async for chunk in part.content.iter_chunked(
+                            HttpOperations.chunk_size):
+                        file.write(chunk)
+
+        try:
+            with plan.assembling(path) as tmp_path:
+                await asyncio.gather(*(
+                    fetch(tmp_path, start, end) for start, end in
+                    plan.ranges(HttpOperations.segments)))
+                sha256 = plan.verify(tmp_path, path)
+        except (OSError, ValueError, aiohttp.ClientError,
+                asyncio.TimeoutError):
+            return None
+        return Download.since(started, url, path, plan.size, sha256)
+
+    async def _download_once(self, url, path, verify, partials):
+        """
+        Async version of HttpOperations._download_once.
+        """
+        headers = partials.resume_headers(url)
+        async with self._get(url, verify=verify, headers=headers) as response:
+            if response.status != 416:
+                return await self._write(url, path, response, partials)
+        partials.discard(url)
+        async with self._get(url, verify=verify) as response:
+            return await self._write(url, path, response, partials)
+
+    @staticmethod
+    async def _write(url, path, response, partials):
+        response.raise_for_status()
+        with partials.writer(url, path, response.status,
+                             response.headers) as writer:
+            async for chunk in response.content.iter_chunked(
+                    HttpOperations.chunk_size):
+                writer.write(chunk)
+        return writer
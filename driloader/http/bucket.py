@@ -0,0 +1,111 @@
+# pylint: disable=import-outside-toplevel
+"""
+driloader.http.bucket
+---------------------
+
+Reads the XML listing of the storage buckets drivers are published in.
+"""
+
+
+from driloader.http.operations import HttpOperations
+
+
+class BucketListing:
+    """
+    Streams object keys out of a bucket listing without holding the whole
+    document in memory.
+    """
+
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, url):
+        self.url = url
+
+    @staticmethod
+    def _parser():
+        """
+        Returns a new pull parser. xml.etree is imported on first use.
+        """
+        import xml.etree.ElementTree as ET
+        return ET.XMLPullParser(events=('end',))
+
+    @staticmethod
+    def parse(chunks, page=None):
+        """
+        Parses a listing document fed in chunks.
+        :param chunks: an iterable of bytes.
+        :param page: an optional dict, filled with 'truncated' and 'marker'
+        once the document is consumed.
+        :return: a generator of the object keys, in document order.
+        """
+        parser = BucketListing._parser()
+        page = {} if page is None else page
+        for chunk in chunks:
+            yield from BucketListing._feed(parser, chunk, page)
+        parser.close()
+
+    @staticmethod
+    def _feed(parser, chunk, page):
+        """
+        Feeds a chunk to parser and returns the keys it completed. The
+        pagination fields are stored in page: 'truncated', and 'marker',
+        which is NextMarker when the server sends one, or the last key.
+        """
+        keys = []
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            tag = element.tag.rpartition('}')[2]
+            if tag == 'Key':
+                keys.append(element.text)
+                if 'next_marker' not in page:
+                    page['marker'] = element.text
+            elif tag == 'Contents':
+                element.clear()
+            elif tag == 'IsTruncated':
+                page['truncated'] = element.text == 'true'
+            elif tag == 'NextMarker':
+                page['marker'] = page['next_marker'] = element.text
+        return keys
+
+    @staticmethod
+    def _params(prefix, page):
+        """
+        Returns the query of the listing page following page.
+        """
+        params = {'prefix': prefix}
+        if page.get('marker'):
+            params['marker'] = page['marker']
+        return params
+
+    def keys(self, prefix=''):
+        """
+        Lists the keys starting with prefix. Filtering happens on the
+        server, so only the matching entries are transferred. Truncated
+        listings are followed page by page, using the S3 marker. Pages go
+        through the response cache, and are parsed as they're read from it.
+        :param prefix: the key prefix, e.g. '85.'.
+        :return: a generator of object keys.
+        """
+        page = {'truncated': True, 'marker': ''}
+        while page.get('truncated') and page.get('marker') is not None:
+            params = BucketListing._params(prefix, page)
+            response = HttpOperations.get_cached(self.url, params=params)
+            page = {}
+            yield from BucketListing.parse(response.iter_content(
+                chunk_size=BucketListing.CHUNK_SIZE), page)
+
+    async def keys_async(self, http, prefix=''):
+        """
+        Async version of keys().
+        :param http: an AsyncHttpOperations.
+        :return: a list of object keys.
+        """
+        keys = []
+        page = {'truncated': True, 'marker': ''}
+        while page.get('truncated') and page.get('marker') is not None:
+            params = BucketListing._params(prefix, page)
+            response = await http.get_cached(self.url, params=params)
+            page = {}
+            keys.extend(BucketListing.parse(response.iter_content(
+                chunk_size=BucketListing.CHUNK_SIZE), page))
+        return keys
@@ -0,0 +1,210 @@
+"""
+driloader.http.chrome_for_testing
+---------------------------------
+
+Resolves chromedriver for Chrome 115 and later, which is only published
+through the Chrome for Testing JSON endpoints.
+
+The documents are parsed into an index kept in the drivers folder, holding
+the chromedriver url of every build for this platform and the newest build
+of each major version. It's refreshed with conditional requests: the small
+last-known-good document first, the full known-good one only if a major is
+still missing, and a 304 leaves the index untouched.
+"""
+
+import json
+import os
+import platform
+import time
+
+from driloader.http.operations import HttpOperations
+from driloader.utils.file import FileHandler
+from driloader.utils.versions import version_tuple
+
+
+class ChromeForTesting:
+    """
+    Looks up chromedriver builds in the Chrome for Testing index.
+    """
+
+    FILE_NAME = 'chrome-for-testing.json'
+    FIRST_MAJOR = 115
+    _loaded = {}
+
+    def __init__(self, root_path, urls, ttl):
+        """
+        :param root_path: the drivers root folder, holding the index.
+        :param urls: the documents to refresh the index from, smallest
+        first.
+        :param ttl: seconds before the index is revalidated.
+        """
+        self.path = os.path.join(root_path, ChromeForTesting.FILE_NAME)
+        self.urls = urls
+        self.ttl = ttl
+
+    @classmethod
+    def from_config(cls, root_path, config, ttl=None):
+        """
+        Builds a ChromeForTesting from the CHROME BrowserConfig.
+        :param ttl: seconds before the index is revalidated. Defaults to
+        the configured resolution ttl.
+        """
+        return cls(root_path,
+                   (config.last_known_good_url(), config.known_good_url()),
+                   config.resolution_ttl() if ttl is None else ttl)
+
+    @staticmethod
+    def platform():
+        """
+        Returns the Chrome for Testing name of this platform.
+        """
+        system, machine = platform.system(), platform.machine().lower()
+        if system == 'Windows':
+            return 'win64' if machine.endswith('64') else 'win32'
+        if system == 'Darwin':
+            return 'mac-arm64' if machine in ('arm64', 'aarch64') \
+                else 'mac-x64'
+        return 'linux64'
+
+    def find(self, major_version):
+        """
+        Finds the newest build of a Chrome major version with a chromedriver.
+        :return: the driver version, or None if there's none.
+        """
+        index = self._read()
+        key = str(major_version)
+        if key in index['latest'] and not self._stale(index):
+            return index['latest'][key]
+        for url in self.urls:
+            index = self._revalidate(index, url)
+            if key in index['latest']:
+                break
+        return index['latest'].get(key)
+
+    async def find_async(self, http, major_version):
+        """
+        Async version of find().
+        :param http: an AsyncHttpOperations.
+        """
+        index = self._read()
+        key = str(major_version)
+        if key in index['latest'] and not self._stale(index):
+            return index['latest'][key]
+        for url in self.urls:
+            status, headers, text = await http.get_conditional(
+                url, headers=self._conditions(index, url))
+            index = self._update(index, url, status, headers, text)
+            if key in index['latest']:
+                break
+        return index['latest'].get(key)
+
+    def url(self, version):
+        """
+        Returns the chromedriver url of a build, refreshing the index once
+        if the build isn't in it.
+        :return: the url, or None if there's none.
+        """
+        index = self._read()
+        if version not in index['builds']:
+            index = self._revalidate(index, self.urls[-1])
+        return index['builds'].get(version)
+
+    async def url_async(self, http, version):
+        """
+        Async version of url().
+        :param http: an AsyncHttpOperations.
+        """
+        index = self._read()
+        if version not in index['builds']:
+            url = self.urls[-1]
+            status, headers, text = await http.get_conditional(
+                url, headers=self._conditions(index, url))
+            index = self._update(index, url, status, headers, text)
+        return index['builds'].get(version)
+
+    def _stale(self, index):
+        return time.time() - index.get('checked_at', 0) > self.ttl
+
+    @staticmethod
+    def _conditions(index, url):
+        """
+        Returns the headers making a request for url conditional on the
+        document the index was built from.
+        """
+        validators = index['validators'].get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def _revalidate(self, index, url):
+        """
+        Refreshes the index from url, unless it didn't change.
+        """
+        response = HttpOperations.get(url, verify=True,
+                                      headers=self._conditions(index, url))
+        if response.status_code != 304:
+            response.raise_for_status()
+        return self._update(index, url, response.status_code,
+                            response.headers, response.text)
+
+    def _update(self, index, url, status, headers, text):
+        """
+        Merges a fetched document into the index and saves it.
+        """
+        index = {'platform': index['platform'],
+                 'checked_at': time.time(),
+                 'validators': dict(index['validators']),
+                 'builds': dict(index['builds']),
+                 'latest': dict(index['latest'])}
+        validators = dict(index['validators'].get(url, {}))
+        if status != 304:
+            headers = {name.lower(): value for name, value in headers.items()}
+            validators['etag'] = headers.get('etag')
+            validators['last_modified'] = headers.get('last-modified')
+            ChromeForTesting._merge(index, json.loads(text))
+        index['validators'][url] = validators
+        self._write(index)
+        return index
+
+    @staticmethod
+    def _merge(index, document):
+        """
+        Adds the builds of a known-good or last-known-good document to the
+        index.
+        """
+        entries = document.get('versions') or \
+            list(document.get('channels', {}).values())
+        for entry in entries:
+            for download in entry.get('downloads', {}).get('chromedriver', ()):
+                if download['platform'] != index['platform']:
+                    continue
+                version = entry['version']
+                index['builds'][version] = download['url']
+                major = version.partition('.')[0]
+                latest = index['latest'].get(major)
+                if latest is None or \
+                        version_tuple(version) > version_tuple(latest):
+                    index['latest'][major] = version
+
+    def _read(self):
+        empty = {'platform': ChromeForTesting.platform(), 'validators': {},
+                 'builds': {}, 'latest': {}}
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return empty
+        cached = ChromeForTesting._loaded.get(self.path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        index = FileHandler.read_json(self.path)
+        if index.get('platform') != empty['platform']:
+            return empty
+        ChromeForTesting._loaded[self.path] = (mtime, index)
+        return index
+
+    def _write(self, index):
+        FileHandler.write_json(self.path, index)
+        ChromeForTesting._loaded.pop(self.path, None)
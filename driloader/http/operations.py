@@ -1,31 +1,333 @@
-# pylint: disable=no-member
+# pylint: disable=no-member, import-outside-toplevel
 """
 Holds the classes that implement HTTP operations.
+
+requests is only imported when the first session is created, so importing
+driloader, or running the CLI, doesn't pay for it.
 """
-import requests
+import threading
+import time
+from collections import namedtuple
 
-from requests_html import HTMLSession
-from urllib3.exceptions import InsecureRequestWarning
+from driloader.cache.partials import PartialDownloads
+from driloader.cache.responses import ResponseCache
+from driloader.http.proxy import Proxy
+from driloader.http.segmented import SegmentedDownload
+
+
+class Download(namedtuple('Download', 'url path size sha256 seconds')):
+    """
+    Describes a finished download: where it came from and went to, its size
+    in bytes, its sha256 and how long it took.
+    """
+
+    @classmethod
+    def since(cls, started, url, path, size, sha256):
+        """
+        Builds the Download of a transfer started at the time.monotonic()
+        started.
+        """
+        return cls(url, path, size, sha256, time.monotonic() - started)
+
+    @property
+    def throughput(self):
+        """
+        Return the average speed in bytes per second.
+        """
+        if not self.seconds:
+            return float(self.size)
+        return self.size / self.seconds
 
 
 class HttpOperations:
     """
     Exposes methods to interact with URLs.
+
+    All requests go through one shared session, so connections are kept
+    alive and pooled per host instead of paying a new TCP and TLS handshake
+    for every request. The session is created on first use and can be tuned
+    with configure().
     """
 
-    def __init__(self):
+    chunk_size = 64 * 1024
+    pool_connections = 10
+    pool_maxsize = 10
+    timeout = 30
+    retries = 3
+    backoff_factor = 0.5
+    cache_root = None
+    segments = 1
+    segment_min_size = 8 * 1024 * 1024
+
+    _session = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, pool_connections=None, pool_maxsize=None, timeout=None,
+                  retries=None, backoff_factor=None):
+        """
+        Changes the session settings. The current session is closed and a
+        new one is created on the next request.
+        :param pool_connections: number of hosts to keep a pool for.
+        :param pool_maxsize: connections kept alive per host.
+        :param timeout: seconds to wait for the server to respond.
+        :param retries: retries on connection errors and 5xx responses.
+        :param backoff_factor: backoff factor between retries.
+        """
+        with cls._lock:
+            settings = {'pool_connections': pool_connections,
+                        'pool_maxsize': pool_maxsize,
+                        'timeout': timeout,
+                        'retries': retries,
+                        'backoff_factor': backoff_factor}
+            for name, value in settings.items():
+                if value is not None:
+                    setattr(cls, name, value)
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+
+    @classmethod
+    def configure_segments(cls, segments, min_size=None):
+        """
+        Opts in to segmented downloads: archives of at least min_size bytes
+        are fetched as segments byte ranges in parallel, over the pooled
+        session. One segment, the default, turns them off.
+        :param segments: the number of parallel ranges, at most
+        pool_maxsize.
+        :param min_size: the smallest archive, in bytes, to split.
+        """
+        cls.segments = max(1, min(segments, cls.pool_maxsize))
+        if min_size is not None:
+            cls.segment_min_size = min_size
+
+    @classmethod
+    def session(cls):
+        """
+        Returns the shared session, creating it on first use.
+        """
+        with cls._lock:
+            if cls._session is None:
+                cls._session = cls._new_session()
+            return cls._session
+
+    @classmethod
+    def _new_session(cls):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.exceptions import InsecureRequestWarning
+        from urllib3.util.retry import Retry
+
         requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+        retry = Retry(total=cls.retries, backoff_factor=cls.backoff_factor,
+                      status_forcelist=(500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=cls.pool_connections,
+                              pool_maxsize=cls.pool_maxsize,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @staticmethod
+    def head(url, verify=False, proxies=None, **kwargs):
+        """
+        Performs a HEAD request, following redirects, and returns a
+        Response class.
+        """
+        if proxies is None:
+            proxies = Proxy().urls
+        kwargs.setdefault('timeout', HttpOperations.timeout)
+        kwargs.setdefault('allow_redirects', True)
+        return HttpOperations.session().head(url, verify=verify,
+                                             proxies=proxies, **kwargs)
 
     @staticmethod
-    def get(url, params=None, verify=False, proxies=None):
+    def get(url, params=None, verify=False, proxies=None, **kwargs):
         """
         Performs a GET request and returns a Response class.
+        Proxies default to the ones set in the Proxy singleton. Extra keyword
+        arguments, like stream or headers, are passed to the session.
+        """
+        if proxies is None:
+            proxies = Proxy().urls
+        kwargs.setdefault('timeout', HttpOperations.timeout)
+        return HttpOperations.session().get(url, params=params, verify=verify,
+                                            proxies=proxies, **kwargs)
+
+    @classmethod
+    def _cache_root(cls):
+        """
+        Returns cache_root or, if it isn't set, the drivers folder.
+        """
+        if cls.cache_root is None:
+            from driloader.browser.drivers import Driver
+            return Driver().create_folder()
+        return cls.cache_root
+
+    @classmethod
+    def response_cache(cls):
         """
-        return requests.get(url, params=params, verify=verify, proxies=proxies)
+        Returns the metadata response cache.
+        """
+        return ResponseCache(cls._cache_root())
+
+    @classmethod
+    def partial_downloads(cls):
+        """
+        Returns the partial downloads kept to be resumed.
+        """
+        return PartialDownloads(cls._cache_root())
+
+    @staticmethod
+    def get_cached(url, params=None, verify=True):
+        """
+        Performs a GET request for metadata, conditional on the response
+        stored for the same url and query. A 304 costs no body: the stored
+        one is returned.
+        :return: a CachedResponse.
+        """
+        cache = HttpOperations.response_cache()
+        key = cache.key(url, params)
+        response = HttpOperations.get(url, params=params, verify=verify,
+                                      stream=True,
+                                      headers=cache.conditions(key))
+        try:
+            if response.status_code == 304:
+                cached = cache.revalidated(key)
+                if cached:
+                    return cached
+                response.close()
+                response = HttpOperations.get(url, params=params,
+                                              verify=verify, stream=True)
+            response.raise_for_status()
+            return cache.store(key, response.url, response.status_code,
+                               response.headers, response.iter_content(
+                                   chunk_size=HttpOperations.chunk_size))
+        finally:
+            response.close()
+
+    @staticmethod
+    def download(url, path, verify=False):
+        """
+        Streams url to path in fixed-size chunks, so memory use doesn't
+        depend on the file size.
+
+        If the connection drops, the partial download is kept and resumed
+        with a Range request, when the server supports it: right away, up to
+        retries times, and by later calls.
+        :return: a Download describing the transfer.
+        """
+        if HttpOperations.segments > 1:
+            download = HttpOperations._download_segmented(url, path, verify)
+            if download:
+                return download
+        return HttpOperations._download_resuming(
+            url, path, verify, HttpOperations.partial_downloads())
+
+    @staticmethod
+    def _download_resuming(url, path, verify, partials):
+        """
+        Downloads url in a single stream, resuming it on connection errors
+        while can_resume allows it.
+        :return: a Download describing the transfer.
+        """
+        from requests import exceptions
+
+        started = time.monotonic()
+        for attempt in range(HttpOperations.retries + 1):
+            try:
+                writer = HttpOperations._download_once(url, path, verify,
+                                                       partials)
+                return Download.since(started, url, path, writer.size,
+                                      writer.sha256)
+            except (exceptions.ChunkedEncodingError,
+                    exceptions.ConnectionError):
+                if not HttpOperations.can_resume(attempt, partials, url):
+                    raise
+        return None
+
+    @staticmethod
+    def can_resume(attempt, partials, url):
+        """
+        Tells if a download of url that dropped on attempt, counting from
+        zero, is retried right away: only while there are retries left and
+        there's a partial download to resume.
+        :param partials: the PartialDownloads.
+        """
+        return attempt < HttpOperations.retries and \
+            bool(partials.resume_headers(url))
+
+    @staticmethod
+    def segment_plan(response):
+        """
+        Plans a segmented download from a HEAD response, of either HTTP
+        client.
+        :return: a SegmentedDownload, or None if the archive isn't split.
+        """
+        if not response.ok:
+            return None
+        return SegmentedDownload.from_headers(
+            str(response.url), response.headers,
+            HttpOperations.segment_min_size)
+
+    @staticmethod
+    def _download_segmented(url, path, verify):
+        """
+        Downloads url in segments fetched on parallel threads, if it's big
+        enough and served in byte ranges.
+        :return: a Download, or None if url wasn't downloaded in segments,
+        because it can't be or a segment or the verification failed.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from requests import exceptions
+
+        started = time.monotonic()
+        try:
+            plan = HttpOperations.segment_plan(
+                HttpOperations.head(url, verify=verify))
+        except exceptions.RequestException:
+            return None
+        if plan is None:
+            return None
+
+        def fetch(tmp_path, start, end):
+            with HttpOperations.get(plan.url, verify=verify, stream=True,
+                                    headers=plan.headers(start, end)) as part:
+                SegmentedDownload.check_range(start, end, part.status_code,
+                                              part.headers)
+                with SegmentedDownload.segment(tmp_path, start,
+                                               end) as file:
+                    for chunk in part.iter_content(HttpOperations.chunk_size):
+                        file.write(chunk)
+
+        try:
+            with plan.assembling(path) as tmp_path, \
+                    ThreadPoolExecutor(HttpOperations.segments) as executor:
+                list(executor.map(lambda segment: fetch(tmp_path, *segment),
+                                  plan.ranges(HttpOperations.segments)))
+                sha256 = plan.verify(tmp_path, path)
+        except (OSError, ValueError, exceptions.RequestException):
+            return None
+        return Download.since(started, url, path, plan.size, sha256)
 
     @staticmethod
-    def get_html(url):
+    def _download_once(url, path, verify, partials):
         """
-        Performs a GET in a html page and returns the HTML.
+        Downloads url to path, resuming its partial download if there's one.
+        :return: the finished PartialWriter.
         """
-        return HTMLSession().get(url)
+        response = HttpOperations.get(url, verify=verify, stream=True,
+                                      headers=partials.resume_headers(url))
+        if response.status_code == 416:
+            response.close()
+            partials.discard(url)
+            response = HttpOperations.get(url, verify=verify, stream=True)
+        with response:
+            response.raise_for_status()
+            with partials.writer(url, path, response.status_code,
+                                 response.headers) as writer:
+                for chunk in response.iter_content(
+                        chunk_size=HttpOperations.chunk_size):
+                    writer.write(chunk)
+        return writer
@@ -38,8 +38,10 @@ class Proxy:
     """
     __instance = None
 
-    def __init__(self):
-        self.urls = None
+    def __init__(self, urls=None):
+        """
+        Keeps the urls set on the first assignment, see __new__.
+        """
 
     def __new__(cls, urls=None):
         """
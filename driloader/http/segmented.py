@@ -0,0 +1,178 @@
+# pylint: disable=import-outside-toplevel
+"""
+driloader.http.segmented
+------------------------
+
+Segmented download of a single archive: its byte ranges are fetched in
+parallel, each over its own pooled connection, and written at their
+offsets in a preallocated file.
+
+A segmented download is only made when a HEAD request shows the archive
+is big enough, its length is known and byte ranges are served. Every range
+is conditional on the archive's validator, so all the segments come from
+the same archive, and the assembled file is checked against the length
+and, when the server publishes one, the md5 before it's used.
+"""
+
+import base64
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+
+
+class SegmentedDownload:
+    """
+    Plans, fetches and verifies the segments of one archive.
+    """
+
+    def __init__(self, url, size, validator, md5):
+        """
+        :param url: the archive url, after redirects.
+        :param size: its length in bytes.
+        :param validator: a strong ETag or Last-Modified, for If-Range.
+        :param md5: its published md5 hex digest, or None.
+        """
+        self.url = url
+        self.size = size
+        self.validator = validator
+        self.md5 = md5
+
+    @classmethod
+    def from_headers(cls, url, headers, min_size):
+        """
+        Builds a SegmentedDownload from the HEAD response headers.
+        :return: a SegmentedDownload, or None if the archive is smaller than
+        min_size or can't be fetched in ranges.
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        try:
+            size = int(headers.get('content-length', ''))
+        except ValueError:
+            return None
+        etag = headers.get('etag', '')
+        validator = etag if etag and not etag.startswith('W/') \
+            else headers.get('last-modified')
+        if size < min_size or not validator or \
+                headers.get('accept-ranges', '').lower() != 'bytes':
+            return None
+        return cls(url, size, validator, SegmentedDownload._md5(headers))
+
+    @staticmethod
+    def _md5(headers):
+        """
+        Returns the md5 the server publishes for the archive: x-goog-hash,
+        Content-MD5 or a single-part storage ETag.
+        """
+        for field in headers.get('x-goog-hash', '').split(','):
+            name, _, value = field.strip().partition('=')
+            if name == 'md5':
+                return base64.b64decode(value).hex()
+        if headers.get('content-md5'):
+            return base64.b64decode(headers['content-md5']).hex()
+        # Storage servers use the md5 as ETag for objects uploaded in one
+        # part; a crc32c-only x-goog-hash means the object is composite.
+        etag = headers.get('etag', '').strip('"')
+        if re.fullmatch(r'[0-9a-f]{32}', etag) and \
+                'x-goog-hash' not in headers:
+            return etag
+        return None
+
+    def ranges(self, count):
+        """
+        Splits the archive into count inclusive byte ranges.
+        :return: a list of (start, end) tuples.
+        """
+        step = -(-self.size // count)
+        return [(start, min(start + step, self.size) - 1)
+                for start in range(0, self.size, step)]
+
+    def headers(self, start, end):
+        """
+        Returns the headers requesting one range of this archive.
+        """
+        return {'Range': 'bytes={}-{}'.format(start, end),
+                'If-Range': self.validator}
+
+    def preallocate(self, path):
+        """
+        Creates a temp file next to path with the archive's length.
+        :return: the temp file path.
+        """
+        handle, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path) or '.', suffix='.part')
+        with os.fdopen(handle, 'wb') as file:
+            file.truncate(self.size)
+        return tmp_path
+
+    @contextmanager
+    def assembling(self, path):
+        """
+        Preallocates the temp file the segments are written to, and removes
+        it on exit unless verify() renamed it to path.
+        :return: the temp file path.
+        """
+        tmp_path = self.preallocate(path)
+        try:
+            yield tmp_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def check_range(start, end, status_code, headers):
+        """
+        Checks a response carries exactly the range asked for.
+        :raise ValueError: if the server sent anything else, like the whole
+        archive because it changed.
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        content_range = headers.get('content-range', '')
+        if status_code != 206 or \
+                not content_range.startswith('bytes {}-{}/'.format(start, end)):
+            raise ValueError('Expected bytes {}-{}, got status {} {}'
+                             .format(start, end, status_code, content_range))
+
+    @staticmethod
+    @contextmanager
+    def segment(tmp_path, start, end):
+        """
+        Opens the temp file at a segment's offset, to write its chunks.
+        :raise ValueError: on exit, if the segment is shorter or longer than
+        its range.
+        """
+        with open(tmp_path, 'r+b') as file:
+            file.seek(start)
+            yield file
+            SegmentedDownload.check_length(start, end, file.tell() - start)
+
+    @staticmethod
+    def check_length(start, end, written):
+        """
+        :raise ValueError: if written isn't the length of the range.
+        """
+        if written != end - start + 1:
+            raise ValueError('Segment {}-{} has {} bytes'
+                             .format(start, end, written))
+
+    def verify(self, tmp_path, path):
+        """
+        Checks the assembled archive and renames it to path.
+        :return: its sha256 hex digest.
+        :raise ValueError: if its length or md5 don't match.
+        """
+        import hashlib
+
+        sha256, md5 = hashlib.sha256(), hashlib.md5()
+        with open(tmp_path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                sha256.update(block)
+                md5.update(block)
+        if os.path.getsize(tmp_path) != self.size:
+            raise ValueError('{} has {} bytes, expected {}'.format(
+                self.url, os.path.getsize(tmp_path), self.size))
+        if self.md5 and md5.hexdigest() != self.md5:
+            raise ValueError('{} md5 is {}, expected {}'.format(
+                self.url, md5.hexdigest(), self.md5))
+        os.replace(tmp_path, path)
+        return sha256.hexdigest()
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
 
-# pylint: disable=too-few-public-methods, unnecessary-pass
+# pylint: disable=too-few-public-methods, unnecessary-pass, import-outside-toplevel
 
 """
 driloader.commands
@@ -25,34 +25,45 @@ class Commands:
     The function run() abstracts the complexity of calling
     subprocess.run() in versions >= 3.6  and subprocess.check_output() in versions < 3.6
 
+    A command still running after `timeout` seconds is killed, so a hung
+    browser never hangs its caller.
+
     """
 
+    timeout = 10
+
     @staticmethod
-    def run(command):
+    def run(command, timeout=None):
         """ Run command.
         Runs any command sent as parameter and returns its stdout
         in case of success.
         Args:
             command: Can be a string or string list containing a command line.
             For example: "ls -l" and "firefox" or ['ls', '-l'] and ['firefox']
+            timeout: seconds before the command is killed. Defaults to
+            Commands.timeout.
         Returns:
             Returns an string with the command stdout.
         Raises:
             CommandError: The command was not found.
             CommandError: The command was found but failed.
+            CommandError: The command timed out and was killed.
         """
         if isinstance(command, str):
             command_array = command.split(" ")
         else:
             command_array = command
+        timeout = Commands.timeout if timeout is None else timeout
 
         try:
             try:
+                # run() kills the child before raising TimeoutExpired.
                 cmd_result = subprocess.run(command_array,
                                             stdout=subprocess.PIPE,
-                                            check=True)
+                                            check=True, timeout=timeout)
             except AttributeError:
-                cmd_result = subprocess.check_output(command_array)
+                cmd_result = subprocess.check_output(command_array,
+                                                     timeout=timeout)
 
             if (hasattr(cmd_result, "returncode") and cmd_result.returncode == 0) \
                     or cmd_result is not None:
@@ -67,6 +78,51 @@ class Commands:
 
         except FileNotFoundError as err:
             raise CommandError('Command "{}" not found!'.format(''.join(command))) from err
+        except subprocess.TimeoutExpired as err:
+            raise CommandError('Command "{}" timed out after {} seconds!'.format(
+                ''.join(command), timeout)) from err
+
+    @staticmethod
+    async def run_async(command, timeout=None):
+        """ Run command without blocking the event loop.
+        Same as run(), using an asyncio subprocess.
+        Args:
+            command: Can be a string or string list containing a command line.
+            timeout: seconds before the command is killed. Defaults to
+            Commands.timeout.
+        Returns:
+            Returns an string with the command stdout.
+        Raises:
+            CommandError: The command was not found.
+            CommandError: The command was found but failed.
+            CommandError: The command timed out and was killed.
+        """
+        if isinstance(command, str):
+            command_array = command.split(" ")
+        else:
+            command_array = command
+        timeout = Commands.timeout if timeout is None else timeout
+
+        import asyncio
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command_array, stdout=asyncio.subprocess.PIPE)
+        except FileNotFoundError as err:
+            raise CommandError('Command "{}" not found!'.format(''.join(command))) from err
+
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError as err:
+            raise CommandError('Command "{}" timed out after {} seconds!'.format(
+                ''.join(command), timeout)) from err
+        finally:
+            # Also reached when the caller is cancelled.
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        if process.returncode != 0:
+            raise CommandError('Command "{}" failed!'.format(''.join(command)))
+        return stdout.decode('utf-8')
 
     @staticmethod
     def get_command_output(command):
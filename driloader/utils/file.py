@@ -8,10 +8,12 @@ Module to abstract file related operations.
 """
 
 
+import json
 import os
-import zipfile
+import shutil
+import tempfile
 
-from driloader.utils.commands import Commands
+from driloader.utils.lock import FileLock
 
 
 class FileHandler:
@@ -31,31 +33,124 @@ class FileHandler:
         if hidden:
             if os.name == 'nt':
                 import ctypes
-                if not os.path.exists(folder_path):
-                    os.makedirs(folder_path)
+                os.makedirs(folder_path, exist_ok=True)
                 ctypes.windll.kernel32.SetFileAttributesW(folder_path, 2)
             else:
                 folder_path = folder_path.replace("Drivers", ".Drivers")
-                if not os.path.exists(folder_path):
-                    os.makedirs(folder_path)
+                os.makedirs(folder_path, exist_ok=True)
         return folder_path
 
     @staticmethod
-    def unzip(zip_file, path_to_extract, delete_after_extract=False):
+    def extract_member(zip_file, member_name, path_to_extract,
+                       delete_after_extract=False):
         """
-        Extract a 'zip' or 'gz' file content to the same path as file is in.
-        :param zip_file: file to be extracted.
-        :param delete_after_extract: deletes original zipped file after it's extracted.
-        :param path_to_extract: the path to extract the file.
+        Extract a single file from a 'zip' or 'gz' archive, in-process.
+        The member is looked up by its base name, so archives that keep the
+        driver inside a folder work too. Its permission bits are copied from
+        the archive.
+        :param zip_file: the archive.
+        :param member_name: the file name to extract, like 'chromedriver'.
+        :param path_to_extract: the folder to extract the file to.
+        :param delete_after_extract: deletes the archive after extracting.
+        :return: the extracted file's path.
         """
+        import tarfile
+        import zipfile
+
+        target = os.path.join(path_to_extract, member_name)
         if zip_file.endswith("zip"):
-            zfile = zipfile.ZipFile(zip_file, "r")
-            zfile.extractall(path_to_extract)
-            zfile.close()
-        elif zip_file.endswith("gz"):
-            Commands.run("tar -zxvf {} -C {}".format(zip_file, zip_file.rpartition("/")[0]))
+            with zipfile.ZipFile(zip_file, "r") as zfile:
+                info = FileHandler._find_member(
+                    [info for info in zfile.infolist() if not info.is_dir()],
+                    lambda info: info.filename, member_name, zip_file)
+                with zfile.open(info) as source, open(target, "wb") as dest:
+                    shutil.copyfileobj(source, dest)
+                mode = info.external_attr >> 16
+        else:
+            with tarfile.open(zip_file, "r:gz") as tfile:
+                info = FileHandler._find_member(
+                    [member for member in tfile.getmembers() if member.isfile()],
+                    lambda info: info.name, member_name, zip_file)
+                with tfile.extractfile(info) as source, open(target, "wb") as dest:
+                    shutil.copyfileobj(source, dest)
+                mode = info.mode
+        if mode & 0o777:
+            os.chmod(target, mode & 0o777)
         if delete_after_extract:
             os.remove(zip_file)
+        return target
+
+    @staticmethod
+    def _find_member(members, name_of, member_name, zip_file):
+        for member in members:
+            if name_of(member).rpartition('/')[2] == member_name:
+                return member
+        raise FileNotFoundError('{} not found in {}'.format(member_name,
+                                                             zip_file))
+
+    @staticmethod
+    def sha256(path):
+        """
+        Returns the sha256 hex digest of a file.
+        """
+        import hashlib
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def write_atomic(path, write):
+        """
+        Writes a text file through a temp file renamed to path, so
+        concurrent readers never see a partially written file.
+        :param path: the destination file.
+        :param write: a callable writing the content to the file it's given.
+        """
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                            suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as file:
+                write(file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def write_json(path, data, indent=None):
+        """
+        Atomically writes data to path as JSON.
+        """
+        FileHandler.write_atomic(
+            path, lambda file: json.dump(data, file, indent=indent))
+
+    @staticmethod
+    def update_json(path, update, indent=None):
+        """
+        Reads a JSON file, changes it and writes it back atomically, holding
+        the lock on path + '.lock', so concurrent updates from any process
+        or thread don't lose each other's changes.
+        :param update: a callable changing the dict it's given in place.
+        """
+        with FileLock(path + '.lock'):
+            data = FileHandler.read_json(path)
+            update(data)
+            FileHandler.write_json(path, data, indent)
+
+    @staticmethod
+    def read_json(path):
+        """
+        Reads a JSON file written by write_json.
+        :return: its content, or an empty dict if it's missing or malformed.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
 
     @staticmethod
     def write_content(path, content):
@@ -64,3 +159,47 @@ class FileHandler:
         """
         with open(path, "wb") as file:
             file.write(content)
+
+
+class StreamWriter:
+    """
+    Writes chunks to a temp file next to path, hashing them, and renames
+    the file to path when the block exits without error. On error the temp
+    file is removed.
+
+    >>> with StreamWriter('/tmp/driver.zip') as writer:
+    ...     writer.write(b'chunk')
+    >>> writer.size, writer.sha256
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self.sha256 = None
+        import hashlib
+
+        self._digest = hashlib.sha256()
+        self._file = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        handle, self._tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or '.', suffix='.part')
+        self._file = os.fdopen(handle, 'wb')
+        return self
+
+    def write(self, chunk):
+        """
+        Writes and hashes a chunk.
+        """
+        self._file.write(chunk)
+        self._digest.update(chunk)
+        self.size += len(chunk)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.close()
+        if exc_type is not None:
+            os.remove(self._tmp_path)
+            return
+        os.replace(self._tmp_path, self.path)
+        self.sha256 = self._digest.hexdigest()
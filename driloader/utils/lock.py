@@ -0,0 +1,132 @@
+# pylint: disable=import-outside-toplevel, import-error
+"""
+driloader.utils.lock
+--------------------
+
+Cross-process file locking.
+"""
+
+import os
+import time
+
+
+class FileLock:
+    """
+    An exclusive lock held on a file, shared by every process and thread
+    that opens the same path. It uses flock on POSIX and msvcrt on Windows.
+
+    A shared lock can be held by many at once, and excludes exclusive ones.
+    msvcrt has no shared locks, so on Windows a shared lock isn't taken.
+
+    The lock file may be removed while it's held: a lock acquired on a file
+    that was removed in the meantime is acquired again on the new one.
+
+    >>> with FileLock('/tmp/chromedriver.lock'):
+    ...     pass  # only one process at a time runs this block
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, path, shared=False):
+        self.path = path
+        self.shared = shared
+        self._file = None
+
+    def acquire(self, blocking=True):
+        """
+        Acquires the lock.
+        :param blocking: waits for the lock if another process holds it.
+        :return: True if the lock was acquired, False otherwise.
+        """
+        if self.shared and os.name == 'nt':
+            return True
+        while True:
+            file = open(self.path, 'a+b')  # pylint: disable=consider-using-with
+            try:
+                while not FileLock._lock(file, blocking, self.shared):
+                    if not blocking:
+                        file.close()
+                        return False
+                    time.sleep(FileLock.POLL_INTERVAL)
+            except BaseException:
+                file.close()
+                raise
+            if FileLock._is_current(file, self.path):
+                self._file = file
+                return True
+            file.close()
+
+    async def acquire_async(self):
+        """
+        Async version of acquire, waiting without blocking the event loop.
+        The lock is only taken on the loop itself, so a task cancelled
+        while waiting never leaves it held.
+        """
+        import asyncio
+
+        while not self.acquire(blocking=False):
+            await asyncio.sleep(FileLock.POLL_INTERVAL)
+        return True
+
+    def release(self):
+        """
+        Releases the lock.
+        """
+        if self._file is None:
+            return
+        FileLock._unlock(self._file)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    @staticmethod
+    def _is_current(file, path):
+        """
+        Tells if the locked file is still the one at path, and wasn't
+        removed while this waited for it.
+        """
+        if os.name == 'nt':
+            return True
+        try:
+            current = os.stat(path)
+        except OSError:
+            return False
+        locked = os.fstat(file.fileno())
+        return (locked.st_dev, locked.st_ino) == \
+            (current.st_dev, current.st_ino)
+
+    @staticmethod
+    def _lock(file, blocking, shared=False):
+        if os.name == 'nt':
+            import msvcrt
+            try:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                return False
+        import fcntl
+        try:
+            operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            fcntl.flock(file.fileno(),
+                        operation if blocking
+                        else operation | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    @staticmethod
+    def _unlock(file):
+        if os.name == 'nt':
+            import msvcrt
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,18 @@
+"""
+driloader.utils.versions
+------------------------
+
+Helpers to compare dotted version strings.
+"""
+
+import re
+
+
+def version_tuple(version):
+    """
+    Converts a dotted version string into a tuple of ints, so versions
+    compare numerically: '85.0.4183.102' > '85.0.4183.87'.
+    :param version: a version string like '3.150.1'.
+    :return: a tuple like (3, 150, 1).
+    """
+    return tuple(int(part) for part in re.findall(r'\d+', version))
@@ -3,7 +3,7 @@ from setuptools import setup, find_packages
 with open("README.md", "r", encoding="utf-8") as fh:
     LONG_DESCRIPTION = fh.read()
 DESCRIPTION = 'Driver downloader for Selenium'
-REQUIRED = ['certifi', 'chardet', 'idna', 'requests', 'urllib3', 'requests_html']
+REQUIRED = ['certifi', 'chardet', 'idna', 'requests', 'urllib3']
 
 setup(
     name='driloader',
@@ -12,6 +12,7 @@ setup(
     package_data={'driloader': ['drivers_info.ini'],
                   'driloader.config': ['browsers.ini']},
     install_requires=REQUIRED,
+    extras_require={'async': ['aiohttp']},
     include_package_data=True,
     author='Lucas Trajano; Felipe Viegas; Jonatha Daguerre',
     license='MIT',
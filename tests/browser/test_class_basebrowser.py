@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+import zipfile
+
+from driloader.browser.chrome import Chrome
+from driloader.browser.drivers import Driver
+from driloader.browser.firefox import Firefox
+from driloader.config.compatibility import CompatibilityDatabase
+from driloader.http.operations import HttpOperations
+from driloader.utils.file import FileHandler
+
+
+class TestBaseBrowser:
+
+    @staticmethod
+    def _chrome(tmp_path, mocker):
+        mocker.patch('os.name', 'posix')
+        mocker.patch('driloader.browser.drivers.Driver.create_folder',
+                     return_value=str(tmp_path))
+        driver = Driver('chrome')
+        driver.version = '85.0.4183.87'
+        return Chrome(driver)
+
+    @staticmethod
+    def _fake_download(downloads):
+        def download(url, path):
+            downloads.append(url)
+            time.sleep(0.2)
+            with zipfile.ZipFile(path, 'w') as archive:
+                archive.writestr('chromedriver', 'driver')
+        return download
+
+    @staticmethod
+    def test_concurrent_installs_download_once(tmp_path, mocker):
+        downloads = []
+        mocker.patch('driloader.http.operations.HttpOperations.download',
+                     side_effect=TestBaseBrowser._fake_download(downloads))
+        browsers = [TestBaseBrowser._chrome(tmp_path, mocker) for _ in range(4)]
+        paths = []
+
+        def install(browser):
+            paths.append(browser._download_and_unzip(
+                HttpOperations(), browser.driver, FileHandler(), replace_version=True))
+
+        threads = [threading.Thread(target=install, args=(browser,))
+                   for browser in browsers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(downloads) == 1
+        assert len(set(paths)) == 1
+        assert os.listdir(os.path.dirname(paths[0])) == ['chromedriver']
+
+    @staticmethod
+    def test_warm_get_driver_skips_network(tmp_path, mocker):
+        downloads = []
+        mocker.patch('driloader.http.operations.HttpOperations.download',
+                     side_effect=TestBaseBrowser._fake_download(downloads))
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='120.0.6099.109')
+        match = mocker.patch('driloader.browser.chrome.Chrome.'
+                             '_driver_matching_installed_version',
+                             return_value='120.0.6099.109')
+        mocker.patch('driloader.http.chrome_for_testing.ChromeForTesting.url',
+                     return_value='https://cft/120.0.6099.109/chromedriver.zip')
+
+        cold = TestBaseBrowser._chrome(tmp_path, mocker).cache_ttl(0).get_driver()
+        warm = TestBaseBrowser._chrome(tmp_path, mocker).cache_ttl(0).get_driver()
+
+        assert cold == warm == os.path.join(str(tmp_path), 'chrome',
+                                            '120.0.6099.109', 'chromedriver')
+        assert match.call_count == 1
+        assert len(downloads) == 1
+
+    @staticmethod
+    def test_detection_is_cached_until_binary_changes(tmp_path, mocker):
+        binary = tmp_path / 'google-chrome'
+        binary.write_text('85')
+        run = mocker.patch('driloader.utils.commands.Commands.run',
+                           return_value='85.0.4183.87')
+
+        def detect():
+            chrome = TestBaseBrowser._chrome(tmp_path, mocker)
+            return chrome.binary(str(binary)).installed_browser_version()
+
+        assert detect() == 85
+        assert detect() == 85
+        assert run.call_count == 1
+        binary.write_text('86 update')
+        run.return_value = '86.0.4240.75'
+        assert detect() == 86
+        assert run.call_count == 2
+
+    @staticmethod
+    def test_get_driver_emits_phase_events(tmp_path, mocker):
+        downloads = []
+        mocker.patch('driloader.http.operations.HttpOperations.download',
+                     side_effect=TestBaseBrowser._fake_download(downloads))
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='85.0.4183.87')
+        mocker.patch('driloader.browser.chrome.Chrome.'
+                     '_driver_matching_installed_version',
+                     return_value='85.0.4183.87')
+        cold, warm = [], []
+
+        TestBaseBrowser._chrome(tmp_path, mocker).cache_ttl(0) \
+            .on_event(cold.append).get_driver()
+        TestBaseBrowser._chrome(tmp_path, mocker).cache_ttl(0) \
+            .on_event(warm.append).get_driver()
+
+        assert [event.phase for event in cold] == [
+            'detect', 'manifest', 'metadata', 'download', 'extract', 'chmod',
+            'gc', 'get_driver']
+        assert cold[3].url.endswith('85.0.4183.87/chromedriver_linux64.zip')
+        assert cold[4].bytes == len('driver')
+        assert cold[-1].cache_hit is False
+        assert [event.phase for event in warm] == [
+            'detect', 'manifest', 'get_driver']
+        assert warm[1].cache_hit is True
+        assert warm[2].cache_hit is True
+
+    @staticmethod
+    def test_compatible_driver_skips_network_match(tmp_path, mocker):
+        downloads = []
+        mocker.patch('driloader.http.operations.HttpOperations.download',
+                     side_effect=TestBaseBrowser._fake_download(downloads))
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='85.0.4183.102')
+        match = mocker.patch('driloader.browser.chrome.Chrome.'
+                             '_driver_matching_installed_version')
+
+        path = TestBaseBrowser._chrome(tmp_path, mocker).get_driver()
+
+        assert path == os.path.join(str(tmp_path), 'chrome', '85.0.4183.87',
+                                    'chromedriver')
+        assert not match.called
+
+    @staticmethod
+    def test_network_match_is_recorded(tmp_path, mocker):
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='120.0.6099.109')
+        mocker.patch('driloader.browser.chrome.Chrome.'
+                     '_driver_matching_installed_version',
+                     return_value='120.0.6099.109')
+
+        TestBaseBrowser._chrome(tmp_path, mocker).cache_ttl(0) \
+            ._resolve_driver_version()
+
+        assert CompatibilityDatabase(str(tmp_path)).find(
+            'chrome', 120, 3600) == '120.0.6099.109'
+
+    @staticmethod
+    def test_metadata_phase_names_its_url(tmp_path, mocker):
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='120.0.6099.109')
+        mocker.patch('driloader.browser.chrome.Chrome.'
+                     '_driver_matching_installed_version',
+                     return_value='120.0.6099.109')
+        events = []
+
+        chrome = TestBaseBrowser._chrome(tmp_path, mocker).cache_ttl(0)
+        chrome.on_event(events.append)._resolve_driver_version()
+
+        metadata = [event for event in events if event.phase == 'metadata']
+        assert metadata[0].url == chrome._config.last_known_good_url()
+        assert metadata[0].cache_hit is False
+
+    @staticmethod
+    def test_ttl_zero_reaches_the_network(tmp_path, mocker):
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='120.0.6099.109')
+        match = mocker.patch('driloader.browser.chrome.Chrome.'
+                             '_driver_matching_installed_version',
+                             return_value='120.0.6099.129')
+        CompatibilityDatabase(str(tmp_path)).record('chrome', 120,
+                                                    '120.0.6099.71')
+
+        version = TestBaseBrowser._chrome(tmp_path, mocker).cache_ttl(0) \
+            ._resolve_driver_version()
+
+        assert version == '120.0.6099.129'
+        assert match.call_count == 1
+
+    @staticmethod
+    def test_unreachable_metadata_falls_back(tmp_path, mocker):
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='Mozilla Firefox 128.0')
+        mocker.patch('os.name', 'posix')
+        mocker.patch('driloader.browser.drivers.Driver.create_folder',
+                     return_value=str(tmp_path))
+        mocker.patch('driloader.browser.firefox.Firefox._metadata_version',
+                     return_value=None)
+        mocker.patch('driloader.browser.firefox.Firefox._latest_driver',
+                     side_effect=ConnectionError('offline'))
+
+        assert Firefox(Driver('firefox'))._resolve_driver_version() == '0.35.0'
@@ -1,11 +1,10 @@
 import os
-import shutil
+import plistlib
 import zipfile
 from random import random
 
 import pytest
 from requests import Response
-from requests_html import HTMLResponse, HTML, Element
 
 from driloader.browser.chrome import Chrome
 from driloader.browser.drivers import Driver
@@ -42,28 +41,111 @@ class TestChrome:
 
 
     @staticmethod
-    def test_get_driver(mocker):
+    def test_installed_version_from_windows_install_folders(tmp_path, mocker):
+        mocker.patch('os.name', 'nt')
+        for name in ('84.0.4147.135', '85.0.4183.102', 'SetupMetrics'):
+            (tmp_path / name).mkdir()
+        run = mocker.patch('driloader.utils.commands.Commands.run')
+        chrome = Chrome(Driver('chrome')).binary(str(tmp_path / 'chrome.exe'))
+        assert chrome.installed_browser_version() == 85
+        assert not run.called
+
+    @staticmethod
+    def test_installed_version_from_info_plist(tmp_path, mocker):
+        mocker.patch('os.name', 'posix')
+        mocker.patch('sys.platform', 'darwin')
+        contents = tmp_path / 'Google Chrome.app' / 'Contents'
+        (contents / 'MacOS').mkdir(parents=True)
+        with open(str(contents / 'Info.plist'), 'wb') as file:
+            plistlib.dump({'CFBundleShortVersionString': '86.0.4240.75'}, file)
+        run = mocker.patch('driloader.utils.commands.Commands.run')
+        chrome = Chrome(Driver('chrome')).binary(
+            str(contents / 'MacOS' / 'Google Chrome'))
+        assert chrome.installed_browser_version() == 86
+        assert not run.called
+
+    @staticmethod
+    def test_installed_version_is_detected_once(mocker):
+        run = mocker.patch('driloader.utils.commands.Commands.run',
+                           return_value='85.0.4183.102')
+        chrome = Chrome(Driver('chrome'))
+        assert chrome.installed_browser_version() == 85
+        assert chrome.installed_browser_version() == 85
+        assert run.call_count == 1
+
+    @staticmethod
+    def test_notes_are_fetched_once_for_legacy_versions(mocker):
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='65.0.3325.181')
+        mount = mocker.patch('driloader.browser.chrome.Chrome._mount_chrome_dict',
+                             return_value={'2.38': {'from': '65', 'to': '67'},
+                                           '2.37': {'from': '64', 'to': '66'}})
+        chrome = Chrome(Driver('chrome'))
+        assert chrome._driver_matching_installed_version() == '2.38'
+        assert chrome._driver_matching_installed_version() == '2.38'
+        assert mount.call_count == 1
+
+    @staticmethod
+    def test_get_driver(mock_system, mocker, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
         driver = Driver()
         driver.browser = 'chrome'
-        driver.version = '123mock'
+        driver.version = '85mock'
         driver.drivers_path = '../'
-        mocker.patch.object(HTML, 'find')
 
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='85.0.4183.87')
         mocker.patch('driloader.browser.chrome.Chrome._get_latest_driver_version_from_chrome_version',
-                     return_value='123mock')
+                     return_value='85mock')
         mocker.patch('driloader.config.paths.Paths.zipped_file_path',
                      return_value='./chrome/{}/chromedriver.zip'.format(driver.version))
-        mocker.patch('driloader.utils.file.FileHandler.write_content',
-                     side_effect=TestChrome._zip_file_mock(driver))
-        mocker.patch('driloader.http.operations.HttpOperations.get',
-                     return_value=Response())
-        Chrome(driver).get_driver()
-        shutil.rmtree('./chrome/', ignore_errors=True)
+        mocker.patch('driloader.http.operations.HttpOperations.download',
+                     side_effect=TestChrome._zip_file_mock)
+        Chrome(driver).refresh().get_driver()
+        assert os.access('./chrome/85mock/chromedriver', os.X_OK)
+        assert os.listdir('./chrome/85mock') == ['chromedriver']
+
+    @staticmethod
+    def test_get_driver_from_chrome_for_testing(mocker, tmp_path):
+        mocker.patch('os.name', 'posix')
+        mocker.patch('driloader.browser.drivers.Driver.create_folder',
+                     return_value=str(tmp_path))
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='120.0.6099.129')
+        url = 'https://cft/120.0.6099.109/linux64/chromedriver-linux64.zip'
+        mocker.patch('driloader.http.chrome_for_testing.ChromeForTesting.find',
+                     return_value='120.0.6099.109')
+        mocker.patch('driloader.http.chrome_for_testing.ChromeForTesting.url',
+                     return_value=url)
+        download = mocker.patch('driloader.http.operations.HttpOperations.download',
+                                side_effect=TestChrome._zip_file_mock)
+
+        path = Chrome(Driver('chrome')).get_driver()
+
+        assert path == os.path.join(str(tmp_path), 'chrome', '120.0.6099.109',
+                                    'chromedriver')
+        assert download.call_args[0][0] == url
+
+    @staticmethod
+    def test_refresh_revalidates_chrome_for_testing(mocker):
+        chrome = Chrome(Driver('chrome'))
+        assert chrome._chrome_for_testing().ttl == \
+            chrome.config.resolution_ttl()
+        assert chrome.refresh()._chrome_for_testing().ttl == 0
+
+    @staticmethod
+    def test_latest_driver_for_chrome_version_sorts_by_version(mocker):
+        mocker.patch('driloader.http.bucket.BucketListing.keys',
+                     return_value=iter(['85.0.4183.102/chromedriver_linux64.zip',
+                                        '85.0.4183.87/chromedriver_linux64.zip',
+                                        '85.0.4183.121/notes.txt']))
+        mocker.patch('os.name', 'posix')
+        chrome = Chrome(Driver('chrome'))
+        assert chrome._get_latest_driver_version_from_chrome_version(85) == \
+            '85.0.4183.102'
 
     @staticmethod
-    def _zip_file_mock(driver):
-        shutil.rmtree('./chrome/', ignore_errors=True)
-        os.makedirs('./chrome/{}'.format(driver.version))
-        zip_mock = zipfile.ZipFile('./chrome/{}/chromedriver.zip'.format(driver.version), 'w')
-        zip_mock.write('./chrome/{}/chromedriver.zip'.format(driver.version))
+    def _zip_file_mock(url, path):
+        zip_mock = zipfile.ZipFile(path, 'w')
+        zip_mock.writestr('chromedriver_linux64/chromedriver', 'mock')
         zip_mock.close()
@@ -0,0 +1,92 @@
+import asyncio
+import io
+import os
+import tarfile
+
+from driloader.browser.drivers import Driver
+from driloader.browser.firefox import Firefox
+
+
+class FakeAsyncHttp:
+
+    def __init__(self):
+        self.downloads = []
+
+    @staticmethod
+    async def get_text(url, params=None, verify=True):
+        return 'https://github.com/mozilla/geckodriver/releases/tag/v0.27.0', ''
+
+    async def download(self, url, path, verify=False):
+        self.downloads.append(url)
+        with tarfile.open(path, 'w:gz') as tar:
+            info = tarfile.TarInfo('geckodriver')
+            info.size = 6
+            tar.addfile(info, io.BytesIO(b'driver'))
+
+
+class TestFirefox:
+
+    @staticmethod
+    def test_construction_does_not_fetch(mocker):
+        get = mocker.patch('driloader.http.operations.HttpOperations.get')
+        Firefox(Driver('firefox'))
+        assert not get.called
+
+    @staticmethod
+    def test_latest_driver_is_fetched_once(mocker):
+        latest = mocker.patch('driloader.browser.firefox.Firefox._latest_driver',
+                              return_value='0.27.0')
+        firefox = Firefox(Driver('firefox'))
+        assert firefox._driver_matching_installed_version() == '0.27.0'
+        assert firefox._driver_matching_installed_version() == '0.27.0'
+        assert latest.call_count == 1
+
+    @staticmethod
+    def test_refresh_fetches_latest_driver_again(mocker):
+        latest = mocker.patch('driloader.browser.firefox.Firefox._latest_driver',
+                              side_effect=['0.27.0', '0.28.0'])
+        firefox = Firefox(Driver('firefox'))
+        assert firefox._driver_matching_installed_version() == '0.27.0'
+        firefox.refresh()
+        assert firefox._driver_matching_installed_version() == '0.28.0'
+        assert latest.call_count == 2
+
+    @staticmethod
+    def test_installed_version_from_output(mocker):
+        mocker.patch('os.name', 'posix')
+        mocker.patch('driloader.browser.firefox.Firefox._metadata_version',
+                     return_value=None)
+        mocker.patch('driloader.utils.commands.Commands.run',
+                     return_value='Mozilla Firefox 115.0.2')
+        assert Firefox(Driver('firefox')).installed_browser_version() == 115
+
+    @staticmethod
+    def test_installed_version_from_application_ini(tmp_path, mocker):
+        mocker.patch('os.name', 'posix')
+        binary = tmp_path / 'firefox'
+        binary.write_text('')
+        (tmp_path / 'application.ini').write_text(
+            '[App]\nVendor=Mozilla\nName=Firefox\nVersion=115.0.2\n')
+        mocker.patch('shutil.which', return_value=str(binary))
+        run = mocker.patch('driloader.utils.commands.Commands.run')
+        assert Firefox(Driver('firefox')).installed_browser_version() == 115
+        assert not run.called
+
+    @staticmethod
+    def test_get_driver_async(tmp_path, mocker):
+        mocker.patch('os.name', 'posix')
+        mocker.patch('driloader.browser.firefox.Firefox._metadata_version',
+                     return_value=None)
+        mocker.patch('driloader.browser.drivers.Driver.create_folder',
+                     return_value=str(tmp_path))
+        mocker.patch('driloader.utils.commands.Commands.run_async',
+                     return_value='Mozilla Firefox 80.0')
+        http = FakeAsyncHttp()
+
+        path = asyncio.run(Firefox(Driver('firefox')).get_driver_async(http))
+
+        assert path == os.path.join(str(tmp_path), 'firefox', '0.30.0',
+                                    'geckodriver')
+        assert os.access(path, os.X_OK)
+        assert http.downloads == ['https://github.com/mozilla/geckodriver/releases/'
+                                  'download/v0.30.0/geckodriver-v0.30.0-linux64.tar.gz']
@@ -0,0 +1,90 @@
+import asyncio
+
+from driloader.browser.drivers import Driver
+from driloader.browser.internet_explorer import IE
+from driloader.config.paths import Paths
+from driloader.http.operations import HttpOperations
+
+
+KEYS = ['2.53/IEDriverServer_Win32_2.53.1.zip',
+        '2.53/selenium-server-standalone-2.53.1.jar',
+        '3.141/IEDriverServer_Win32_3.141.59.zip',
+        '3.141/IEDriverServer_x64_3.141.59.zip',
+        '3.150/IEDriverServer_Win32_3.150.1.zip',
+        '3.150/IEDriverServer_x64_3.150.1.zip',
+        '3.9/IEDriverServer_Win32_3.9.0.zip']
+
+LISTING = '<ListBucketResult><IsTruncated>false</IsTruncated>{}' \
+          '</ListBucketResult>'.format(''.join(
+              '<Contents><Key>{}</Key></Contents>'.format(key)
+              for key in KEYS)).encode('utf-8')
+
+
+class FakeAsyncHttp:
+
+    def __init__(self):
+        self.requests = 0
+
+    async def get_cached(self, url, params=None, verify=True):
+        self.requests += 1
+        return HttpOperations.response_cache().store(
+            'listing', url, 200, {}, [LISTING])
+
+
+def _ie(mocker, x64=False):
+    mocker.patch('driloader.browser.internet_explorer.IE._is_windows_x64',
+                 return_value=x64)
+    mocker.patch.dict(IE._index, clear=True)
+    return IE(Driver('ie'))
+
+
+class TestIE:
+
+    @staticmethod
+    def test_latest_driver_compares_full_versions(mocker):
+        mocker.patch('driloader.http.bucket.BucketListing.keys',
+                     return_value=iter(KEYS))
+        assert _ie(mocker)._latest_driver() == '3.150.1'
+
+    @staticmethod
+    def test_latest_driver_for_x64(mocker):
+        keys = KEYS + ['3.150/IEDriverServer_Win32_3.150.2.zip']
+        mocker.patch('driloader.http.bucket.BucketListing.keys',
+                     return_value=iter(keys))
+        assert _ie(mocker, x64=True)._latest_driver() == '3.150.1'
+
+    @staticmethod
+    def test_listing_is_walked_once(mocker):
+        keys = mocker.patch('driloader.http.bucket.BucketListing.keys',
+                            return_value=iter(KEYS))
+        _ie(mocker)._latest_driver()
+        assert IE(Driver('ie'))._latest_driver() == '3.150.1'
+        assert keys.call_count == 1
+
+    @staticmethod
+    def test_refresh_walks_the_listing_again(mocker):
+        keys = mocker.patch('driloader.http.bucket.BucketListing.keys',
+                            side_effect=lambda: iter(KEYS))
+        ie = _ie(mocker)
+        ie._driver_matching_installed_version()
+        ie.refresh()._driver_matching_installed_version()
+        IE(Driver('ie')).refresh()._driver_matching_installed_version()
+        assert keys.call_count == 3
+
+    @staticmethod
+    def test_latest_driver_async(mocker):
+        http = FakeAsyncHttp()
+        ie = _ie(mocker)
+        assert asyncio.run(ie._latest_driver_async(http)) == '3.150.1'
+        assert asyncio.run(ie._latest_driver_async(http)) == '3.150.1'
+        assert http.requests == 1
+
+    @staticmethod
+    def test_download_url_has_short_version(tmp_path, mocker):
+        ie = _ie(mocker)
+        driver = Driver('ie')
+        driver.version = '3.150.1'
+        url = Paths(str(tmp_path), ie, driver).download_url(
+            replace_version='3.150.1')
+        assert url == 'http://selenium-release.storage.googleapis.com/' \
+                      '3.150/IEDriverServer_Win32_3.150.1.zip'
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+"""
+tests.conftest
+--------------
+
+Fixtures shared by every test.
+"""
+
+
+import pytest
+
+from driloader.browser.basebrowser import BaseBrowser
+from driloader.cache.detection import DetectionCache
+from driloader.daemon import DaemonClient
+from driloader.http.operations import HttpOperations
+
+
+@pytest.fixture(autouse=True)
+def isolated_detection_cache(tmp_path_factory, monkeypatch):
+    """ Keeps browsers detected on the test machine out of the tests. """
+    root = str(tmp_path_factory.mktemp('detections'))
+    monkeypatch.setattr(BaseBrowser, '_detection_cache',
+                        lambda self: DetectionCache(root))
+
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path_factory, monkeypatch):
+    """ Keeps metadata cached on the test machine out of the tests. """
+    monkeypatch.setattr(HttpOperations, 'cache_root',
+                        str(tmp_path_factory.mktemp('responses')))
+
+
+@pytest.fixture(autouse=True)
+def isolated_daemon(tmp_path_factory, monkeypatch):
+    """ Keeps a daemon running on the test machine out of the tests. """
+    root = str(tmp_path_factory.mktemp('daemon'))
+    monkeypatch.setattr(BaseBrowser, '_daemon',
+                        lambda self: DaemonClient(root))
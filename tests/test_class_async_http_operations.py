@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_async_http_operations
+--------------------------------------
+
+The test set for functions in driloader.http.async_operations, against a
+local aiohttp server
+"""
+
+
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+
+import pytest
+
+from driloader.http.async_operations import AsyncHttpOperations
+from driloader.http.operations import HttpOperations
+
+web = pytest.importorskip('aiohttp.web')
+
+
+BODY = bytes(range(256)) * 40
+METADATA = b'{"version": "0.30.0"}'
+ETAG = '"v1"'
+
+
+class Archive:
+    """ Serves body with an ETag, in ranges when asked, logging requests. """
+
+    def __init__(self, body=BODY, drops=0):
+        self.body = body
+        self.drops = drops
+        self.requests = []
+
+    async def handle(self, request):
+        """ Answers a HEAD or GET of the archive. """
+        self.requests.append((request.method, request.headers.get('Range'),
+                              request.headers.get('If-None-Match')))
+        headers = {'ETag': ETAG, 'Accept-Ranges': 'bytes'}
+        if request.headers.get('If-None-Match') == ETAG:
+            return web.Response(status=304, headers=headers)
+        if 'Range' in request.headers and \
+                request.headers.get('If-Range') == ETAG:
+            start, _, end = request.headers['Range'][6:].partition('-')
+            start, end = int(start), int(end or len(self.body) - 1)
+            headers['Content-Range'] = 'bytes {}-{}/{}'.format(
+                start, end, len(self.body))
+            return web.Response(status=206, body=self.body[start:end + 1],
+                                headers=headers)
+        if self.drops and request.method == 'GET':
+            self.drops -= 1
+            response = web.StreamResponse(headers=headers)
+            response.content_length = len(self.body)
+            await response.prepare(request)
+            await response.write(self.body[:1000])
+            request.transport.close()
+            return response
+        return web.Response(body=self.body, headers=headers)
+
+
+@asynccontextmanager
+async def _serve(archive):
+    """ Runs a server for archive, yielding its url. """
+    app = web.Application()
+    app.router.add_get('/driver.zip', archive.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        yield 'http://{}:{}/driver.zip'.format(host, port)
+    finally:
+        await runner.cleanup()
+
+
+def _run(archive, call):
+    """ Calls call(http, url) with the archive served. """
+    async def run():
+        async with _serve(archive) as url, AsyncHttpOperations() as http:
+            return await call(http, url)
+    return asyncio.run(run())
+
+
+class TestAsyncHttpOperations:
+    """ Test AsyncHttpOperations requests and downloads """
+
+    @staticmethod
+    def test_get_conditional():
+        """ A matching If-None-Match gets a 304 and no body. """
+        async def call(http, url):
+            return (await http.get_conditional(url),
+                    await http.get_conditional(
+                        url, headers={'If-None-Match': ETAG}))
+
+        changed, unchanged = _run(Archive(METADATA), call)
+        assert changed[0] == 200
+        assert {name.lower(): value for name, value in changed[1].items()}[
+            'etag'] == ETAG
+        assert changed[2] == METADATA.decode('utf-8')
+        assert unchanged == (304, unchanged[1], '')
+
+    @staticmethod
+    def test_get_cached_revalidates():
+        """ The second request is conditional and reuses the stored body. """
+        archive = Archive()
+
+        async def call(http, url):
+            return [await http.get_cached(url) for _ in range(2)]
+
+        first, second = _run(archive, call)
+        assert first.content == second.content == BODY
+        assert not first.from_cache and second.from_cache
+        assert [etag for _, _, etag in archive.requests] == [None, ETAG]
+
+    @staticmethod
+    def test_dropped_download_is_resumed(tmp_path):
+        """ A dropped connection is resumed from the bytes already got. """
+        archive = Archive(drops=1)
+        path = str(tmp_path / 'driver.zip')
+        download = _run(archive, lambda http, url: http.download(url, path))
+        with open(path, 'rb') as file:
+            assert file.read() == BODY
+        assert download.sha256 == hashlib.sha256(BODY).hexdigest()
+        assert [header for _, header, _ in archive.requests] == \
+            [None, 'bytes=1000-']
+
+    @staticmethod
+    def test_segmented_download(tmp_path, monkeypatch):
+        """ A big enough archive is fetched in concurrent ranges. """
+        monkeypatch.setattr(HttpOperations, 'segments', 4)
+        monkeypatch.setattr(HttpOperations, 'segment_min_size', 1024)
+        archive = Archive()
+        path = str(tmp_path / 'driver.zip')
+        download = _run(archive, lambda http, url: http.download(url, path))
+        with open(path, 'rb') as file:
+            assert file.read() == BODY
+        assert download.size == len(BODY)
+        assert archive.requests[0][0] == 'HEAD'
+        assert sorted(header for _, header, _ in archive.requests[1:]) == \
+            ['bytes=0-2559', 'bytes=2560-5119', 'bytes=5120-7679',
+             'bytes=7680-10239']
+        assert not list(tmp_path.glob('*.part'))
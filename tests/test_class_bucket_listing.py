@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_bucket_listing
+-------------------------------
+
+The test set for functions in driloader.http.bucket.BucketListing
+"""
+
+
+from driloader.http.bucket import BucketListing
+
+
+LISTING = b"""<?xml version='1.0' encoding='UTF-8'?>
+<ListBucketResult xmlns='http://doc.s3.amazonaws.com/2006-03-01'>
+<Name>chromedriver</Name><Prefix>85.</Prefix><IsTruncated>false</IsTruncated>
+<Contents><Key>85.0.4183.38/chromedriver_linux64.zip</Key><Size>1</Size></Contents>
+<Contents><Key>85.0.4183.87/chromedriver_linux64.zip</Key><Size>1</Size></Contents>
+<Contents><Key>85.0.4183.87/notes.txt</Key><Size>1</Size></Contents>
+</ListBucketResult>"""
+
+
+class TestBucketListing:
+    """ Test BucketListing parsing of S3 style listings """
+
+    @staticmethod
+    def test_parse_yields_keys_across_chunks():
+        """ Keys split between chunks are still parsed. """
+        chunks = [LISTING[i:i + 7] for i in range(0, len(LISTING), 7)]
+        assert list(BucketListing.parse(chunks)) == [
+            '85.0.4183.38/chromedriver_linux64.zip',
+            '85.0.4183.87/chromedriver_linux64.zip',
+            '85.0.4183.87/notes.txt']
+
+    @staticmethod
+    def test_keys_requests_prefix(mocker):
+        """ The prefix is sent to the server instead of filtered locally. """
+        response = mocker.Mock(status_code=200, url='http://bucket/',
+                               headers={})
+        response.iter_content.return_value = [LISTING]
+        get = mocker.patch('driloader.http.operations.HttpOperations.get',
+                           return_value=response)
+        keys = list(BucketListing('http://bucket/').keys(prefix='85.'))
+        assert len(keys) == 3
+        assert get.call_args[1]['params'] == {'prefix': '85.'}
+
+    @staticmethod
+    def test_keys_follows_truncated_pages(mocker):
+        """ Truncated listings are continued from the last key. """
+        first, second = [mocker.Mock(status_code=200, url='http://bucket/',
+                                     headers={}) for _ in range(2)]
+        first.iter_content.return_value = [
+            b'<ListBucketResult><IsTruncated>true</IsTruncated>'
+            b'<Contents><Key>a</Key></Contents>'
+            b'<Contents><Key>b</Key></Contents></ListBucketResult>']
+        second.iter_content.return_value = [LISTING]
+        get = mocker.patch('driloader.http.operations.HttpOperations.get',
+                           side_effect=[first, second])
+        keys = list(BucketListing('http://bucket/').keys())
+        assert keys[:2] == ['a', 'b'] and len(keys) == 5
+        assert get.call_args_list[1][1]['params'] == {'prefix': '',
+                                                      'marker': 'b'}
+
+    @staticmethod
+    def test_next_marker_takes_precedence():
+        """ NextMarker, when sent, is the marker of the next page. """
+        page = {}
+        list(BucketListing.parse([
+            b'<ListBucketResult><IsTruncated>true</IsTruncated>'
+            b'<NextMarker>m</NextMarker>'
+            b'<Contents><Key>a</Key></Contents></ListBucketResult>'], page))
+        assert page == {'truncated': True, 'marker': 'm', 'next_marker': 'm'}
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_cache_collector
+--------------------------------
+
+The test set for functions in driloader.cache.collector.CacheCollector
+"""
+
+
+import os
+import subprocess
+import sys
+import time
+
+from driloader.browser.drivers import Driver
+from driloader.cache.collector import CacheCollector
+from driloader.cache.manifest import Manifest
+from driloader.utils.lock import FileLock
+
+
+def _install(tmp_path, browser, version, size, last_used):
+    folder = tmp_path / browser / version
+    folder.mkdir(parents=True)
+    binary = folder / 'driver'
+    binary.write_bytes(b'x' * size)
+    driver = Driver(browser)
+    driver.version = version
+    Manifest(str(tmp_path)).record(driver, 1, str(binary), 'abc')
+    manifest = Manifest(str(tmp_path))
+    entries = manifest.entries()
+    key = Manifest.key(browser, version, driver.platform())
+    entries[key]['last_used'] = last_used
+    manifest._write(entries)
+    os.utime(str(folder), (last_used, last_used))
+    return str(folder)
+
+
+HOUR = 3600
+
+USE_DRIVER = '''
+import sys, time
+from driloader.cache.collector import CacheCollector
+CacheCollector.mark_in_use(sys.argv[1])
+print('using', flush=True)
+time.sleep(30)
+'''
+
+
+class TestCacheCollector:
+    """ Test CacheCollector against a temporary drivers folder """
+
+    @staticmethod
+    def test_expired_drivers_are_removed(tmp_path):
+        """ Drivers unused for longer than max_age are removed. """
+        now = time.time()
+        old = _install(tmp_path, 'chrome', '80.0', 10, now - 5 * HOUR)
+        new = _install(tmp_path, 'chrome', '85.0', 10, now - 2 * HOUR)
+        removed = CacheCollector(str(tmp_path), 0, 3 * HOUR).collect()
+        assert [folder.path for folder in removed] == [old]
+        assert not os.path.exists(old)
+        assert os.path.exists(new)
+        assert len(Manifest(str(tmp_path)).entries()) == 1
+
+    @staticmethod
+    def test_least_recently_used_drivers_go_over_budget(tmp_path):
+        """ The least recently used drivers are removed to fit the budget. """
+        now = time.time()
+        oldest = _install(tmp_path, 'chrome', '80.0', 10, now - 4 * HOUR)
+        older = _install(tmp_path, 'firefox', '0.26.0', 10, now - 3 * HOUR)
+        newest = _install(tmp_path, 'chrome', '85.0', 10, now - 2 * HOUR)
+        CacheCollector(str(tmp_path), 15, 0).collect()
+        assert not os.path.exists(oldest)
+        assert not os.path.exists(older)
+        assert os.path.exists(newest)
+
+    @staticmethod
+    def test_kept_and_locked_drivers_are_not_removed(tmp_path):
+        """ Drivers in keep, or locked by another install, are left alone. """
+        old = time.time() - 5 * HOUR
+        kept = _install(tmp_path, 'chrome', '80.0', 10, old)
+        locked = _install(tmp_path, 'chrome', '81.0', 10, old)
+        with FileLock(locked + '.lock'):
+            removed = CacheCollector(str(tmp_path), 0, HOUR).collect(
+                keep=[kept])
+        assert removed == []
+        assert os.path.exists(kept)
+        assert os.path.exists(locked)
+
+    @staticmethod
+    def test_recently_used_drivers_are_not_removed(tmp_path):
+        """ A folder used within GRACE_PERIOD is kept, over budget or not. """
+        now = time.time()
+        used = _install(tmp_path, 'chrome', '80.0', 10, now - 5 * HOUR)
+        os.utime(used)
+        assert CacheCollector(str(tmp_path), 1, 1).collect() == []
+        assert os.path.exists(used)
+
+    @staticmethod
+    def test_drivers_in_use_are_not_removed(tmp_path):
+        """ A driver a running process got isn't removed, however old. """
+        folder = _install(tmp_path, 'chrome', '80.0', 10,
+                          time.time() - 5 * HOUR)
+        user = subprocess.Popen([sys.executable, '-c', USE_DRIVER, folder],
+                                stdout=subprocess.PIPE)
+        try:
+            assert user.stdout.readline().strip() == b'using'
+            assert not CacheCollector(str(tmp_path), 0, HOUR).collect()
+            assert os.path.exists(folder)
+        finally:
+            user.kill()
+            user.wait()
+        assert CacheCollector(str(tmp_path), 0, HOUR).collect()
+        assert not os.path.exists(folder)
+        assert not os.path.exists(folder + CacheCollector.IN_USE_SUFFIX)
+
+    @staticmethod
+    def test_touch_marks_the_folder_used(tmp_path):
+        """ Manifest.touch bumps the folder time, even between writes. """
+        folder = _install(tmp_path, 'chrome', '80.0', 10, time.time())
+        os.utime(folder, (0, 0))
+        manifest = Manifest(str(tmp_path))
+        entry = next(iter(manifest.entries().values()))
+        manifest.touch(entry)
+        assert time.time() - os.path.getmtime(folder) < HOUR
+
+    @staticmethod
+    def test_leftovers_are_removed(tmp_path):
+        """ Stale locks, old temp folders and trash are removed. """
+        now = time.time()
+        kept = _install(tmp_path, 'chrome', '85.0', 10, now)
+        stale_lock = tmp_path / 'chrome' / '80.0.lock'
+        stale_lock.write_text('')
+        stale_use = tmp_path / 'chrome' / '80.0.inuse'
+        stale_use.write_text('')
+        trash = tmp_path / 'chrome' / '.trash-79.0'
+        trash.mkdir()
+        old_install = tmp_path / 'chrome' / '85.0' / '.install-old'
+        old_install.mkdir()
+        os.utime(str(old_install), (now - 2 * HOUR, now - 2 * HOUR))
+        new_install = tmp_path / 'chrome' / '85.0' / '.install-new'
+        new_install.mkdir()
+        CacheCollector(str(tmp_path), 0, HOUR).collect()
+        assert not stale_lock.exists()
+        assert not stale_use.exists()
+        assert not trash.exists()
+        assert not old_install.exists()
+        assert new_install.exists()
+        assert os.path.exists(kept)
+
+    @staticmethod
+    def test_leftovers_of_a_running_install_are_kept(tmp_path):
+        """ A held lock, and the temp folders under it, are left alone. """
+        now = time.time()
+        _install(tmp_path, 'chrome', '85.0', 10, now)
+        old_install = tmp_path / 'chrome' / '85.0' / '.install-old'
+        old_install.mkdir()
+        os.utime(str(old_install), (now - 2 * HOUR, now - 2 * HOUR))
+        lock_path = str(tmp_path / 'chrome' / '86.0.lock')
+        with FileLock(str(tmp_path / 'chrome' / '85.0.lock')), \
+                FileLock(lock_path):
+            CacheCollector(str(tmp_path), 0, HOUR).collect()
+        assert old_install.exists()
+        assert os.path.exists(lock_path)
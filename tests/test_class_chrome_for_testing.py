@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_chrome_for_testing
+-----------------------------------
+
+The test set for functions in driloader.http.chrome_for_testing
+"""
+
+
+import asyncio
+import json
+
+import pytest
+
+from driloader.http.chrome_for_testing import ChromeForTesting
+
+
+LAST_KNOWN_GOOD = 'https://cft/last-known-good-versions-with-downloads.json'
+KNOWN_GOOD = 'https://cft/known-good-versions-with-downloads.json'
+
+
+def _entry(version, platforms=('linux64', 'win64')):
+    return {'version': version, 'revision': '1', 'downloads': {
+        'chrome': [],
+        'chromedriver': [{'platform': name, 'url': 'https://cft/{}/{}/'
+                          'chromedriver-{}.zip'.format(version, name, name)}
+                         for name in platforms]}}
+
+
+DOCUMENTS = {
+    LAST_KNOWN_GOOD: {'timestamp': 't', 'channels': {
+        'Stable': dict(_entry('120.0.6099.109'), channel='Stable'),
+        'Beta': dict(_entry('121.0.6167.57'), channel='Beta')}},
+    KNOWN_GOOD: {'timestamp': 't', 'versions': [
+        {'version': '113.0.5672.0', 'revision': '1', 'downloads': {}},
+        _entry('116.0.5845.96'),
+        _entry('116.0.5845.110', platforms=('win64',)),
+        _entry('116.0.5845.103'),
+        _entry('120.0.6099.109')]}}
+
+
+class FakeHttp:
+    """ Serves DOCUMENTS, answering 304 to a matching If-None-Match. """
+
+    def __init__(self):
+        self.requests = []
+
+    def respond(self, url, headers):
+        self.requests.append(url)
+        etag = '"{}"'.format(len(url))
+        if headers.get('If-None-Match') == etag:
+            return 304, {}, ''
+        return 200, {'ETag': etag}, json.dumps(DOCUMENTS[url])
+
+    def get(self, url, verify=True, headers=None):
+        status, response_headers, text = self.respond(url, headers)
+        return _Response(status, response_headers, text)
+
+    async def get_conditional(self, url, headers=None, verify=True):
+        return self.respond(url, headers)
+
+
+class _Response:
+
+    def __init__(self, status_code, headers, text):
+        self.status_code, self.headers, self.text = status_code, headers, text
+
+    @staticmethod
+    def raise_for_status():
+        pass
+
+
+@pytest.fixture(name='http')
+def fixture_http(mocker):
+    """ Routes HttpOperations.get to a FakeHttp on linux64. """
+    http = FakeHttp()
+    mocker.patch('driloader.http.operations.HttpOperations.get',
+                 side_effect=http.get)
+    mocker.patch('driloader.http.chrome_for_testing.ChromeForTesting.'
+                 'platform', return_value='linux64')
+    return http
+
+
+def _resolver(tmp_path, ttl=3600):
+    return ChromeForTesting(str(tmp_path), (LAST_KNOWN_GOOD, KNOWN_GOOD), ttl)
+
+
+class TestChromeForTesting:
+    """ Test ChromeForTesting index lookups and refreshes """
+
+    @staticmethod
+    def test_find_uses_last_known_good_first(tmp_path, http):
+        """ The small document is enough for the current channels. """
+        assert _resolver(tmp_path).find(120) == '120.0.6099.109'
+        assert http.requests == [LAST_KNOWN_GOOD]
+
+    @staticmethod
+    def test_find_falls_back_to_known_good(tmp_path, http):
+        """ Older majors come from the full document, newest build first. """
+        assert _resolver(tmp_path).find(116) == '116.0.5845.103'
+        assert _resolver(tmp_path).find(121) == '121.0.6167.57'
+        assert http.requests == [LAST_KNOWN_GOOD, KNOWN_GOOD]
+
+    @staticmethod
+    def test_url_is_a_lookup(tmp_path, http):
+        """ Build urls are served from the index, for this platform. """
+        resolver = _resolver(tmp_path)
+        resolver.find(116)
+        assert resolver.url('116.0.5845.96') == \
+            'https://cft/116.0.5845.96/linux64/chromedriver-linux64.zip'
+        assert len(http.requests) == 2
+
+    @staticmethod
+    def test_stale_index_is_revalidated(tmp_path, http):
+        """ A stale index sends a conditional request, and keeps its builds
+        on a 304. """
+        _resolver(tmp_path).find(120)
+        assert _resolver(tmp_path, ttl=0).find(120) == '120.0.6099.109'
+        assert http.requests == [LAST_KNOWN_GOOD, LAST_KNOWN_GOOD]
+
+    @staticmethod
+    def test_missing_major(tmp_path, http):
+        """ Majors no document lists resolve to None. """
+        assert _resolver(tmp_path).find(200) is None
+
+    @staticmethod
+    def test_find_async(tmp_path, http):
+        """ The async lookup shares the index. """
+        resolver = _resolver(tmp_path)
+        assert asyncio.run(resolver.find_async(http, 116)) == '116.0.5845.103'
+        assert resolver.find(116) == '116.0.5845.103'
+        assert http.requests == [LAST_KNOWN_GOOD, KNOWN_GOOD]
+
+    @staticmethod
+    def test_url_async(tmp_path, http, mocker):
+        """ The async url lookup refreshes the index without requests. """
+        get = mocker.patch('driloader.http.operations.HttpOperations.get')
+        resolver = _resolver(tmp_path)
+        assert asyncio.run(resolver.url_async(http, '116.0.5845.96')) == \
+            'https://cft/116.0.5845.96/linux64/chromedriver-linux64.zip'
+        assert http.requests == [KNOWN_GOOD]
+        assert not get.called
@@ -16,6 +16,10 @@ The test set for functions in driloader.commands.Commands
 """
 
 
+import asyncio
+import sys
+import time
+
 import pytest
 
 from driloader.utils.commands import CommandError, Commands
@@ -55,3 +59,49 @@ class TestCommands:
         mocker.patch('subprocess.run', return_value=None, create=True)
         with pytest.raises(CommandError):
             Commands.run('not_existing_command')
+
+    @staticmethod
+    def test_run_async_returns_stdout():
+        """Test Commands.run_async() with a real subprocess."""
+
+        output = asyncio.run(Commands.run_async([sys.executable, '-c', 'print(42)']))
+        assert output.strip() == '42'
+
+    @staticmethod
+    def test_run_async_raises_on_missing_command():
+        """Test Commands.run_async() with a command that doesn't exist."""
+
+        with pytest.raises(CommandError):
+            asyncio.run(Commands.run_async('not_existing_command --version'))
+
+    @staticmethod
+    def test_run_async_raises_on_failure():
+        """Test Commands.run_async() with a command that exits with an error."""
+
+        with pytest.raises(CommandError):
+            asyncio.run(Commands.run_async([sys.executable, '-c', 'exit(1)']))
+
+    @staticmethod
+    def test_run_kills_command_on_timeout(tmp_path):
+        """Test Commands.run() with a command that hangs: it's killed."""
+
+        marker = tmp_path / 'finished'
+        with pytest.raises(CommandError):
+            Commands.run([sys.executable, '-c',
+                          'import time; time.sleep(1); open({!r}, "w")'
+                          .format(str(marker))], timeout=0.2)
+        time.sleep(1.3)
+        assert not marker.exists()
+
+    @staticmethod
+    def test_run_async_kills_command_on_timeout(tmp_path):
+        """Test Commands.run_async() with a command that hangs: it's killed."""
+
+        marker = tmp_path / 'finished'
+        with pytest.raises(CommandError):
+            asyncio.run(Commands.run_async(
+                [sys.executable, '-c',
+                 'import time; time.sleep(1); open({!r}, "w")'
+                 .format(str(marker))], timeout=0.2))
+        time.sleep(1.3)
+        assert not marker.exists()
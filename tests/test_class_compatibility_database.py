@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_compatibility_database
+---------------------------------------
+
+The test set for functions in driloader.config.compatibility
+"""
+
+
+import os
+import time
+
+import pytest
+
+from driloader.config.compatibility import CompatibilityDatabase
+
+
+TTL = 86400
+
+
+class TestCompatibilityDatabase:
+    """ Test CompatibilityDatabase lookups and overlay """
+
+    @staticmethod
+    @pytest.mark.parametrize('browser, major, expected', [
+        ('chrome', 70, '2.45'),
+        ('chrome', 85, '85.0.4183.87'),
+        ('chrome', 114, '114.0.5735.90'),
+        ('chrome', 82, None),
+        ('chrome', 115, None),
+        ('firefox', 51, None),
+        ('firefox', 60, '0.29.1'),
+        ('firefox', 77, '0.29.1'),
+        ('firefox', 78, '0.30.0'),
+        ('firefox', 140, None),
+        ('ie', 11, '3.150.1'),
+        ('ie', None, None),
+        ('edge', 100, None)])
+    def test_find_packaged(tmp_path, browser, major, expected):
+        """ Majors are looked up in the packaged ranges. """
+        assert CompatibilityDatabase(str(tmp_path)).find(
+            browser, major, TTL) == expected
+
+    @staticmethod
+    def test_record_overrides_packaged(tmp_path):
+        """ Recorded versions take precedence, only for their major. """
+        database = CompatibilityDatabase(str(tmp_path))
+        database.record('chrome', 85, '85.0.4183.38')
+        database.record('chrome', 120, '120.0.6099.109')
+        assert os.path.isfile(database.path)
+        assert database.find('chrome', 85, TTL) == '85.0.4183.38'
+        assert database.find('chrome', 120, TTL) == '120.0.6099.109'
+        assert database.find('chrome', 86, TTL) == '86.0.4240.22'
+        assert CompatibilityDatabase(str(tmp_path)).find('chrome', 120, TTL) \
+            == '120.0.6099.109'
+
+    @staticmethod
+    def test_malformed_overlay_is_ignored(tmp_path):
+        """ A broken overlay falls back to the packaged rules. """
+        database = CompatibilityDatabase(str(tmp_path))
+        with open(database.path, 'w', encoding='utf-8') as file:
+            file.write('not an ini file')
+        assert database.find('firefox', 80, TTL) == '0.30.0'
+
+    @staticmethod
+    def test_recorded_versions_expire(tmp_path, mocker):
+        """ Recorded versions are only used within the ttl. """
+        database = CompatibilityDatabase(str(tmp_path))
+        database.record('chrome', 120, '120.0.6099.109')
+        assert database.find('chrome', 120, 0) is None
+        mocker.patch('time.time', return_value=time.time() + TTL + 1)
+        assert database.find('chrome', 120, TTL) is None
+        assert database.fallback('chrome', 120) == '120.0.6099.109'
+
+    @staticmethod
+    def test_overlay_without_time_is_expired(tmp_path):
+        """ Versions recorded without a time are only fallbacks. """
+        database = CompatibilityDatabase(str(tmp_path))
+        with open(database.path, 'w', encoding='utf-8') as file:
+            file.write('[CHROMEDRIVER_COMPATIBILITY]\n120-120 = 120.0.6099.71\n')
+        assert database.find('chrome', 120, TTL) is None
+        assert database.fallback('chrome', 120) == '120.0.6099.71'
+
+    @staticmethod
+    def test_open_ranges_are_fallbacks(tmp_path):
+        """ Open ended packaged ranges don't pin the latest drivers. """
+        database = CompatibilityDatabase(str(tmp_path))
+        assert database.find('firefox', 115, TTL) is None
+        assert database.fallback('firefox', 115) == '0.35.0'
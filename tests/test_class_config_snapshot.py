@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name, redefined-outer-name, unused-argument
+
+
+"""
+tests.test_class_config_snapshot
+--------------------------------
+
+The test set for functions in driloader.config.snapshot
+"""
+
+
+import pytest
+
+from driloader.config.browser_config import BrowserConfig
+from driloader.config.snapshot import ConfigSnapshot, UrlTemplate
+
+
+@pytest.fixture()
+def fresh_snapshot(tmp_path, monkeypatch):
+    """ Reads the config again, with an empty home folder. """
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    monkeypatch.delenv(ConfigSnapshot.ENVIRONMENT_VARIABLE, raising=False)
+    ConfigSnapshot.reload()
+    yield
+    ConfigSnapshot.reload()
+
+
+class TestConfigSnapshot:
+    """ Test ConfigSnapshot and UrlTemplate """
+
+    @staticmethod
+    def test_snapshot_is_shared(fresh_snapshot):
+        """ Every BrowserConfig reads the same snapshot. """
+        assert BrowserConfig('CHROME').search_regex() is \
+            BrowserConfig('FIREFOX').search_regex() is \
+            ConfigSnapshot.get().search_regex
+
+    @staticmethod
+    def test_sections_are_read_only(fresh_snapshot):
+        """ The snapshot can't be changed. """
+        with pytest.raises(TypeError):
+            ConfigSnapshot.get().sections['CHROME']['base_url'] = 'x'
+
+    @staticmethod
+    def test_environment_file_overrides(fresh_snapshot, tmp_path, monkeypatch):
+        """ DRILOADER_CONFIG values override the user and packaged ones. """
+        (tmp_path / 'Driloader').mkdir()
+        (tmp_path / 'Driloader' / 'browsers.ini').write_text(
+            '[GENERAL]\nresolution_ttl = 60\ncache_max_age_days = 7\n')
+        override = tmp_path / 'override.ini'
+        override.write_text('[GENERAL]\nresolution_ttl = 0\n')
+        monkeypatch.setenv(ConfigSnapshot.ENVIRONMENT_VARIABLE, str(override))
+        ConfigSnapshot.reload()
+        config = BrowserConfig('CHROME')
+        assert config.resolution_ttl() == 0
+        assert config.cache_max_age() == 7 * 86400
+        assert config.bucket_url() == 'https://chromedriver.storage.googleapis.com/'
+
+    @staticmethod
+    def test_template_renders_known_placeholders():
+        """ Placeholders not given are kept. """
+        template = UrlTemplate('https://host/{version_short}/{version}.zip')
+        assert template.placeholders == ('version_short', 'version')
+        assert template.render(version='3.150.1') == \
+            'https://host/{version_short}/3.150.1.zip'
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_detection_cache
+--------------------------------
+
+The test set for functions in driloader.cache.detection.DetectionCache
+"""
+
+
+import os
+
+from driloader.cache.detection import DetectionCache
+
+
+class TestDetectionCache:
+    """ Test DetectionCache against a temporary folder """
+
+    @staticmethod
+    def test_returns_version_of_unchanged_binary(tmp_path):
+        """ A stored version is returned while the binary is unchanged. """
+        binary = tmp_path / 'chrome'
+        binary.write_text('v85')
+        DetectionCache(str(tmp_path)).set('chrome', str(binary), 85)
+        assert DetectionCache(str(tmp_path)).get('chrome', str(binary)) == 85
+        assert DetectionCache(str(tmp_path)).get('firefox', str(binary)) is None
+
+    @staticmethod
+    def test_changed_binary_is_a_miss(tmp_path):
+        """ Updating the binary invalidates its entry. """
+        binary = tmp_path / 'chrome'
+        binary.write_text('v85')
+        cache = DetectionCache(str(tmp_path))
+        cache.set('chrome', str(binary), 85)
+        binary.write_text('v86 is bigger')
+        assert cache.get('chrome', str(binary)) is None
+
+    @staticmethod
+    def test_symlinks_share_the_entry(tmp_path):
+        """ Entries are keyed by the resolved binary path. """
+        binary = tmp_path / 'chrome'
+        binary.write_text('v85')
+        link = tmp_path / 'google-chrome'
+        os.symlink(str(binary), str(link))
+        cache = DetectionCache(str(tmp_path))
+        cache.set('chrome', str(link), 85)
+        assert cache.get('chrome', str(binary)) == 85
+
+    @staticmethod
+    def test_missing_binary_is_not_cached(tmp_path):
+        """ A binary that can't be found is never stored. """
+        cache = DetectionCache(str(tmp_path))
+        cache.set('chrome', str(tmp_path / 'missing'), 85)
+        assert cache.get('chrome', str(tmp_path / 'missing')) is None
+        assert not os.path.exists(cache.path)
@@ -18,14 +18,15 @@ The test set for functions in driloader.downloader.Downloader
 """
 
 
+import hashlib
 import os
-import random
+import tarfile
 import zipfile
 
 import pytest
 
 from driloader.browser.drivers import Driver
-from driloader.utils.file import FileHandler
+from driloader.utils.file import FileHandler, StreamWriter
 
 
 class TestDownloader:
@@ -67,33 +68,99 @@ class TestDownloader:
         assert exists
 
     @staticmethod
-    def test_unzip_file(mock_system):
-        """Testing the static function Downloader.unzip()
-        Steps to test:
-            - Create a text file.
-            - Zip the text file.
-            - Remove the original text file.
-            - Call Downloader.unzip() with flag delete_after_extract=True
-            -Test if there is the text file in disk.
-
-        The test generates random file names for each execution.
+    def test_stream_writer_hashes_chunks(tmp_path):
+        """Testing StreamWriter, which should write every chunk and count
+        their size and sha256, leaving no temp file behind.
         """
+        path = str(tmp_path / 'driver.zip')
+        chunks = [b'chunk-1', b'chunk-2', b'chunk-3']
 
-        file_sufix = '{}'.format(str(random.random()))
-        existing_file_name = './existing_file_{}.txt'.format(file_sufix)
-        zip_file_name = 'test_{}.zip'.format(file_sufix)
+        with StreamWriter(path) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
 
-        with open(existing_file_name, 'w') as file:
-            file.write('exists')
+        with open(path, 'rb') as file:
+            assert file.read() == b''.join(chunks)
+        assert writer.size == 21
+        assert writer.sha256 == hashlib.sha256(b''.join(chunks)).hexdigest()
+        assert os.listdir(str(tmp_path)) == ['driver.zip']
 
-        zip_file = zipfile.ZipFile(zip_file_name, 'w')
-        zip_file.write(existing_file_name)
-        zip_file.close()
+    @staticmethod
+    def test_stream_writer_removes_temp_file_on_error(tmp_path):
+        """Testing StreamWriter when the source fails halfway."""
 
-        os.remove(existing_file_name)
-        FileHandler.unzip(zip_file_name, './', True)
+        def failing_chunks():
+            yield b'chunk-1'
+            raise IOError('connection dropped')
 
-        unzipped_file_exists = os.path.exists(existing_file_name)
-        os.remove(existing_file_name)
+        with pytest.raises(IOError):
+            with StreamWriter(str(tmp_path / 'driver.zip')) as writer:
+                for chunk in failing_chunks():
+                    writer.write(chunk)
+        assert not os.listdir(str(tmp_path))
 
-        assert unzipped_file_exists
+    @staticmethod
+    def test_extract_member_from_tar(tmp_path):
+        """Testing FileHandler.extract_member() with a '.tar.gz' archive:
+        only the named file is extracted, keeping its mode bits.
+        """
+        source = tmp_path / 'geckodriver'
+        source.write_text('driver')
+        os.chmod(str(source), 0o755)
+        other = tmp_path / 'README'
+        other.write_text('readme')
+        archive = str(tmp_path / 'geckodriver-v0.27.0-linux64.tar.gz')
+        with tarfile.open(archive, 'w:gz') as tar:
+            tar.add(str(source), arcname='geckodriver')
+            tar.add(str(other), arcname='README')
+        destination = tmp_path / 'out'
+        destination.mkdir()
+
+        path = FileHandler.extract_member(archive, 'geckodriver', str(destination),
+                                          delete_after_extract=True)
+
+        assert os.listdir(str(destination)) == ['geckodriver']
+        assert os.stat(path).st_mode & 0o777 == 0o755
+        assert not os.path.exists(archive)
+
+    @staticmethod
+    def test_extract_member_from_zip_folder(tmp_path):
+        """Testing FileHandler.extract_member() with a zip that keeps
+        the driver inside a folder.
+        """
+        archive = str(tmp_path / 'chromedriver-linux64.zip')
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('chromedriver-linux64/LICENSE', 'license')
+            zip_file.writestr('chromedriver-linux64/chromedriver', 'driver')
+
+        path = FileHandler.extract_member(archive, 'chromedriver', str(tmp_path))
+
+        with open(path) as file:
+            assert file.read() == 'driver'
+
+    @staticmethod
+    def test_extract_member_missing(tmp_path):
+        """Testing FileHandler.extract_member() when the file isn't there."""
+        archive = str(tmp_path / 'empty.zip')
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('README', 'readme')
+        with pytest.raises(FileNotFoundError):
+            FileHandler.extract_member(archive, 'chromedriver', str(tmp_path))
+
+    @staticmethod
+    def test_write_json_is_atomic(tmp_path):
+        """Testing FileHandler.write_json() and read_json(): a failed write
+        leaves the previous file and no temp file behind.
+        """
+        path = str(tmp_path / 'cache.json')
+        assert FileHandler.read_json(path) == {}
+        FileHandler.write_json(path, {'chrome': 85})
+
+        def failing_write(file):
+            file.write('{"chrome"')
+            raise IOError('disk full')
+
+        with pytest.raises(IOError):
+            FileHandler.write_atomic(path, failing_write)
+        assert FileHandler.read_json(path) == {'chrome': 85}
+        assert os.listdir(str(tmp_path)) == ['cache.json']
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_driloader_commands
+-----------------------------------
+
+The test set for functions in driloader.__main__.DriloaderCommands
+"""
+
+
+import threading
+import time
+
+from driloader.__main__ import DriloaderCommands
+
+
+class TestDriloaderCommands:
+    """ Test DriloaderCommands by mocking the browser detections """
+
+    @staticmethod
+    def test_all_versions_are_detected_concurrently(mocker):
+        """ Every detection must be running at once to pass the barrier. """
+        barrier = threading.Barrier(3, timeout=5)
+
+        def detect(version):
+            def _detect():
+                barrier.wait()
+                return version
+            return _detect
+
+        mocker.patch.object(DriloaderCommands, 'get_firefox_version', staticmethod(detect(80)))
+        mocker.patch.object(DriloaderCommands, 'get_google_chrome_version',
+                            staticmethod(detect(85)))
+        mocker.patch.object(DriloaderCommands, 'get_internet_explorer_version',
+                            staticmethod(detect(11)))
+
+        assert DriloaderCommands().get_all_browsers_versions() == \
+            'Firefox: 80\nGoogle Chrome: 85\nInternet Explorer: 11\n'
+
+    @staticmethod
+    def test_slow_detection_times_out(mocker):
+        """ A hung detection is reported without waiting for it. """
+        release = threading.Event()
+        mocker.patch.object(DriloaderCommands, 'get_firefox_version',
+                            staticmethod(lambda: release.wait(10)))
+        mocker.patch.object(DriloaderCommands, 'get_google_chrome_version',
+                            staticmethod(lambda: 85))
+        mocker.patch.object(DriloaderCommands, 'get_internet_explorer_version',
+                            staticmethod(lambda: 11))
+
+        started = time.monotonic()
+        result = DriloaderCommands().get_all_browsers_versions(timeout=0.2)
+        release.set()
+
+        assert time.monotonic() - started < 5
+        assert result == 'Firefox: Unable to get the Firefox version: timed out ' \
+                         'after 0.2 seconds\nGoogle Chrome: 85\nInternet Explorer: 11\n'
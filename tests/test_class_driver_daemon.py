@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_driver_daemon
+------------------------------
+
+The test set for functions in driloader.daemon and get_driver asking the
+daemon.
+"""
+
+
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from driloader.browser.basebrowser import BaseBrowser
+from driloader.browser.chrome import Chrome
+from driloader.browser.drivers import Driver
+from driloader.daemon import DaemonClient, DriverDaemon, supported
+
+
+pytestmark = pytest.mark.skipif(not supported(),
+                                reason='Unix sockets are not supported')
+
+
+class FakeBrowser:
+    """ Gets a driver file after a delay, counting the calls. """
+
+    def __init__(self, path, calls, error=None):
+        self.path = path
+        self.calls = calls
+        self.error = error
+        self.driver = Driver('chrome')
+        self.daemon = True
+
+    def use_daemon(self, value=True):
+        self.daemon = value
+        return self
+
+    def get_driver(self):
+        assert not self.daemon
+        self.calls.append(time.monotonic())
+        time.sleep(0.2)
+        if self.error:
+            raise self.error
+        with open(self.path, 'w') as file:
+            file.write('driver')
+        self.driver.version = '85.0.4183.87'
+        return self.path
+
+
+def _listening(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+@pytest.fixture(name='serve')
+def fixture_serve(tmp_path):
+    """ Runs a daemon in a thread, with the given browsers. """
+    daemons = []
+
+    def serve(browsers):
+        daemon = DriverDaemon(str(tmp_path), browsers)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while not _listening(daemon.path):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        daemons.append((daemon, thread))
+        return daemon
+
+    yield serve
+    for daemon, thread in daemons:
+        daemon.shutdown()
+        thread.join(5)
+    assert not os.path.exists(os.path.join(str(tmp_path), 'driloader.sock'))
+
+
+class TestDriverDaemon:
+    """ Test DriverDaemon answers and coalesces driver requests """
+
+    @staticmethod
+    def test_get_driver(tmp_path, serve):
+        """ The daemon answers the driver path and version. """
+        calls = []
+        path = str(tmp_path / 'chromedriver')
+        serve({'chrome': lambda: FakeBrowser(path, calls)})
+        client = DaemonClient(str(tmp_path))
+        answer = client.get_driver({'browser': 'chrome'})
+        assert answer == {'path': path, 'version': '85.0.4183.87'}
+        assert client.get_driver({'browser': 'chrome'}) == answer
+        assert len(calls) == 1
+
+    @staticmethod
+    def test_concurrent_requests_are_coalesced(tmp_path, serve):
+        """ Requests made while a browser resolves wait for its answer. """
+        calls = []
+        path = str(tmp_path / 'chromedriver')
+        serve({'chrome': lambda: FakeBrowser(path, calls)})
+        answers = []
+        threads = [threading.Thread(target=lambda: answers.append(
+            DaemonClient(str(tmp_path)).get_driver({'browser': 'chrome'})))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert [answer['path'] for answer in answers] == [path] * 8
+
+    @staticmethod
+    def test_removed_driver_is_got_again(tmp_path, serve):
+        """ An answer whose driver was deleted isn't reused. """
+        calls = []
+        path = str(tmp_path / 'chromedriver')
+        serve({'chrome': lambda: FakeBrowser(path, calls)})
+        client = DaemonClient(str(tmp_path))
+        client.get_driver({'browser': 'chrome'})
+        os.remove(path)
+        assert client.get_driver({'browser': 'chrome'})['path'] == path
+        assert len(calls) == 2
+
+    @staticmethod
+    def test_errors_answer_none(tmp_path, serve):
+        """ A failed or unknown browser makes the client answer None. """
+        calls = []
+        serve({'chrome': lambda: FakeBrowser('', calls, OSError('failed'))})
+        client = DaemonClient(str(tmp_path))
+        assert client.get_driver({'browser': 'chrome'}) is None
+        assert client.get_driver({'browser': 'opera'}) is None
+
+    @staticmethod
+    def test_interrupted_resolution_releases_waiters(tmp_path):
+        """ Waiters get an error, not a hang, if the resolution is killed. """
+        calls = []
+        path = str(tmp_path / 'chromedriver')
+        browser = FakeBrowser(path, calls, KeyboardInterrupt())
+        daemon = DriverDaemon(str(tmp_path), {'chrome': lambda: browser})
+        errors = []
+
+        def wait():
+            time.sleep(0.05)
+            try:
+                daemon.resolve({'browser': 'chrome'})
+            except RuntimeError as error:
+                errors.append(error)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        with pytest.raises(KeyboardInterrupt):
+            daemon.resolve({'browser': 'chrome'})
+        waiter.join(5)
+        assert not waiter.is_alive()
+        assert len(errors) == 1
+        browser.error = None
+        assert daemon.resolve({'browser': 'chrome'})['path'] == path
+
+    @staticmethod
+    def test_async_client(tmp_path, serve):
+        """ get_driver_async gets the same answer. """
+        path = str(tmp_path / 'chromedriver')
+        serve({'chrome': lambda: FakeBrowser(path, [])})
+        answer = asyncio.run(DaemonClient(str(tmp_path)).get_driver_async(
+            {'browser': 'chrome'}))
+        assert answer['path'] == path
+
+    @staticmethod
+    def test_no_daemon(tmp_path):
+        """ Without a daemon, or with a stale socket, the answer is None. """
+        client = DaemonClient(str(tmp_path))
+        assert client.get_driver({'browser': 'chrome'}) is None
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(client.path)
+        stale.close()
+        assert client.available()
+        assert client.get_driver({'browser': 'chrome'}) is None
+
+    @staticmethod
+    def test_socket_is_private_from_the_start(tmp_path):
+        """ The socket is bound owner-only, whatever the umask. """
+        daemon = DriverDaemon(str(tmp_path), {})
+        umask = os.umask(0)
+        try:
+            daemon.listen()
+            assert os.umask(umask) == 0
+        finally:
+            os.umask(umask)
+        try:
+            assert os.stat(daemon.path).st_mode & 0o777 == 0o600
+        finally:
+            daemon._server.server_close()  # pylint: disable=protected-access
+            os.remove(daemon.path)
+
+    @staticmethod
+    def test_daemon_cli_collects_no_events(mocker):
+        """ The daemon runs without an event list growing forever. """
+        from driloader import __main__  # pylint: disable=import-outside-toplevel
+        mocker.patch('sys.argv', ['driloader', '--daemon', '--timings'])
+        run = mocker.patch.object(__main__.DriloaderCommands, 'run_daemon',
+                                  return_value='')
+        listen = mocker.patch.object(__main__, 'listen')
+        with pytest.raises(SystemExit):
+            __main__.main()
+        assert run.called
+        assert not listen.called
+
+    @staticmethod
+    def test_one_daemon_per_folder(tmp_path, serve):
+        """ A second daemon can't listen on the same socket. """
+        serve({})
+        with pytest.raises(OSError):
+            DriverDaemon(str(tmp_path), {}).serve_forever()
+
+    @staticmethod
+    def test_stale_socket_is_replaced(tmp_path, serve):
+        """ A socket left by a killed daemon is taken over. """
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(tmp_path / 'driloader.sock'))
+        stale.close()
+        path = str(tmp_path / 'chromedriver')
+        serve({'chrome': lambda: FakeBrowser(path, [])})
+        assert DaemonClient(str(tmp_path)).get_driver(
+            {'browser': 'chrome'})['path'] == path
+
+    @staticmethod
+    def test_get_driver_asks_daemon(tmp_path, mocker, serve):
+        """ get_driver returns the daemon's driver without resolving it. """
+        path = str(tmp_path / 'chromedriver')
+        serve({'chrome': lambda: FakeBrowser(path, [])})
+        mocker.patch.object(BaseBrowser, '_daemon',
+                            lambda self: DaemonClient(str(tmp_path)))
+        match = mocker.patch.object(BaseBrowser, '_match_driver_version')
+        chrome = Chrome(Driver('chrome'))
+        assert chrome.get_driver() == path
+        assert chrome.driver.version == '85.0.4183.87'
+        assert not match.called
+
+    @staticmethod
+    def test_get_driver_skips_daemon(tmp_path, mocker):
+        """ Refreshing or a custom binary are resolved in process. """
+        mocker.patch.object(BaseBrowser, '_daemon',
+                            lambda self: DaemonClient(str(tmp_path)))
+        ask = mocker.patch.object(DaemonClient, 'get_driver',
+                                  return_value=None)
+        # pylint: disable=protected-access
+        chrome = Chrome(Driver('chrome'))
+        assert chrome._daemon_request() == {'browser': 'chrome'}
+        assert chrome.refresh()._daemon_request() is None
+        assert Chrome(Driver('chrome')).binary('/opt/chrome')\
+            ._daemon_request() is None
+        assert Chrome(Driver('chrome')).use_daemon(False)\
+            ._daemon_request() is None
+        assert not ask.called
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_file_lock
+--------------------------
+
+The test set for functions in driloader.utils.lock.FileLock
+"""
+
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from driloader.utils.lock import FileLock
+
+
+HOLD_LOCK = '''
+import sys, time
+from driloader.utils.lock import FileLock
+with FileLock(sys.argv[1]):
+    print('locked', flush=True)
+    time.sleep(30)
+'''
+
+
+class TestFileLock:
+    """ Test FileLock between processes and within one """
+
+    @staticmethod
+    def test_lock_is_exclusive_across_processes(tmp_path):
+        """ A lock held by another process can't be acquired. """
+        path = str(tmp_path / 'driver.lock')
+        holder = subprocess.Popen([sys.executable, '-c', HOLD_LOCK, path],
+                                  stdout=subprocess.PIPE)
+        try:
+            assert holder.stdout.readline().strip() == b'locked'
+            assert not FileLock(path).acquire(blocking=False)
+        finally:
+            holder.kill()
+            holder.wait()
+        lock = FileLock(path)
+        assert lock.acquire(blocking=False)
+        lock.release()
+
+    @staticmethod
+    def test_lock_is_exclusive_within_a_process(tmp_path):
+        """ Two FileLock instances on one path exclude each other. """
+        path = str(tmp_path / 'driver.lock')
+        with FileLock(path):
+            assert not FileLock(path).acquire(blocking=False)
+        assert FileLock(path).acquire(blocking=False)
+
+    @staticmethod
+    def test_removed_lock_file_is_locked_again(tmp_path):
+        """ A waiter on a lock file removed by its holder locks the new one,
+        so it still excludes later lockers. """
+        path = str(tmp_path / 'driver.lock')
+        holder = FileLock(path)
+        holder.acquire()
+        waiter = FileLock(path)
+        thread = threading.Thread(target=waiter.acquire)
+        thread.start()
+        time.sleep(0.2)  # the waiter opened the file and waits for it
+        os.remove(path)
+        holder.release()
+        thread.join(5)
+        try:
+            assert os.path.exists(path)
+            assert not FileLock(path).acquire(blocking=False)
+        finally:
+            waiter.release()
+
+    @staticmethod
+    def test_shared_locks_exclude_exclusive_ones(tmp_path):
+        """ Shared locks coexist, and an exclusive lock waits for them. """
+        path = str(tmp_path / 'driver.inuse')
+        first, second = FileLock(path, shared=True), FileLock(path,
+                                                             shared=True)
+        assert first.acquire(blocking=False)
+        assert second.acquire(blocking=False)
+        first.release()
+        assert not FileLock(path).acquire(blocking=False)
+        second.release()
+        assert FileLock(path).acquire(blocking=False)
+
+    @staticmethod
+    def test_cancelled_async_wait_leaves_the_lock_free(tmp_path):
+        """ A task cancelled while waiting for the lock never takes it. """
+        path = str(tmp_path / 'driver.lock')
+        holder = FileLock(path)
+        holder.acquire()
+
+        async def cancel_waiter():
+            waiter = asyncio.ensure_future(FileLock(path).acquire_async())
+            await asyncio.sleep(FileLock.POLL_INTERVAL * 2)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            holder.release()
+            await asyncio.sleep(FileLock.POLL_INTERVAL * 2)
+
+        asyncio.run(cancel_waiter())
+        lock = FileLock(path)
+        assert lock.acquire(blocking=False)
+        lock.release()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_http_operations
+--------------------------------
+
+The test set for functions in driloader.http.operations.HttpOperations
+"""
+
+
+from driloader.http.operations import HttpOperations
+from driloader.http.proxy import Proxy
+
+
+class TestHttpOperations:
+    """ Test HttpOperations session handling by mocking the session """
+
+    @staticmethod
+    def test_session_is_shared():
+        """ Every call reuses the same pooled session. """
+        assert HttpOperations.session() is HttpOperations.session()
+
+    @staticmethod
+    def test_configure_replaces_session():
+        """ configure() drops the current session and applies the settings. """
+        session = HttpOperations.session()
+        timeout = HttpOperations.timeout
+        HttpOperations.configure(timeout=5)
+        try:
+            assert HttpOperations.session() is not session
+            assert HttpOperations.timeout == 5
+        finally:
+            HttpOperations.configure(timeout=timeout)
+
+    @staticmethod
+    def test_get_uses_proxy_singleton(mocker):
+        """ Without explicit proxies, the Proxy singleton's urls are used. """
+        get = mocker.patch.object(HttpOperations.session(), 'get')
+        proxy = Proxy()
+        urls = proxy.urls
+        proxy.urls = {'https': 'http://proxy.company.com:3128'}
+        try:
+            HttpOperations.get('https://example.com/')
+        finally:
+            proxy.urls = urls
+        assert get.call_args[1]['proxies'] == {'https': 'http://proxy.company.com:3128'}
+        assert get.call_args[1]['timeout'] == HttpOperations.timeout
+
+    @staticmethod
+    def test_download_streams_to_disk(tmp_path, mocker):
+        """ download() writes the streamed chunks and reports the transfer. """
+        response = mocker.MagicMock()
+        response.iter_content.return_value = [b'a' * 10, b'b' * 5]
+        get = mocker.patch('driloader.http.operations.HttpOperations.get',
+                           return_value=response)
+        path = str(tmp_path / 'driver.zip')
+        download = HttpOperations.download('https://example.com/driver.zip', path)
+        assert get.call_args[1]['stream'] is True
+        assert download.size == 15
+        assert download.path == path
+        assert download.throughput > 0
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_manifest
+-------------------------
+
+The test set for functions in driloader.cache.manifest.Manifest
+"""
+
+
+import os
+
+from driloader.browser.drivers import Driver
+from driloader.cache.manifest import Manifest
+
+
+def _binary(tmp_path, name='chromedriver'):
+    path = tmp_path / name
+    path.write_text('driver')
+    return str(path)
+
+
+def _driver(browser, version):
+    driver = Driver(browser)
+    driver.version = version
+    return driver
+
+
+class TestManifest:
+    """ Test Manifest against a temporary folder """
+
+    @staticmethod
+    def test_finds_recorded_driver(tmp_path):
+        """ A recorded driver is found by its browser major version. """
+        binary = _binary(tmp_path)
+        driver = _driver('chrome', '85.0.4183.87')
+        Manifest(str(tmp_path)).record(driver, 85, binary, 'abc')
+        entry = Manifest(str(tmp_path)).find('chrome', 85, driver.platform())
+        assert entry['driver_version'] == '85.0.4183.87'
+        assert entry['binary_path'] == binary
+        assert entry['sha256'] == 'abc'
+        assert Manifest(str(tmp_path)).find('chrome', 86,
+                                            driver.platform()) is None
+
+    @staticmethod
+    def test_majors_are_merged(tmp_path):
+        """ Recording a driver for another major adds it to the entry. """
+        binary = _binary(tmp_path, 'geckodriver')
+        manifest = Manifest(str(tmp_path))
+        driver = _driver('firefox', '0.27.0')
+        manifest.record(driver, 79, binary, 'a')
+        manifest.record(driver, 80, binary, 'a')
+        entries = list(manifest.entries().values())
+        assert len(entries) == 1
+        assert entries[0]['browser_majors'] == [79, 80]
+
+    @staticmethod
+    def test_missing_binary_is_a_miss(tmp_path):
+        """ Entries whose binary was removed are ignored. """
+        binary = _binary(tmp_path)
+        manifest = Manifest(str(tmp_path))
+        driver = _driver('chrome', '85.0.4183.87')
+        manifest.record(driver, 85, binary, 'abc')
+        os.remove(binary)
+        assert manifest.find('chrome', 85, driver.platform()) is None
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_partial_downloads
+----------------------------------
+
+The test set for resumable downloads: driloader.cache.partials and
+HttpOperations.download
+"""
+
+
+import hashlib
+
+import pytest
+from requests.exceptions import ChunkedEncodingError
+
+from driloader.http.operations import HttpOperations
+
+
+URL = 'https://chromedriver.storage.googleapis.com/85.0.4183.87/' \
+      'chromedriver_linux64.zip'
+RESUMABLE = {'Accept-Ranges': 'bytes', 'ETag': '"v1"'}
+
+
+def _response(mocker, status_code, chunks, headers=None, fail=False):
+    """ A streamed response, dropping the connection after chunks if fail. """
+    def iter_content(chunk_size):
+        yield from chunks
+        if fail:
+            raise ChunkedEncodingError('Connection broken')
+    response = mocker.MagicMock(status_code=status_code,
+                                headers=headers or {})
+    response.iter_content.side_effect = iter_content
+    return response
+
+
+@pytest.fixture(name='no_retries')
+def fixture_no_retries(monkeypatch):
+    """ Makes a dropped connection fail the download() call. """
+    monkeypatch.setattr(HttpOperations, 'retries', 0)
+
+
+class TestPartialDownloads:
+    """ Test downloads are resumed from their partial file """
+
+    @staticmethod
+    def test_interrupted_download_is_resumed(tmp_path, mocker, no_retries):
+        """ The next call asks for the missing bytes only. """
+        path = str(tmp_path / 'driver.zip')
+        get = mocker.patch('driloader.http.operations.HttpOperations.get',
+                           side_effect=[
+                               _response(mocker, 200, [b'abc'], RESUMABLE,
+                                         fail=True),
+                               _response(mocker, 206, [b'def'], {
+                                   'Content-Range': 'bytes 3-5/6'})])
+        with pytest.raises(ChunkedEncodingError):
+            HttpOperations.download(URL, path)
+        assert HttpOperations.partial_downloads().resume_headers(URL) == \
+            {'Range': 'bytes=3-', 'If-Range': '"v1"'}
+
+        download = HttpOperations.download(URL, path)
+
+        assert get.call_args[1]['headers'] == {'Range': 'bytes=3-',
+                                               'If-Range': '"v1"'}
+        with open(path, 'rb') as file:
+            assert file.read() == b'abcdef'
+        assert download.size == 6
+        assert download.sha256 == hashlib.sha256(b'abcdef').hexdigest()
+        assert HttpOperations.partial_downloads().resume_headers(URL) == {}
+
+    @staticmethod
+    def test_resumed_within_the_same_call(tmp_path, mocker):
+        """ A dropped connection is resumed right away, up to retries. """
+        path = str(tmp_path / 'driver.zip')
+        mocker.patch('driloader.http.operations.HttpOperations.get',
+                     side_effect=[
+                         _response(mocker, 200, [b'abc'], RESUMABLE,
+                                   fail=True),
+                         _response(mocker, 206, [b'def'], {
+                             'Content-Range': 'bytes 3-5/6'})])
+        assert HttpOperations.download(URL, path).size == 6
+
+    @staticmethod
+    def test_changed_archive_starts_over(tmp_path, mocker, no_retries):
+        """ If-Range failing, the whole new archive replaces the partial. """
+        path = str(tmp_path / 'driver.zip')
+        mocker.patch('driloader.http.operations.HttpOperations.get',
+                     side_effect=[
+                         _response(mocker, 200, [b'abc'], RESUMABLE,
+                                   fail=True),
+                         _response(mocker, 200, [b'uvwxyz'], {
+                             'Accept-Ranges': 'bytes', 'ETag': '"v2"'})])
+        with pytest.raises(ChunkedEncodingError):
+            HttpOperations.download(URL, path)
+        HttpOperations.download(URL, path)
+        with open(path, 'rb') as file:
+            assert file.read() == b'uvwxyz'
+
+    @staticmethod
+    @pytest.mark.parametrize('headers', [
+        {},
+        {'Accept-Ranges': 'none', 'ETag': '"v1"'},
+        {'Accept-Ranges': 'bytes', 'ETag': 'W/"v1"'}])
+    def test_not_resumable_without_validator(tmp_path, mocker, no_retries,
+                                             headers):
+        """ Without byte ranges or a strong validator nothing is kept. """
+        mocker.patch('driloader.http.operations.HttpOperations.get',
+                     return_value=_response(mocker, 200, [b'abc'], headers,
+                                            fail=True))
+        with pytest.raises(ChunkedEncodingError):
+            HttpOperations.download(URL, str(tmp_path / 'driver.zip'))
+        assert HttpOperations.partial_downloads().resume_headers(URL) == {}
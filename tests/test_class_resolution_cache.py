@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_resolution_cache
+---------------------------------
+
+The test set for functions in driloader.cache.resolution.ResolutionCache
+"""
+
+
+import subprocess
+import sys
+
+from driloader.cache.resolution import ResolutionCache
+
+
+SET_KEYS = '''
+import sys
+from driloader.cache.resolution import ResolutionCache
+cache = ResolutionCache(sys.argv[1], ttl=60)
+for number in range(20):
+    cache.set('{}|{}'.format(sys.argv[2], number), '1.0')
+'''
+
+
+class TestResolutionCache:
+    """ Test ResolutionCache against a temporary folder """
+
+    @staticmethod
+    def test_returns_stored_version(tmp_path):
+        """ A stored version is returned while it's fresh. """
+        cache = ResolutionCache(str(tmp_path), ttl=60)
+        key = cache.key('chrome', 85, 'linux-x86_64')
+        cache.set(key, '85.0.4183.87')
+        assert ResolutionCache(str(tmp_path), ttl=60).get(key) == '85.0.4183.87'
+
+    @staticmethod
+    def test_expired_entry_is_ignored(tmp_path, mocker):
+        """ Entries older than the TTL are treated as missing. """
+        cache = ResolutionCache(str(tmp_path), ttl=60)
+        key = cache.key('firefox', 80, 'linux-x86_64')
+        mocker.patch('time.time', return_value=1000)
+        cache.set(key, '0.27.0')
+        mocker.patch('time.time', return_value=1061)
+        assert cache.get(key) is None
+
+    @staticmethod
+    def test_zero_ttl_disables_cache(tmp_path):
+        """ A TTL of zero never returns an entry. """
+        cache = ResolutionCache(str(tmp_path), ttl=0)
+        key = cache.key('ie', 11, 'windows-amd64')
+        cache.set(key, '3.150.1')
+        assert cache.get(key) is None
+
+    @staticmethod
+    def test_missing_file_is_a_miss(tmp_path):
+        """ A cache that was never written returns None. """
+        cache = ResolutionCache(str(tmp_path), ttl=60)
+        assert cache.get(cache.key('chrome', 85, 'linux-x86_64')) is None
+
+    @staticmethod
+    def test_concurrent_processes_keep_every_entry(tmp_path):
+        """ Processes storing entries at once don't lose each other's. """
+        writers = [subprocess.Popen([sys.executable, '-c', SET_KEYS,
+                                     str(tmp_path), str(writer)])
+                   for writer in range(4)]
+        for writer in writers:
+            assert writer.wait() == 0
+        cache = ResolutionCache(str(tmp_path), ttl=60)
+        assert all(cache.get('{}|{}'.format(writer, number)) == '1.0'
+                   for writer in range(4) for number in range(20))
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_response_cache
+-------------------------------
+
+The test set for functions in driloader.cache.responses and
+HttpOperations.get_cached
+"""
+
+
+import os
+
+from driloader.cache.responses import ResponseCache
+from driloader.http.operations import HttpOperations
+
+
+URL = 'https://chromedriver.storage.googleapis.com/LATEST_RELEASE'
+
+
+def _response(mocker, status_code, body=b'', headers=None):
+    response = mocker.Mock(status_code=status_code, headers=headers or {},
+                           url=URL)
+    response.iter_content.return_value = [body]
+    return response
+
+
+class TestResponseCache:
+    """ Test ResponseCache and the conditional requests made with it """
+
+    @staticmethod
+    def test_store_and_conditions(tmp_path):
+        """ Stored validators make the next request conditional. """
+        cache = ResponseCache(str(tmp_path))
+        key = cache.key(URL, {'prefix': '85.'})
+        assert cache.conditions(key) == {}
+        stored = cache.store(key, URL, 200, {'etag': '"1"', 'Last-Modified':
+                                             'Mon, 01 Jan 2024 00:00:00 GMT'},
+                             [b'85.0.', b'4183.87'])
+        assert stored.text == '85.0.4183.87' and not stored.from_cache
+        assert cache.conditions(key) == {
+            'If-None-Match': '"1"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+        assert cache.revalidated(key).from_cache
+        assert key != cache.key(URL, {'prefix': '86.'})
+
+    @staticmethod
+    def test_not_modified_reuses_body(mocker):
+        """ A 304 returns the stored body and final url. """
+        get = mocker.patch('driloader.http.operations.HttpOperations.get',
+                           side_effect=[
+                               _response(mocker, 200, b'86.0.4240.22',
+                                         {'ETag': '"a"'}),
+                               _response(mocker, 304)])
+        first = HttpOperations.get_cached(URL)
+        second = HttpOperations.get_cached(URL)
+        assert first.text == second.text == '86.0.4240.22'
+        assert second.from_cache and second.url == URL
+        assert get.call_args_list[0][1]['headers'] == {}
+        assert get.call_args_list[1][1]['headers'] == {'If-None-Match': '"a"'}
+
+    @staticmethod
+    def test_changed_response_replaces_body(mocker):
+        """ A 200 replaces the stored body and validators. """
+        mocker.patch('driloader.http.operations.HttpOperations.get',
+                     side_effect=[
+                         _response(mocker, 200, b'old', {'ETag': '"a"'}),
+                         _response(mocker, 200, b'new', {'ETag': '"b"'})])
+        HttpOperations.get_cached(URL)
+        assert HttpOperations.get_cached(URL).text == 'new'
+        cache = HttpOperations.response_cache()
+        assert cache.conditions(cache.key(URL)) == {'If-None-Match': '"b"'}
+
+    @staticmethod
+    def test_missing_body_is_fetched_again(mocker):
+        """ A 304 for a body that's gone is retried unconditionally. """
+        get = mocker.patch('driloader.http.operations.HttpOperations.get',
+                           side_effect=[
+                               _response(mocker, 200, b'v1', {'ETag': '"a"'}),
+                               _response(mocker, 304),
+                               _response(mocker, 200, b'v1', {'ETag': '"a"'})])
+        os.remove(HttpOperations.get_cached(URL).path)
+        assert HttpOperations.get_cached(URL).text == 'v1'
+        assert 'headers' not in get.call_args_list[2][1]
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_class_segmented_download
+-----------------------------------
+
+The test set for functions in driloader.http.segmented and the segmented
+mode of HttpOperations.download
+"""
+
+
+import base64
+import hashlib
+
+import pytest
+from requests import exceptions
+
+from driloader.http.operations import HttpOperations
+from driloader.http.segmented import SegmentedDownload
+
+
+URL = 'https://chromedriver.storage.googleapis.com/85.0.4183.87/' \
+      'chromedriver_linux64.zip'
+BODY = bytes(range(256)) * 40
+
+
+def _headers(body=BODY, md5=None):
+    md5 = md5 or hashlib.md5(body).digest()
+    return {'Content-Length': str(len(body)), 'Accept-Ranges': 'bytes',
+            'ETag': '"1"', 'x-goog-hash': 'crc32c=AAAAAA==,md5=' +
+            base64.b64encode(md5).decode('ascii')}
+
+
+def _server(mocker, body=BODY, headers=None):
+    """ Serves body, in ranges when asked, through mocked head and get. """
+    requests = []
+
+    def get(url, verify=False, stream=False, headers=None):
+        requests.append((headers or {}).get('Range'))
+        response = mocker.MagicMock(status_code=200, headers={})
+        chunk = body
+        if headers and 'Range' in headers:
+            start, _, end = headers['Range'][6:].partition('-')
+            start, end = int(start), int(end)
+            chunk = body[start:end + 1]
+            response.status_code = 206
+            response.headers = {'Content-Range': 'bytes {}-{}/{}'.format(
+                start, end, len(body))}
+        response.__enter__.return_value = response
+        response.iter_content.return_value = [chunk]
+        return response
+
+    mocker.patch('driloader.http.operations.HttpOperations.head',
+                 return_value=mocker.Mock(ok=True, url=URL,
+                                          headers=headers or _headers(body)))
+    mocker.patch('driloader.http.operations.HttpOperations.get',
+                 side_effect=get)
+    return requests
+
+
+@pytest.fixture(name='segments')
+def fixture_segments(monkeypatch):
+    """ Turns segmented downloads on, for archives of 1 KB or more. """
+    monkeypatch.setattr(HttpOperations, 'segments', 4)
+    monkeypatch.setattr(HttpOperations, 'segment_min_size', 1024)
+
+
+class TestSegmentedDownload:
+    """ Test SegmentedDownload plans and downloads in segments """
+
+    @staticmethod
+    def test_ranges_cover_the_archive():
+        """ Ranges are contiguous, inclusive and cover every byte. """
+        plan = SegmentedDownload(URL, 10, '"1"', None)
+        assert plan.ranges(4) == [(0, 2), (3, 5), (6, 8), (9, 9)]
+        assert plan.ranges(1) == [(0, 9)]
+
+    @staticmethod
+    @pytest.mark.parametrize('headers', [
+        {'Content-Length': '10240', 'ETag': '"1"'},
+        {'Content-Length': '10240', 'Accept-Ranges': 'bytes',
+         'ETag': 'W/"1"'},
+        {'Content-Length': '100', 'Accept-Ranges': 'bytes', 'ETag': '"1"'},
+        {'Accept-Ranges': 'bytes', 'ETag': '"1"'}])
+    def test_not_segmented(headers):
+        """ Small archives, or without ranges or validator, aren't split. """
+        assert SegmentedDownload.from_headers(URL, headers, 1024) is None
+
+    @staticmethod
+    def test_md5_from_headers():
+        """ The md5 comes from x-goog-hash, or a single-part ETag. """
+        plan = SegmentedDownload.from_headers(URL, _headers(), 1024)
+        assert plan.md5 == hashlib.md5(BODY).hexdigest()
+        plan = SegmentedDownload.from_headers(URL, {
+            'Content-Length': '2048', 'Accept-Ranges': 'bytes',
+            'ETag': '"{}"'.format('a' * 32)}, 1024)
+        assert plan.md5 == 'a' * 32
+
+    @staticmethod
+    def test_download_in_segments(tmp_path, mocker, segments):
+        """ The ranges are fetched and assembled at their offsets. """
+        requests = _server(mocker)
+        path = str(tmp_path / 'driver.zip')
+        download = HttpOperations.download(URL, path)
+        assert sorted(requests) == ['bytes=0-2559', 'bytes=2560-5119',
+                                    'bytes=5120-7679', 'bytes=7680-10239']
+        with open(path, 'rb') as file:
+            assert file.read() == BODY
+        assert download.sha256 == hashlib.sha256(BODY).hexdigest()
+        assert len(list(tmp_path.iterdir())) == 1
+
+    @staticmethod
+    def test_md5_mismatch_falls_back(tmp_path, mocker, segments):
+        """ An archive failing verification is downloaded in one stream. """
+        requests = _server(mocker, headers=_headers(md5=b'0' * 16))
+        path = str(tmp_path / 'driver.zip')
+        HttpOperations.download(URL, path)
+        assert requests[-1] is None
+        with open(path, 'rb') as file:
+            assert file.read() == BODY
+
+    @staticmethod
+    def test_failed_head_falls_back(tmp_path, mocker, segments):
+        """ A HEAD request failing on the network falls back to a single
+        stream. """
+        requests = _server(mocker)
+        HttpOperations.head.side_effect = exceptions.ConnectTimeout('HEAD')
+        path = str(tmp_path / 'driver.zip')
+        HttpOperations.download(URL, path)
+        assert requests == [None]
+        with open(path, 'rb') as file:
+            assert file.read() == BODY
+
+    @staticmethod
+    def test_off_by_default(tmp_path, mocker):
+        """ Without configure_segments, no HEAD request is made. """
+        _server(mocker)
+        HttpOperations.download(URL, str(tmp_path / 'driver.zip'))
+        assert not HttpOperations.head.called
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_driloader
+--------------------
+
+The test set for functions in driloader.driloader
+"""
+
+
+import threading
+
+import pytest
+
+from driloader import driloader
+from driloader.browser.exceptions import BrowserNotSupportedError, ProvisioningError
+
+
+class TestGetDrivers:
+    """ Test get_drivers by mocking each browser's get_driver """
+
+    @staticmethod
+    def test_drivers_are_fetched_concurrently(mocker):
+        """ Both downloads must be running at the same time to pass the barrier. """
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fetch(path):
+            def _fetch():
+                barrier.wait()
+                return path
+            return _fetch
+
+        mocker.patch('driloader.browser.chrome.Chrome.get_driver',
+                     side_effect=fetch('/drivers/chromedriver'))
+        mocker.patch('driloader.browser.firefox.Firefox.get_driver',
+                     side_effect=fetch('/drivers/geckodriver'))
+
+        assert driloader.get_drivers(['chrome', 'firefox']) == {
+            'chrome': '/drivers/chromedriver',
+            'firefox': '/drivers/geckodriver'}
+
+    @staticmethod
+    def test_errors_are_reported_per_browser(mocker):
+        """ A failing browser doesn't hide the other results. """
+        mocker.patch('driloader.browser.chrome.Chrome.get_driver',
+                     return_value='/drivers/chromedriver')
+        mocker.patch('driloader.browser.internet_explorer.IE.get_driver',
+                     side_effect=OSError('download failed'))
+
+        with pytest.raises(ProvisioningError) as error:
+            driloader.get_drivers(['chrome', 'ie'])
+        assert error.value.results == {'chrome': '/drivers/chromedriver'}
+        assert isinstance(error.value.cause['ie'], OSError)
+
+    @staticmethod
+    def test_accepts_browser_instances(mocker):
+        """ Configured instances can be passed instead of names. """
+        mocker.patch('driloader.browser.chrome.Chrome.get_driver',
+                     return_value='/drivers/chromedriver')
+        browser = driloader.chrome().binary('/opt/chrome')
+        assert driloader.get_drivers([browser]) == {'chrome': '/drivers/chromedriver'}
+
+    @staticmethod
+    def test_names_are_normalized(mocker):
+        """ A browser asked for under several names is provisioned once. """
+        chrome = mocker.patch('driloader.browser.chrome.Chrome.get_driver',
+                              return_value='/drivers/chromedriver')
+        ie = mocker.patch('driloader.browser.internet_explorer.IE.get_driver',
+                          return_value='/drivers/IEDriverServer.exe')
+        assert driloader.get_drivers(
+            ['Chrome', 'chrome', 'ie', 'internet_explorer']) == {
+                'chrome': '/drivers/chromedriver',
+                'ie': '/drivers/IEDriverServer.exe'}
+        assert chrome.call_count == 1
+        assert ie.call_count == 1
+
+    @staticmethod
+    def test_unknown_browser():
+        """ Unknown names are rejected before anything starts. """
+        with pytest.raises(BrowserNotSupportedError):
+            driloader.get_drivers(['safari'])
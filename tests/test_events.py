@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_events
+-----------------
+
+The test set for functions in driloader.events
+"""
+
+
+from driloader import driloader
+from driloader.__main__ import format_timings
+from driloader.events import Event, Phase, listen
+
+
+class TestEvents:
+    """ Test Phase, listen and subscribe """
+
+    @staticmethod
+    def test_phase_emits_event():
+        """ A phase emits one event with what was set in the block. """
+        received = []
+        with listen() as events:
+            with Phase('download', 'chrome', 'https://host/driver.zip',
+                       [received.append]) as phase:
+                phase.bytes = 10
+                phase.cache_hit = False
+        assert events == received
+        assert len(events) == 1
+        event = events[0]
+        assert event.phase == 'download'
+        assert event.browser == 'chrome'
+        assert event.duration >= 0
+        assert (event.bytes, event.cache_hit, event.url) == \
+            (10, False, 'https://host/driver.zip')
+
+    @staticmethod
+    def test_listen_stops_after_block():
+        """ Callbacks are removed when the listen block exits. """
+        seen = []
+        with listen(seen.append):
+            with Phase('gc'):
+                pass
+        with Phase('gc'):
+            pass
+        assert len(seen) == 1
+
+    @staticmethod
+    def test_subscribe_receives_all_browsers():
+        """ Callbacks subscribed at module level see every browser. """
+        seen = []
+        driloader.subscribe(seen.append)
+        try:
+            with Phase('detect', 'chrome'):
+                pass
+            with Phase('detect', 'firefox'):
+                pass
+        finally:
+            driloader.unsubscribe(seen.append)
+        assert [event.browser for event in seen] == ['chrome', 'firefox']
+
+    @staticmethod
+    def test_format_timings():
+        """ The CLI prints one line per phase. """
+        events = [Event('detect', 'chrome', 0.0125, 0, False, None),
+                  Event('download', 'chrome', 1.5, 2048, None,
+                        'https://host/driver.zip')]
+        assert format_timings(events) == (
+            'Timings:\n'
+            '  chrome    detect           12.5 ms  cache miss\n'
+            '  chrome    download       1500.0 ms  2048 bytes  '
+            'https://host/driver.zip')
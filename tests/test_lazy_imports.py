@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# vim: tabstop=4 expandtab shiftwidth=4 softtabstop=4
+
+# pylint: disable=invalid-name
+
+
+"""
+tests.test_lazy_imports
+-----------------------
+
+Checks which modules `import driloader` and the CLI load, in a fresh
+interpreter.
+"""
+
+
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = {'requests', 'urllib3', 'asyncio', 'aiohttp',
+                 'xml.etree.ElementTree', 'concurrent.futures'}
+
+# Prints the loaded modules on exit, including after the CLI's sys.exit.
+REPORT_MODULES = "import atexit, sys; atexit.register(lambda: print(" \
+                 "'MODULES', *sys.modules, file=sys.stderr)); "
+
+
+def _run(code, home):
+    """
+    Runs code in a fresh interpreter, with -X importtime.
+    :return: a tuple with the set of loaded modules and a dict mapping the
+    modules imported by import statements to their cumulative import time,
+    in microseconds.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', REPORT_MODULES + code],
+        cwd=root, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        check=False, universal_newlines=True)
+    modules, times = set(), {}
+    for line in process.stderr.splitlines():
+        if line.startswith('MODULES '):
+            modules = set(line.split()[1:])
+        elif line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return modules, times
+
+
+class TestLazyImports:
+    """ Test the modules loaded at import and CLI startup """
+
+    @staticmethod
+    def test_import_driloader_loads_no_browser(tmp_path):
+        """ Importing the package loads no browser nor HTTP stack. """
+        modules, times = _run('import driloader', str(tmp_path))
+        assert 'driloader.driloader' in modules
+        assert not HEAVY_MODULES & modules
+        assert not [name for name in modules
+                    if name.startswith('driloader.browser.')
+                    and name not in ('driloader.browser.drivers',
+                                     'driloader.browser.exceptions')]
+        assert times['driloader'] < 1000000
+
+    @staticmethod
+    def test_cli_loads_only_the_asked_browser(tmp_path):
+        """ Printing a version loads neither HTTP nor the other browsers. """
+        modules, _ = _run("import runpy; sys.argv = ['driloader', '--chrome']; "
+                          "runpy.run_module('driloader', run_name='__main__')",
+                          str(tmp_path))
+        assert 'driloader.browser.chrome' in modules
+        assert not HEAVY_MODULES & modules
+        assert 'driloader.browser.firefox' not in modules
+        assert 'driloader.browser.internet_explorer' not in modules